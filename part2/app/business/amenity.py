@@ -4,6 +4,8 @@ from app.business.base_model import BaseModel
 class Amenity(BaseModel):
     """Amenity entity representing a feature of a place"""
 
+    __slots__ = ('name', 'description')
+
     def __init__(self, name, description):
         super().__init__()
         self.name = self._validate_name(name)
@@ -1,18 +1,77 @@
 # app/business/base_model.py
+import time
 import uuid
-from datetime import datetime
+from datetime import datetime, timedelta
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def _to_epoch(value):
+    """Seconds since the epoch of a naive UTC datetime"""
+    return (value - _EPOCH).total_seconds()
+
+
+def _from_epoch(seconds):
+    """Naive UTC datetime of an epoch timestamp"""
+    return _EPOCH + timedelta(seconds=seconds)
+
+
+class LazyList:
+    """
+    List attribute allocated on first access.
+
+    The owning class declares a slot named after the attribute with a
+    leading underscore. Most entities never get a review or an amenity,
+    so the slot stays empty instead of holding an empty list each.
+    """
+
+    def __set_name__(self, owner, name):
+        self.slot = '_' + name
+
+    def __get__(self, obj, owner=None):
+        if obj is None:
+            return self
+        try:
+            return getattr(obj, self.slot)
+        except AttributeError:
+            items = []
+            setattr(obj, self.slot, items)
+            return items
+
+    def __set__(self, obj, value):
+        setattr(obj, self.slot, value)
+
 
 class BaseModel:
     """Base class that defines common attributes for all entities"""
 
+    # Timestamps are stored as epoch floats, created_at and updated_at
+    # convert them to datetimes when read
+    __slots__ = ('id', '_created_at', '_updated_at')
+
     def __init__(self):
         self.id = str(uuid.uuid4())
-        self.created_at = datetime.utcnow()
-        self.updated_at = datetime.utcnow()
+        self._created_at = self._updated_at = time.time()
+
+    @property
+    def created_at(self):
+        return _from_epoch(self._created_at)
+
+    @created_at.setter
+    def created_at(self, value):
+        self._created_at = _to_epoch(value)
+
+    @property
+    def updated_at(self):
+        return _from_epoch(self._updated_at)
+
+    @updated_at.setter
+    def updated_at(self, value):
+        self._updated_at = _to_epoch(value)
 
     def save(self):
         """Update the 'updated_at' timestamp"""
-        self.updated_at = datetime.utcnow()
+        self._updated_at = time.time()
 
     def to_dict(self):
         """Return a dictionary representation of the instance"""
@@ -20,4 +79,4 @@ class BaseModel:
             'id': self.id,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat()
-        }
\ No newline at end of file
+        }
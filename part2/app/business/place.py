@@ -1,9 +1,15 @@
 # app/business/place.py
-from app.business.base_model import BaseModel
+from app.business.base_model import BaseModel, LazyList
 
 class Place(BaseModel):
     """Place entity representing a property listing"""
 
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                 '_reviews', '_amenities')
+
+    reviews = LazyList()
+    amenities = LazyList()
+
     def __init__(self, title, description, price, latitude, longitude, owner_id):
         super().__init__()
         self.title = title
@@ -12,8 +18,6 @@ class Place(BaseModel):
         self.latitude = self._validate_latitude(latitude) if latitude is not None else None
         self.longitude = self._validate_longitude(longitude) if longitude is not None else None
         self.owner_id = owner_id
-        self.reviews = []
-        self.amenities = []
 
     def _validate_price(self, price):
         """Validate that price is positive"""
@@ -4,6 +4,8 @@ from app.business.base_model import BaseModel
 class Review(BaseModel):
     """Review entity representing a user review for a place"""
 
+    __slots__ = ('rating', 'comment', 'user_id', 'place_id')
+
     def __init__(self, rating, comment, user_id, place_id):
         super().__init__()
         self.rating = self._validate_rating(rating)
@@ -1,10 +1,15 @@
 # app/business/user.py
-from app.business.base_model import BaseModel
+from app.business.base_model import BaseModel, LazyList
 import re
 
 class User(BaseModel):
     """User entity representing a system user"""
 
+    __slots__ = ('first_name', 'last_name', 'email', 'password', 'is_admin', '_places', '_reviews')
+
+    places = LazyList()
+    reviews = LazyList()
+
     def __init__(self, first_name, last_name, email, password, is_admin=False):
         super().__init__()
         self.first_name = first_name
@@ -12,8 +17,6 @@ class User(BaseModel):
         self.email = self._validate_email(email)
         self.password = password
         self.is_admin = is_admin
-        self.places = []
-        self.reviews = []
 
     def _validate_email(self, email):
         """Validate email format"""
@@ -32,6 +35,6 @@ class User(BaseModel):
                 setattr(self, key, value)
         self.save()
 
-     def delete(self):
+    def delete(self):
         """Delete the user (implementation depends on repository)"""
         pass
\ No newline at end of file
@@ -1,17 +1,51 @@
 # app/__init__.py
+import sys
+import threading
+from importlib import import_module
+from time import perf_counter
+
+import click
+
+# Started first so that the imports below are timed (HBNB_PROFILE_STARTUP=1)
+from app.profiling import profiling_requested, startup_profiler
+if profiling_requested():
+    startup_profiler.start()
+
 from flask import Flask
 from flask_restx import Api
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
+from app.caching import ResponseCache
+from app.compression import Compress
+from app.hashing import PasswordHasher, PasswordPoolBusy
+from app.instrumentation import RequestInstrumentation
+from app.persistence.routing import RoutingSession
+from app.persistence import sqlite  # noqa: F401 (SQLite transactions, see the module)
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 bcrypt = Bcrypt()
 jwt = JWTManager()
+hasher = PasswordHasher()
+cache = ResponseCache()
+compress = Compress()
+instrumentation = RequestInstrumentation()
+
+# API namespaces: module defining `api`, and URL prefix
+NAMESPACES = (
+    ('app.api.auth', '/api/auth'),
+    ('app.api.users', '/api/users'),
+    ('app.api.places', '/api/places'),
+    ('app.api.reviews', '/api/reviews'),
+    ('app.api.amenities', '/api/amenities'),
+    ('app.api.export', '/api/export'),
+    ('app.api.metrics', '/api/metrics'),
+)
 
 def create_app(config_name=None):
     """Creates and configures the Flask application."""
+    started = perf_counter()
     app = Flask(__name__)
     
     # Load configuration
@@ -21,55 +55,150 @@ def create_app(config_name=None):
 
     print(f"Loading configuration: {config_class.__name__}")
     print(f"JWT Secret Key configured: {'Yes' if app.config.get('JWT_SECRET_KEY') else 'No'}")
+
+    profiler = startup_profiler
+    if app.config.get('PROFILE_STARTUP') and not profiler.enabled:
+        profiler.start()
+    profiler.record('flask app and config', perf_counter() - started)
     
+    # One facade per application, shared by every namespace; USE_DATABASE
+    # in the config or the environment selects the repositories
+    with profiler.phase('facade'):
+        from app.business.facade import HBnBFacade
+        app.extensions['facade'] = HBnBFacade(
+            app.config.get('USE_DATABASE'),
+            journal_dir=app.config.get('MEMORY_JOURNAL_DIR'),
+            journal_options={
+                'sync': app.config.get('MEMORY_JOURNAL_SYNC', 'group'),
+                'sync_interval': app.config.get('MEMORY_JOURNAL_SYNC_INTERVAL', 0.05),
+                'snapshot_every': app.config.get('MEMORY_SNAPSHOT_EVERY', 100000)
+            }
+        )
+
     # Initialize extensions
-    db.init_app(app)
-    bcrypt.init_app(app)
-    jwt.init_app(app)
+    with profiler.phase('init SQLAlchemy'):
+        db.init_app(app)
+    # Before compress, so that its after_request (run last) times the compression
+    for extension in (instrumentation, bcrypt, hasher, cache, compress, jwt):
+        with profiler.phase(f'init {type(extension).__name__}'):
+            extension.init_app(app)
 
     # Enable CORS
     CORS(app)
 
     # Initialize API
-    api = Api(
-        app,
-        version='1.0',
-        title='HBnB Evolution API',
-        description='RESTful API for HBnB application with authentication',
-        doc='/api/docs',
-        authorizations={
-            'Bearer Auth': {
-                'type': 'apiKey',
-                'in': 'header',
-                'name': 'Authorization',
-                'description': 'Add a JWT token to the header with ** Bearer &lt;JWT&gt; ** token to authorize'
-            }
-        },
-        security='Bearer Auth'
-    )
-
-    # Import namespaces
-    from app.api.auth import api as auth_ns
-    from app.api.users import api as users_ns
-    from app.api.places import api as places_ns
-    from app.api.reviews import api as reviews_ns
-    from app.api.amenities import api as amenities_ns
-
-    # Register namespaces
-    api.add_namespace(auth_ns, path='/api/auth')
-    api.add_namespace(users_ns, path='/api/users')
-    api.add_namespace(places_ns, path='/api/places')
-    api.add_namespace(reviews_ns, path='/api/reviews')
-    api.add_namespace(amenities_ns, path='/api/amenities')
+    with profiler.phase('api'):
+        api = Api(
+            app,
+            version='1.0',
+            title='HBnB Evolution API',
+            description='RESTful API for HBnB application with authentication',
+            doc='/api/docs',
+            authorizations={
+                'Bearer Auth': {
+                    'type': 'apiKey',
+                    'in': 'header',
+                    'name': 'Authorization',
+                    'description': 'Add a JWT token to the header with ** Bearer &lt;JWT&gt; ** token to authorize'
+                }
+            },
+            security='Bearer Auth'
+        )
+        # orjson (when installed) instead of the stdlib encoder
+        from app.api.representation import output_json
+        api.representations['application/json'] = output_json
+
+    # Import and register namespaces, now or right before the first request
+    if app.config.get('LAZY_NAMESPACES'):
+        defer_until_first_request(app, lambda: register_namespaces(api, profiler))
+    else:
+        register_namespaces(api, profiler)
     
     # Register JWT error handlers
     register_jwt_handlers(jwt)
+
+    # Shed password work with 503 when the bcrypt pool is saturated
+    @api.errorhandler(PasswordPoolBusy)
+    def password_pool_busy(error):
+        return {'message': 'Server busy, please retry later'}, 503, {'Retry-After': '1'}
     
     # Register general error handlers
     register_error_handlers(app)
 
+    # `flask db` commands, Flask-Migrate is only imported when they are used
+    app.cli.add_command(LazyGroup('db', lambda: init_migrate(app),
+                                  help='Perform database migrations.'))
+
+    @app.cli.command('recompute-ratings')
+    def recompute_ratings():
+        """Rebuild the place rating aggregates from the reviews."""
+        corrected = app.extensions['facade'].recompute_ratings()
+        click.echo(f"Corrected the rating aggregates of {corrected} places")
+
+    if profiler.enabled:
+        profiler.record('create_app total', perf_counter() - started)
+        profiler.stop()
+        app.extensions['startup_profile'] = profiler.report()
+        print(profiler.format_report(), file=sys.stderr)
+
     return app
 
+def register_namespaces(api, profiler=startup_profiler):
+    """Import the API namespaces and register their routes."""
+    for module_name, path in NAMESPACES:
+        with profiler.phase(f'namespace {path}'):
+            api.add_namespace(import_module(module_name).api, path=path)
+
+def defer_until_first_request(app, setup):
+    """
+    Run setup right before the first request reaches Flask.
+
+    Routes can still be added at that point, so a worker can accept
+    connections before the namespaces are imported.
+    """
+    wsgi_app = app.wsgi_app
+    pending = [setup]
+    lock = threading.Lock()
+
+    def run_setup_first(environ, start_response):
+        if pending:
+            with lock:
+                if pending:
+                    pending[0]()
+                    pending.clear()
+        return wsgi_app(environ, start_response)
+
+    app.wsgi_app = run_setup_first
+
+class LazyGroup(click.Group):
+    """Command group whose commands are loaded when first looked up."""
+
+    def __init__(self, name, load, **attrs):
+        super().__init__(name, **attrs)
+        self._load = load
+
+    def list_commands(self, ctx):
+        return self._load().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._load().get_command(ctx, name)
+
+def init_migrate(app):
+    """
+    Set up Flask-Migrate for the migrations in MIGRATIONS_DIR.
+
+    Flask-Migrate imports alembic, which takes longer than the rest of
+    create_app, so workers never call this; the `flask db` commands do.
+
+    Returns:
+        The Flask-Migrate `db` command group
+    """
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db, directory=app.config['MIGRATIONS_DIR'], render_as_batch=True)
+    from flask_migrate.cli import db as commands
+    return commands
+
 def register_jwt_handlers(jwt):
     """Register JWT error handlers."""
     
@@ -104,5 +233,5 @@ def register_error_handlers(app):
     def bad_request(error):
         return {'message': 'Bad request'}, 400
 
-# Import facade after app initialization to avoid circular imports
+# Facade of the current application (see create_app)
 from app.business.facade import facade
\ No newline at end of file
@@ -2,6 +2,10 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from flask_jwt_extended import jwt_required, get_jwt
+from app import cache
+from app.api.params import get_fields_arg, get_page_args
+from app.api.batch import BatchReport, batch_models, read_batch
+from app.api.conditional import collection_conditional, resource_conditional
 
 api = Namespace("amenities", description="Amenity operations")
 
@@ -12,15 +16,45 @@ amenity_model = api.model('Amenity', {
     'description': fields.String(required=True, description='Amenity description')
 })
 
+amenity_update_model = api.model('AmenityUpdate', {
+    'name': fields.String(description='Amenity name'),
+    'description': fields.String(description='Amenity description')
+})
+
+amenity_batch_model, amenity_batch_result_model = batch_models(
+    api, 'Amenity', amenity_model, amenity_update_model)
+
+# Fields of amenity_model, output by the read endpoints without marshalling
+AMENITY_FIELDS = tuple(amenity_model)
+
+amenity_page_model = api.model('AmenityPage', {
+    'items': fields.List(fields.Nested(amenity_model)),
+    'next': fields.String(description='Cursor of the next page, null on the last page')
+})
+
 @api.route("/")
 class AmenityList(Resource):
-    @api.doc('list_amenities')
-    @api.marshal_list_with(amenity_model)
+    @api.doc('list_amenities', params={
+        'limit': 'Maximum number of amenities to return',
+        'cursor': 'Cursor of the next page, from a previous response',
+        'fields': 'Comma separated amenity fields to return, all by default'
+    })
+    @api.response(200, 'Success', amenity_page_model)
+    @cache.cached('amenities', check_modified_since=False)
     def get(self):
-        """List all amenities"""
+        """List amenities, one page at a time"""
         from app import facade
-        amenities = facade.list_amenities()
-        return amenities, 200
+        limit, cursor = get_page_args(api)
+        fields = get_fields_arg(api, AMENITY_FIELDS) or AMENITY_FIELDS
+        headers = collection_conditional(facade.collection_version('amenities'))
+        try:
+            page = facade.list_amenities(limit, cursor)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return {
+            'items': [amenity.to_dict(fields) for amenity in page.items],
+            'next': page.next_cursor
+        }, 200, headers
 
     @api.doc('create_amenity', security='Bearer Auth')
     @jwt_required()
@@ -43,10 +77,10 @@ class AmenityList(Resource):
         data = request.get_json()
 
         try:
-            amenity = facade.create_amenity(
-                name=data['name'],
-                description=data['description']
-            )
+            amenity = facade.create_amenity({
+                'name': data['name'],
+                'description': data['description']
+            })
             return amenity, 201
 
         except ValueError as e:
@@ -54,19 +88,47 @@ class AmenityList(Resource):
         except Exception as e:
             api.abort(500, f"An error occurred: {str(e)}")
 
+@api.route("/batch")
+class AmenityBatch(Resource):
+    @api.doc('batch_amenities', security='Bearer Auth')
+    @jwt_required()
+    @api.expect(amenity_batch_model, validate=True)
+    @api.response(200, 'Outcome of every item', amenity_batch_result_model)
+    @api.response(403, 'Admin access required')
+    def post(self):
+        """Create, update and delete amenities in bulk, one transaction per operation"""
+        from app import facade
+
+        if not get_jwt().get('is_admin', False):
+            return {'message': 'Admin privileges required'}, 403
+
+        create, update, delete = read_batch(api, amenity_update_model)
+        report = BatchReport()
+        try:
+            report.record('create', facade.create_amenities(create))
+            report.record('update', facade.update_amenities(update))
+            report.record('delete', facade.delete_amenities(delete))
+        except Exception as e:
+            return {'message': f'Error processing batch: {str(e)}'}, 500
+        return report.to_dict(), 200
+
 @api.route("/<string:amenity_id>")
 @api.param('amenity_id', 'The amenity unique identifier')
 class AmenityResource(Resource):
-    @api.doc('get_amenity')
-    @api.marshal_with(amenity_model)
+    @api.doc('get_amenity', params={
+        'fields': 'Comma separated amenity fields to return, all by default'
+    })
+    @api.response(200, 'Success', amenity_model)
     @api.response(404, 'Amenity not found')
     def get(self, amenity_id):
         """Get an amenity by ID"""
         from app import facade
+        fields = get_fields_arg(api, AMENITY_FIELDS) or AMENITY_FIELDS
         amenity = facade.get_amenity(amenity_id)
         if not amenity:
             api.abort(404, "Amenity not found")
-        return amenity
+        headers = resource_conditional(amenity)
+        return amenity.to_dict(fields), 200, headers
 
     @api.doc('update_amenity', security='Bearer Auth')
     @jwt_required()
@@ -90,11 +152,12 @@ class AmenityResource(Resource):
         data = request.get_json()
 
         try:
-            updated_amenity = facade.update_amenity(
-                amenity_id,
-                name=data.get('name'),
-                description=data.get('description')
-            )
+            updated_amenity = facade.update_amenity(amenity_id, {
+                'name': data.get('name'),
+                'description': data.get('description')
+            })
+            if not updated_amenity:
+                api.abort(404, "Amenity not found")
             return updated_amenity
 
         except ValueError as e:
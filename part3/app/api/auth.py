@@ -4,13 +4,11 @@ Authentication endpoints for JWT-based login.
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from app.business.facade import HBnBFacade
+from app.business.facade import facade
+from app.hashing import PasswordPoolBusy
 
 api = Namespace('auth', description='Authentication operations')
 
-# Create facade instance
-facade = HBnBFacade()
-
 # API Models
 login_model = api.model('Login', {
     'email': fields.String(required=True, description='User email address'),
@@ -36,6 +34,7 @@ class Login(Resource):
     @api.response(200, 'Login successful')
     @api.response(400, 'Invalid credentials')
     @api.response(401, 'Unauthorized')
+    @api.response(503, 'Password pool saturated, retry later')
     def post(self):
         """
         Authenticate user and return JWT token.
@@ -61,6 +60,14 @@ class Login(Resource):
             if not user.verify_password(password):
                 return {'message': 'Invalid credentials'}, 401
             
+            # Upgrade hashes made with another bcrypt cost while we have the
+            # password; best effort, the old hash still verifies next time
+            if user.password_needs_rehash():
+                try:
+                    facade.rehash_password(user.id, password)
+                except PasswordPoolBusy:
+                    pass
+            
             # Create JWT token with additional claims
             access_token = create_access_token(
                 identity=str(user.id),
@@ -70,6 +77,8 @@ class Login(Resource):
             # Return token and user info (without password)
             return {'access_token': access_token}, 200
             
+        except PasswordPoolBusy:
+            raise
         except Exception as e:
             return {'message': f'Login error: {str(e)}'}, 500
 
@@ -0,0 +1,139 @@
+# app/api/batch.py
+"""
+Helpers shared by the /batch endpoints.
+
+A batch request carries {"create": [...], "update": [...], "delete": [...]}.
+Every item gets an outcome in the response, identified by its operation
+and its position in the request.
+"""
+from flask import current_app, request
+from flask_restx import fields
+
+
+def batch_models(api, name, create_model, update_model):
+    """
+    Declare the request and response models of a batch endpoint.
+
+    Args:
+        api: Namespace to register the models on
+        name: Entity name used as model name prefix (e.g. 'Place')
+        create_model: Model of an item to create
+        update_model: Model of the changes of an item to update
+
+    Returns:
+        Tuple (request_model, response_model)
+    """
+    update_item = api.clone(f'{name}BatchUpdate', update_model, {
+        'id': fields.String(required=True, description=f'{name} ID')
+    })
+    request_model = api.model(f'{name}Batch', {
+        'create': fields.List(fields.Nested(create_model), description='Items to create'),
+        'update': fields.List(fields.Nested(update_item), description='Changes by ID'),
+        'delete': fields.List(fields.String, description='IDs to delete')
+    })
+    outcome = api.model(f'{name}BatchOutcome', {
+        'index': fields.Integer(description='Position in the request list'),
+        'id': fields.String(description=f'{name} ID')
+    })
+    error = api.model(f'{name}BatchError', {
+        'op': fields.String(description='create, update or delete'),
+        'index': fields.Integer(description='Position in the request list'),
+        'message': fields.String(description='Why the item was rejected')
+    })
+    response_model = api.model(f'{name}BatchResult', {
+        'created': fields.List(fields.Nested(outcome)),
+        'updated': fields.List(fields.Nested(outcome)),
+        'deleted': fields.List(fields.Nested(outcome)),
+        'errors': fields.List(fields.Nested(error))
+    })
+    return request_model, response_model
+
+
+def read_batch(api, update_model):
+    """
+    Read the operations of a batch request.
+
+    Args:
+        api: Namespace used to abort with 400 on invalid input
+        update_model: Model whose fields an update may change
+
+    Returns:
+        Tuple (create, update, delete) where update is a list of
+        (id, changes) pairs restricted to the fields of update_model
+    """
+    data = request.get_json() or {}
+    create = data.get('create') or []
+    update = data.get('update') or []
+    delete = data.get('delete') or []
+
+    max_items = current_app.config.get('BATCH_MAX_ITEMS', 1000)
+    if len(create) + len(update) + len(delete) > max_items:
+        api.abort(400, f"A batch is limited to {max_items} items")
+
+    updates = [(item['id'], {key: value for key, value in item.items()
+                             if key in update_model and key != 'id'})
+               for item in update]
+    return create, updates, delete
+
+
+class BatchReport:
+    """Per-item outcome of a batch request."""
+
+    def __init__(self):
+        self.outcomes = {'create': [], 'update': [], 'delete': []}
+        self.errors = []
+
+    def reject(self, op, index, message):
+        """Record an item refused before reaching the facade."""
+        self.errors.append({'op': op, 'index': index, 'message': message})
+
+    def filter(self, op, items, check):
+        """
+        Keep the items that pass a check, rejecting the others.
+
+        Args:
+            op: Operation name
+            items: Request items of that operation
+            check: Callable returning an error message, or None to accept
+
+        Returns:
+            List of the request positions of the accepted items
+        """
+        positions = []
+        for index, item in enumerate(items):
+            message = check(item)
+            if message:
+                self.reject(op, index, message)
+            else:
+                positions.append(index)
+        return positions
+
+    def record(self, op, result, positions=None):
+        """
+        Record a facade BatchResult.
+
+        Args:
+            op: Operation name
+            result: BatchResult keyed by position in the facade call
+            positions: Request position of each facade item, when only
+                some request items were passed on
+        """
+        def position(index):
+            return positions[index] if positions is not None else index
+
+        for index, item in result.items.items():
+            item_id = item if isinstance(item, str) else item.id
+            self.outcomes[op].append({'index': position(index), 'id': item_id})
+        for index, message in result.errors.items():
+            self.reject(op, position(index), message)
+
+    def to_dict(self):
+        """Response body, every list sorted by request position."""
+        key = lambda outcome: outcome['index']
+        return {
+            'created': sorted(self.outcomes['create'], key=key),
+            'updated': sorted(self.outcomes['update'], key=key),
+            'deleted': sorted(self.outcomes['delete'], key=key),
+            'errors': sorted(self.errors, key=lambda error: (
+                list(self.outcomes).index(error['op']), error['index']))
+        }
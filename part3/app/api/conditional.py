@@ -0,0 +1,128 @@
+# app/api/conditional.py
+"""
+Conditional GET support: weak ETags, Last-Modified and 304 responses.
+
+Validators are derived from updated_at (single resources) or from the
+repository version of a collection, so a request can be answered with
+304 Not Modified before anything is serialized.
+"""
+import hashlib
+from datetime import timezone
+
+from flask import request
+from werkzeug.exceptions import HTTPException
+from werkzeug.http import http_date, parse_date, quote_etag, unquote_etag
+
+
+class NotModified(HTTPException):
+    """304 response carrying the validators of the unchanged representation."""
+
+    code = 304
+    description = 'Not Modified'
+
+    def __init__(self, headers):
+        super().__init__()
+        self.validator_headers = headers
+
+    def get_headers(self, environ=None, scope=None):
+        return list(self.validator_headers.items())
+
+
+def make_etag(*parts):
+    """
+    Build an opaque ETag value from the parts identifying a representation.
+
+    The request path and query string are always mixed in, so different
+    pages, filters or includes of the same data get different ETags.
+    """
+    text = '|'.join(str(part) for part in parts + (request.full_path,))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]
+
+
+def conditional(etag, last_modified=None, check_modified_since=True):
+    """
+    Answer 304 if the client already has this representation.
+
+    If-None-Match takes precedence; If-Modified-Since is only used when
+    no If-None-Match is sent and a Last-Modified is known.
+
+    Args:
+        etag: Value from make_etag()
+        last_modified: Naive UTC datetime of the last change, or None
+        check_modified_since: Whether last_modified alone proves the
+            representation unchanged
+
+    Returns:
+        Dictionary of validator headers to send with the 200 response
+
+    Raises:
+        NotModified: If the request validators match
+    """
+    headers = {
+        'ETag': quote_etag(etag, weak=True),
+        # Authenticated data: browsers may keep it but must revalidate each time
+        'Cache-Control': 'private, no-cache'
+    }
+    if last_modified is not None:
+        last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+        headers['Last-Modified'] = http_date(last_modified)
+
+    revalidate(headers, check_modified_since)
+    return headers
+
+
+def revalidate(headers, check_modified_since=True):
+    """
+    Answer 304 if the client already has the representation with these
+    validators, e.g. a representation stored by the response cache.
+
+    Args:
+        headers: Validator headers returned by conditional()
+        check_modified_since: See conditional()
+
+    Raises:
+        NotModified: If the request validators match
+    """
+    etag, _ = unquote_etag(headers['ETag'])
+    last_modified = parse_date(headers.get('Last-Modified'))
+    if request.if_none_match:
+        if request.if_none_match.contains_weak(etag):
+            raise NotModified(headers)
+    elif (check_modified_since and last_modified is not None
+          and request.if_modified_since is not None):
+        if last_modified <= request.if_modified_since:
+            raise NotModified(headers)
+
+
+def resource_conditional(obj, *parts):
+    """
+    Validators of a single object, from its id and updated_at.
+
+    Args:
+        obj: Object with id and updated_at
+        parts: Extra values the representation depends on (e.g. the
+            versions of embedded collections)
+
+    Returns:
+        Dictionary of validator headers, see conditional()
+    """
+    return conditional(make_etag(obj.id, obj.updated_at, *parts), obj.updated_at)
+
+
+def collection_conditional(*versions):
+    """
+    Validators of a collection response, from repository versions.
+
+    Args:
+        versions: (token, last_modified) pairs of every collection the
+            response is built from
+
+    Returns:
+        Dictionary of validator headers, see conditional()
+    """
+    modified = [last_modified for _, last_modified in versions if last_modified is not None]
+    # A deleted row does not move max(updated_at): only the ETag, which
+    # includes the row count, can tell that a collection is unchanged
+    return conditional(make_etag(*(token for token, _ in versions)),
+                       max(modified) if modified else None,
+                       check_modified_since=False)
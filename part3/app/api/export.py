@@ -0,0 +1,61 @@
+# app/api/export.py
+"""
+Streaming NDJSON export of whole collections, for the analytics sync.
+"""
+from datetime import datetime, timezone
+
+from flask import Response, current_app, request, stream_with_context
+from flask_restx import Namespace, Resource
+from flask_jwt_extended import jwt_required, get_jwt
+from app.api.representation import dumps
+
+api = Namespace("export", description="Bulk data export")
+
+
+@api.route("/<string:collection>.ndjson")
+@api.param('collection', 'places, reviews or amenities')
+class CollectionExport(Resource):
+    @api.doc('export_collection', security='Bearer Auth', params={
+        'since': 'ISO 8601 datetime; only rows updated at or after it'
+    })
+    @api.response(200, 'One JSON object per line, ordered by updated_at')
+    @api.response(403, 'Admin access required')
+    @api.response(404, 'Unknown collection')
+    @jwt_required()
+    def get(self, collection):
+        """
+        Stream every row of a collection as newline-delimited JSON (Admin only).
+
+        Rows are read from the database in batches while the response is
+        written, so memory use does not depend on the table size. Pass the
+        largest updated_at already received as ?since= to pull increments;
+        rows updated at that exact time are sent again.
+        """
+        from app import facade
+
+        if not get_jwt().get('is_admin', False):
+            return {'message': 'Admin privileges required'}, 403
+
+        since = request.args.get('since')
+        if since:
+            try:
+                since = datetime.fromisoformat(since)
+            except ValueError:
+                return {'message': 'since must be an ISO 8601 datetime'}, 400
+            # Timestamps are stored as naive UTC
+            if since.tzinfo is not None:
+                since = since.astimezone(timezone.utc).replace(tzinfo=None)
+
+        try:
+            rows = facade.iter_collection(
+                collection, since=since or None,
+                batch_size=current_app.config.get('EXPORT_BATCH_SIZE', 1000)
+            )
+        except ValueError as e:
+            return {'message': str(e)}, 404
+
+        def generate():
+            for obj in rows:
+                yield dumps(obj.to_dict()) + b'\n'
+
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
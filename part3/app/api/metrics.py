@@ -0,0 +1,24 @@
+# app/api/metrics.py
+"""
+Prometheus endpoint exposing the metrics registry.
+"""
+from flask import Response
+from flask_restx import Namespace, Resource
+
+from app.metrics import registry
+
+api = Namespace("metrics", description="Prometheus metrics")
+
+
+@api.route("")
+class Metrics(Resource):
+    @api.doc('get_metrics')
+    @api.response(200, 'Metrics in the Prometheus text exposition format')
+    def get(self):
+        """
+        Metrics of this worker process.
+
+        Each gunicorn worker keeps its own registry, so scrape every worker
+        (or aggregate by instance) rather than a load-balanced address.
+        """
+        return Response(registry.render(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,90 @@
+# app/api/params.py
+"""
+Query string helpers shared by the API namespaces.
+"""
+from flask import current_app, request
+
+
+def get_page_args(api):
+    """
+    Read the ?limit= and ?cursor= pagination arguments.
+
+    Args:
+        api: Namespace used to abort with 400 on invalid input
+
+    Returns:
+        Tuple (limit, cursor) with limit clamped to PAGE_MAX_LIMIT
+    """
+    default_limit = current_app.config.get('PAGE_DEFAULT_LIMIT', 20)
+    max_limit = current_app.config.get('PAGE_MAX_LIMIT', 100)
+
+    try:
+        limit = int(request.args.get('limit', default_limit))
+    except ValueError:
+        api.abort(400, "limit must be an integer")
+    if limit < 1:
+        api.abort(400, "limit must be positive")
+
+    return min(limit, max_limit), request.args.get('cursor') or None
+
+
+def get_float_arg(api, name):
+    """
+    Read an optional numeric query string argument.
+
+    Args:
+        api: Namespace used to abort with 400 on invalid input
+        name: Argument name
+
+    Returns:
+        Float value or None if the argument is absent
+    """
+    value = request.args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        api.abort(400, f"{name} must be a number")
+
+
+def get_include_arg(api, allowed):
+    """
+    Read the optional ?include= list of related data to embed.
+
+    Args:
+        api: Namespace used to abort with 400 on invalid input
+        allowed: Accepted names
+
+    Returns:
+        Tuple of requested names, empty if the argument is absent
+    """
+    value = request.args.get('include', '')
+    names = tuple(name.strip() for name in value.split(',') if name.strip())
+    unknown = [name for name in names if name not in allowed]
+    if unknown:
+        api.abort(400, f"Cannot include {', '.join(unknown)}; "
+                       f"choose from {', '.join(allowed)}")
+    return names
+
+
+def get_fields_arg(api, allowed):
+    """
+    Read the optional ?fields= projection of the serialized fields.
+
+    Args:
+        api: Namespace used to abort with 400 on invalid input
+        allowed: Accepted names, see BaseModel.serializable_fields()
+
+    Returns:
+        Frozenset of requested names, or None if the argument is absent
+    """
+    value = request.args.get('fields', '')
+    names = frozenset(name.strip() for name in value.split(',') if name.strip())
+    if not names:
+        return None
+    unknown = sorted(names.difference(allowed))
+    if unknown:
+        api.abort(400, f"Unknown fields {', '.join(unknown)}; "
+                       f"choose from {', '.join(allowed)}")
+    return names
@@ -2,8 +2,14 @@
 Places API endpoints with JWT authentication and ownership validation.
 """
 from flask_restx import Namespace, Resource, fields
+from flask import request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app import cache
 from app.business.facade import facade
+from app.api.params import get_page_args, get_fields_arg, get_float_arg, get_include_arg
+from app.api.batch import BatchReport, batch_models, read_batch
+from app.api.conditional import collection_conditional, resource_conditional
+from app.models.place import Place as PlaceModel
 
 api = Namespace('places', description='Place operations')
 
@@ -17,16 +23,71 @@ place_model = api.model('Place', {
     'owner_id': fields.String(description='Owner user ID'),
 })
 
+place_update_model = api.model('PlaceUpdate', {
+    'title': fields.String(description='Place title'),
+    'description': fields.String(description='Place description'),
+    'price': fields.Float(description='Price per night'),
+    'latitude': fields.Float(description='Latitude coordinate'),
+    'longitude': fields.Float(description='Longitude coordinate')
+})
+
+place_batch_model, place_batch_result_model = batch_models(
+    api, 'Place', place_model, place_update_model)
+
+# Collection holding the data embedded by each ?include= name
+INCLUDE_COLLECTIONS = {
+    'owner': 'users',
+    'amenities': 'amenities',
+    'reviews': 'reviews'
+}
+
+
+def included_versions(include):
+    """Versions of the collections embedded in a response, for its ETag."""
+    return [facade.collection_version(INCLUDE_COLLECTIONS[name])
+            for name in include if name in INCLUDE_COLLECTIONS]
+
 
 @api.route('/')
 class PlaceList(Resource):
-    @api.doc('list_places')
+    @api.doc('list_places', params={
+        'limit': 'Maximum number of places to return',
+        'cursor': 'Cursor of the next page, from a previous response',
+        'sort': 'created_at, price or rating, prefixed with - for descending',
+        'min_price': 'Minimum price per night',
+        'max_price': 'Maximum price per night',
+        'lat_min': 'Southern edge of the bounding box',
+        'lat_max': 'Northern edge of the bounding box',
+        'lon_min': 'Western edge of the bounding box',
+        'lon_max': 'Eastern edge of the bounding box',
+        'include': 'Comma separated owner, amenities, reviews, review_summary',
+        'fields': 'Comma separated place fields to return, all by default'
+    })
     @jwt_required()
+    @cache.cached('places', check_modified_since=False)
     def get(self):
-        """List all places"""
+        """Search places, one page at a time"""
+        limit, cursor = get_page_args(api)
+        filters = {name: get_float_arg(api, name) for name in (
+            'min_price', 'max_price', 'lat_min', 'lat_max', 'lon_min', 'lon_max'
+        )}
+        include = get_include_arg(api, PlaceModel.INCLUDES)
+        fields = get_fields_arg(api, PlaceModel.serializable_fields())
+        headers = collection_conditional(
+            facade.collection_version('places'), *included_versions(include))
         try:
-            places = facade.get_all_places()
-            return [place.to_dict() for place in places], 200
+            page = facade.list_places(
+                limit, cursor,
+                sort=request.args.get('sort', 'created_at'),
+                include=include,
+                **filters
+            )
+            return {
+                'items': [place.to_dict(include, fields) for place in page.items],
+                'next': page.next_cursor
+            }, 200, headers
+        except ValueError as e:
+            return {'message': str(e)}, 400
         except Exception as e:
             return {'message': f'Error fetching places: {str(e)}'}, 500
 
@@ -45,17 +106,95 @@ class PlaceList(Resource):
         except Exception as e:
             return {'message': f'Error creating place: {str(e)}'}, 400
 
+@api.route('/batch')
+class PlaceBatch(Resource):
+    @api.doc('batch_places')
+    @api.expect(place_batch_model, validate=True)
+    @api.response(200, 'Outcome of every item', place_batch_result_model)
+    @jwt_required()
+    def post(self):
+        """Create, update and delete places in bulk, one transaction per operation"""
+        current_user_id = get_jwt_identity()
+        is_admin = get_jwt().get('is_admin', False)
+        create, update, delete = read_batch(api, place_update_model)
+        report = BatchReport()
+        try:
+            report.record('create', facade.create_places(
+                [dict(item, owner_id=current_user_id) for item in create]))
+
+            existing = facade.get_places([place_id for place_id, _ in update] + delete)
+
+            def check(place_id):
+                place = existing.get(place_id)
+                if not place:
+                    return 'Place not found'
+                if place.owner_id != current_user_id and not is_admin:
+                    return 'Unauthorized'
+                return None
+
+            positions = report.filter('update', update, lambda item: check(item[0]))
+            report.record('update', facade.update_places(
+                [update[i] for i in positions]), positions)
+
+            positions = report.filter('delete', delete, check)
+            report.record('delete', facade.delete_places(
+                [delete[i] for i in positions]), positions)
+        except Exception as e:
+            return {'message': f'Error processing batch: {str(e)}'}, 500
+        return report.to_dict(), 200
+
+@api.route('/nearby')
+class PlaceNearby(Resource):
+    @api.doc('nearby_places', params={
+        'lat': 'Latitude of the center',
+        'lon': 'Longitude of the center',
+        'radius_km': 'Search radius in kilometers',
+        'limit': 'Maximum number of places to return',
+        'fields': 'Comma separated place fields to return, all by default'
+    })
+    @jwt_required()
+    def get(self):
+        """List places within a radius, nearest first"""
+        limit, _ = get_page_args(api)
+        latitude = get_float_arg(api, 'lat')
+        longitude = get_float_arg(api, 'lon')
+        radius_km = get_float_arg(api, 'radius_km')
+        if latitude is None or longitude is None or radius_km is None:
+            return {'message': 'lat, lon and radius_km are required'}, 400
+        fields = get_fields_arg(api, PlaceModel.serializable_fields())
+        headers = collection_conditional(facade.collection_version('places'))
+        try:
+            results = facade.find_places_nearby(latitude, longitude, radius_km, limit)
+            return {
+                'items': [dict(place.to_dict(fields=fields), distance_km=round(distance, 3))
+                          for distance, place in results]
+            }, 200, headers
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except Exception as e:
+            return {'message': f'Error searching places: {str(e)}'}, 500
+
 @api.route('/<string:place_id>')
 class Place(Resource):
-    @api.doc('get_place')
+    @api.doc('get_place', params={
+        'include': 'Comma separated owner, amenities, reviews, review_summary',
+        'fields': 'Comma separated place fields to return, all by default'
+    })
     @jwt_required()
+    @cache.cached('places')
     def get(self, place_id):
-        """Get a place by ID"""
+        """Get a place by ID, with the requested related data"""
+        include = get_include_arg(api, PlaceModel.INCLUDES)
+        fields = get_fields_arg(api, PlaceModel.serializable_fields())
+        place = facade.get_place(place_id)
+        if not place:
+            return {'message': 'Place not found'}, 404
+        # Answer 304 before loading relations or serializing anything
+        headers = resource_conditional(place, *included_versions(include))
         try:
-            place = facade.get_place(place_id)
-            if not place:
-                return {'message': 'Place not found'}, 404
-            return place.to_dict(), 200
+            if include:
+                place = facade.get_place(place_id, include)
+            return place.to_dict(include, fields), 200, headers
         except Exception as e:
             return {'message': f'Error: {str(e)}'}, 500
         
@@ -0,0 +1,65 @@
+# app/api/representation.py
+"""
+JSON encoding of API responses.
+
+orjson is used when it is installed and JSON_BACKEND is 'orjson' (the
+default); it encodes datetimes natively and is several times faster than
+the standard library. Otherwise responses fall back to json, with a
+default hook for datetimes so both backends produce the same output.
+"""
+import json
+from datetime import date, datetime
+from time import perf_counter
+
+from flask import current_app, make_response
+
+from app.instrumentation import add_serialize_time
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def _default(value):
+    """Encode what the standard json module cannot."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _use_orjson():
+    return orjson is not None and current_app.config.get('JSON_BACKEND', 'orjson') == 'orjson'
+
+
+def dumps(data):
+    """
+    Encode data as compact JSON.
+
+    Returns:
+        UTF-8 encoded bytes
+    """
+    if _use_orjson():
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, default=_default, separators=(',', ':')).encode('utf-8')
+
+
+def output_json(data, code, headers=None):
+    """Make a response with a JSON encoded body (flask-restx representation)."""
+    started = perf_counter()
+    if _use_orjson():
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if current_app.debug:
+            option |= orjson.OPT_INDENT_2
+        dumped = orjson.dumps(data, option=option)
+    else:
+        settings = dict(current_app.config.get('RESTX_JSON', {}))
+        settings.setdefault('default', _default)
+        if current_app.debug:
+            settings.setdefault('indent', 4)
+        dumped = json.dumps(data, **settings) + '\n'
+    add_serialize_time(perf_counter() - started)
+
+    response = make_response(dumped, code)
+    response.headers.extend(headers or {})
+    return response
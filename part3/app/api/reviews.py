@@ -2,6 +2,9 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from flask_jwt_extended import get_jwt, jwt_required, get_jwt_identity
+from app.api.params import get_fields_arg, get_page_args
+from app.api.batch import BatchReport, batch_models, read_batch
+from app.api.conditional import collection_conditional, resource_conditional
 
 api = Namespace("reviews", description="Review operations")
 
@@ -16,6 +19,14 @@ review_model = api.model('Review', {
     'updated_at': fields.String(description='Last update date')
 })
 
+# Fields of review_model, output by every endpoint without marshalling
+REVIEW_FIELDS = tuple(review_model)
+
+review_page_model = api.model('ReviewPage', {
+    'items': fields.List(fields.Nested(review_model)),
+    'next': fields.String(description='Cursor of the next page, null on the last page')
+})
+
 review_input_model = api.model('ReviewInput', {
     'rating': fields.Integer(required=True, description='Rating (1-5)', min=1, max=5),
     'comment': fields.String(required=True, description='Review comment'),
@@ -27,21 +38,37 @@ review_update_model = api.model('ReviewUpdate', {
     'comment': fields.String(description='Review comment')
 })
 
+review_batch_model, review_batch_result_model = batch_models(
+    api, 'Review', review_input_model, review_update_model)
+
 
 @api.route("/")
 class ReviewList(Resource):
-    @api.doc('list_reviews')
-    @api.marshal_list_with(review_model)
+    @api.doc('list_reviews', params={
+        'limit': 'Maximum number of reviews to return',
+        'cursor': 'Cursor of the next page, from a previous response',
+        'fields': 'Comma separated review fields to return, all by default'
+    })
+    @api.response(200, 'Success', review_page_model)
     def get(self):
-        """List all reviews"""
+        """List reviews, one page at a time"""
         from app import facade
-        reviews = facade.list_reviews()
-        return [review.to_dict() for review in reviews], 200
+        limit, cursor = get_page_args(api)
+        fields = get_fields_arg(api, REVIEW_FIELDS) or REVIEW_FIELDS
+        headers = collection_conditional(facade.collection_version('reviews'))
+        try:
+            page = facade.list_reviews(limit, cursor)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return {
+            'items': [review.to_dict(fields) for review in page.items],
+            'next': page.next_cursor
+        }, 200, headers
 
     @api.doc('create_review', security='Bearer Auth')
     @jwt_required()
     @api.expect(review_input_model, validate=True)
-    @api.marshal_with(review_model, code=201)
+    @api.response(201, 'Review created', review_model)
     def post(self):
         """Create a new review"""
         from app import facade
@@ -69,39 +96,101 @@ class ReviewList(Resource):
                     return {'message': 'You have already reviewed this place'}, 400
             
             # Create review
-            review = facade.create_review(
-                rating=data['rating'],
-                comment=data['comment'],
-                user_id=current_user_id,
-                place_id=place_id
-            )
+            review = facade.create_review({
+                'rating': data['rating'],
+                'comment': data['comment'],
+                'user_id': current_user_id,
+                'place_id': place_id
+            })
             
-            return review.to_dict(), 201
+            return review.to_dict(REVIEW_FIELDS), 201
 
         except ValueError as e:
             return {'message': str(e)}, 400
         except Exception as e:
             return {'message': f'Error creating review: {str(e)}'}, 500
 
+@api.route("/batch")
+class ReviewBatch(Resource):
+    @api.doc('batch_reviews', security='Bearer Auth')
+    @jwt_required()
+    @api.expect(review_batch_model, validate=True)
+    @api.response(200, 'Outcome of every item', review_batch_result_model)
+    def post(self):
+        """Create, update and delete reviews in bulk, one transaction per operation"""
+        from app import facade
+
+        current_user_id = get_jwt_identity()
+        is_admin = get_jwt().get('is_admin', False)
+        create, update, delete = read_batch(api, review_update_model)
+        report = BatchReport()
+        try:
+            places = facade.get_places(item['place_id'] for item in create)
+            reviewed = {review.place_id for review in facade.get_reviews_by_user(current_user_id)}
+
+            def check_create(item):
+                place = places.get(item['place_id'])
+                if not place:
+                    return 'Place not found'
+                if place.owner_id == current_user_id:
+                    return 'You cannot review your own place'
+                if item['place_id'] in reviewed:
+                    return 'You have already reviewed this place'
+                reviewed.add(item['place_id'])
+                return None
+
+            positions = report.filter('create', create, check_create)
+            report.record('create', facade.create_reviews([{
+                'rating': create[i]['rating'],
+                'comment': create[i]['comment'],
+                'user_id': current_user_id,
+                'place_id': create[i]['place_id']
+            } for i in positions]), positions)
+
+            existing = facade.get_reviews([review_id for review_id, _ in update] + delete)
+
+            def check(review_id):
+                review = existing.get(review_id)
+                if not review:
+                    return 'Review not found'
+                if review.user_id != current_user_id and not is_admin:
+                    return 'You can only modify your own reviews'
+                return None
+
+            positions = report.filter('update', update, lambda item: check(item[0]))
+            report.record('update', facade.update_reviews(
+                [update[i] for i in positions]), positions)
+
+            positions = report.filter('delete', delete, check)
+            report.record('delete', facade.delete_reviews(
+                [delete[i] for i in positions]), positions)
+        except Exception as e:
+            return {'message': f'Error processing batch: {str(e)}'}, 500
+        return report.to_dict(), 200
+
 @api.route("/<string:review_id>")
 @api.param('review_id', 'The review unique identifier')
 class ReviewResource(Resource):
-    @api.doc('get_review')
-    @api.marshal_with(review_model)
+    @api.doc('get_review', params={
+        'fields': 'Comma separated review fields to return, all by default'
+    })
+    @api.response(200, 'Success', review_model)
     @api.response(404, 'Review not found')
     def get(self, review_id):
         """Get a review by ID"""
         from app import facade
+        fields = get_fields_arg(api, REVIEW_FIELDS) or REVIEW_FIELDS
         review = facade.get_review(review_id)
         if not review:
             return {'message': 'Review not found'}, 404
         
-        return review.to_dict(), 200
+        headers = resource_conditional(review)
+        return review.to_dict(fields), 200, headers
 
     @api.doc('update_review', security='Bearer Auth')
     @jwt_required()
     @api.expect(review_model, validate=True)
-    @api.marshal_with(review_model)
+    @api.response(200, 'Review updated', review_model)
     def put(self, review_id):
         """Update a review"""
         from app import facade
@@ -125,8 +214,8 @@ class ReviewResource(Resource):
             data = request.get_json()
             
             # Update review
-            updated_review = facade.update_review(review_id, **data)
-            return updated_review.to_dict(), 200
+            updated_review = facade.update_review(review_id, data)
+            return updated_review.to_dict(REVIEW_FIELDS), 200
 
         except ValueError as e:
             return {'message': str(e)}, 400
@@ -165,7 +254,7 @@ class ReviewResource(Resource):
 @api.param('place_id', 'The place unique identifier')
 class PlaceReviewList(Resource):
     @api.doc('get_place_reviews')
-    @api.marshal_list_with(review_model)
+    @api.response(200, 'Success', [review_model])
     def get(self, place_id):
         """Get all reviews for a specific place"""
         from app import facade
@@ -174,8 +263,9 @@ class PlaceReviewList(Resource):
         if not place:
             return {'message': 'Place not found'}, 404
 
+        headers = collection_conditional(facade.collection_version('reviews'))
         reviews = facade.get_reviews_by_place(place_id)
         if reviews is None:
-            return [], 200
+            return [], 200, headers
         
-        return [review.to_dict() for review in reviews], 200
\ No newline at end of file
+        return [review.to_dict(REVIEW_FIELDS) for review in reviews], 200, headers
\ No newline at end of file
@@ -2,6 +2,8 @@
 from flask_restx import Namespace, Resource, fields
 from flask import request
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
+from app.api.params import get_fields_arg, get_page_args
+from app.hashing import PasswordPoolBusy
 
 api = Namespace("users", description="User operations")
 
@@ -14,6 +16,14 @@ user_model = api.model('User', {
     'is_admin': fields.Boolean(description='Admin status', default=False)
 })
 
+# Fields of user_model, output by the read endpoints without marshalling
+USER_FIELDS = tuple(user_model)
+
+user_page_model = api.model('UserPage', {
+    'items': fields.List(fields.Nested(user_model)),
+    'next': fields.String(description='Cursor of the next page, null on the last page')
+})
+
 # User input model (includes password for creation)
 user_input_model = api.model('UserInput', {
     'first_name': fields.String(required=True, description='User first name'),
@@ -31,17 +41,29 @@ user_update_model = api.model('UserUpdate', {
 
 @api.route("/")
 class UserList(Resource):
-    @api.doc('list_users', security='Bearer Auth')
+    @api.doc('list_users', security='Bearer Auth', params={
+        'limit': 'Maximum number of users to return',
+        'cursor': 'Cursor of the next page, from a previous response',
+        'fields': 'Comma separated user fields to return, all by default'
+    })
     @jwt_required()
-    @api.marshal_list_with(user_model)
+    @api.response(200, 'Success', user_page_model)
     def get(self):
         """
-        List all users (Protected endpoint).
+        List users, one page at a time (Protected endpoint).
         Requires valid JWT token.
         """
         from app import facade
-        users = facade.list_users()
-        return [user.to_dict() for user in users], 200
+        limit, cursor = get_page_args(api)
+        fields = get_fields_arg(api, USER_FIELDS) or USER_FIELDS
+        try:
+            page = facade.list_users(limit, cursor)
+        except ValueError as e:
+            api.abort(400, str(e))
+        return {
+            'items': [user.to_dict(fields) for user in page.items],
+            'next': page.next_cursor
+        }, 200
 
     @api.doc('create_user')
     @api.expect(user_input_model, validate=True)
@@ -64,41 +86,46 @@ class UserList(Resource):
             if existing_user:
                 return {'message': 'Email already registered'}, 400
             
-            # Create user (password will be hashed in User.__init__)
-            user = facade.create_user(
-                first_name=data['first_name'],
-                last_name=data['last_name'],
-                email=data['email'],
-                password=data['password']  # This will be hashed
-            )
+            # Create user (password is hashed on the password pool)
+            user = facade.create_user({
+                'first_name': data['first_name'],
+                'last_name': data['last_name'],
+                'email': data['email'],
+                'password': data['password']
+            })
             
-            # Return user data WITHOUT password
-            return user.to_dict(), 201
+            # Return user data WITHOUT password (marshalled by user_model)
+            return user, 201
             
         except ValueError as e:
             return {'message': str(e)}, 400
+        except PasswordPoolBusy:
+            raise
         except Exception as e:
             return {'message': f'Error creating user: {str(e)}'}, 500
         
 @api.route("/<string:user_id>")
 @api.param('user_id', 'The user unique identifier')
 class UserResource(Resource):
-    @api.doc('get_user', security='Bearer Auth')
+    @api.doc('get_user', security='Bearer Auth', params={
+        'fields': 'Comma separated user fields to return, all by default'
+    })
     @jwt_required()
-    @api.marshal_with(user_model)
+    @api.response(200, 'Success', user_model)
     def get(self, user_id):
         """
         Get a user by ID (Protected endpoint).
         Requires valid JWT token.
         """
         from app import facade
+        fields = get_fields_arg(api, USER_FIELDS) or USER_FIELDS
 
         user = facade.get_user(user_id)
         if not user:
             return {'message': 'User not found'}, 404
 
 # Password automatically excluded by to_dict()
-        return user.to_dict(), 200
+        return user.to_dict(fields), 200
     
     @api.doc('update_user', security='Bearer Auth')
     @jwt_required()
@@ -139,13 +166,15 @@ class UserResource(Resource):
                 return {'message': 'Only admins can change admin status'}, 403
             
             # Update user (password will be hashed if provided)
-            updated_user = facade.update_user(user_id, **data)
+            updated_user = facade.update_user(user_id, data)
             
-            # Return user data WITHOUT password
-            return updated_user.to_dict(), 200
+            # Return user data WITHOUT password (marshalled by user_model)
+            return updated_user, 200
             
         except ValueError as e:
             return {'message': str(e)}, 400
+        except PasswordPoolBusy:
+            raise
         except Exception as e:
             return {'message': f'Error updating user: {str(e)}'}, 500
 
@@ -1,136 +1,636 @@
+import logging
 import os
+from contextlib import ExitStack, contextmanager
+from functools import cached_property
+from flask import current_app
+from sqlalchemy.orm.attributes import set_committed_value
+from werkzeug.local import LocalProxy
+from app.persistence import geo
+from app.caching import invalidates
+from app.persistence.batch import BatchResult
+from app.persistence.routing import read_only
+
+logger = logging.getLogger(__name__)
 
 class HBnBFacade:
     """Facade for managing business logic operations using SQLAlchemy repository."""
 
-    def __init__(self):
-        """Initialize facade with appropriate repository."""
-        # Read environment variable
-        use_db = os.getenv('USE_DATABASE', 'false').lower() == 'true'
-        
-        if use_db:
-            # SQLAlchemy repositories (requires models to be mapped)
-            # This will be activated in Task 6 after model mapping
-            print("✅ Using SQLAlchemy repository")
+    # Sort names accepted by list_places and the attribute each one orders by
+    PLACE_SORTS = {
+        'created_at': 'created_at',
+        'price': 'price',
+        'rating': 'average_rating'
+    }
+    # Largest radius accepted by find_places_nearby
+    MAX_NEARBY_RADIUS_KM = 1000
+
+    def __init__(self, use_database=None, journal_dir=None, journal_options=None):
+        """
+        Initialize the facade; repositories are only built on first use.
+
+        Args:
+            use_database: True for the SQLAlchemy repositories, False for the
+                in-memory ones, None to read the USE_DATABASE variable
+            journal_dir: Directory where the in-memory repositories keep a
+                snapshot and journal to survive restarts, None for none
+            journal_options: Extra Journal arguments (sync, sync_interval,
+                snapshot_every)
+        """
+        if use_database is None:
+            use_database = os.getenv('USE_DATABASE', 'false').lower() == 'true'
+        self.use_database = use_database
+        self.journal_dir = journal_dir
+        self.journal_options = journal_options
+
+    def _make_repository(self, model_name, **memory_options):
+        """Build the repository of a model for the configured storage."""
+        if self.use_database:
+            # Model imports are deferred so importing the facade stays cheap
             from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
-            from app.models.user import User as UserModel
-            from app.models.place import Place as PlaceModel
-            from app.models.review import Review as ReviewModel
-            from app.models.amenity import Amenity as AmenityModel
-
-            self.user_repo = SQLAlchemyRepository(UserModel)
-            self.place_repo = SQLAlchemyRepository(PlaceModel)
-            self.review_repo = SQLAlchemyRepository(ReviewModel)
-            self.amenity_repo = SQLAlchemyRepository(AmenityModel)
-        else:
-            # In-memory repositories (current implementation)
-            print("✅ Using InMemory repository")
-            from app.persistence.memory_repository import InMemoryRepository
-            self.user_repo = InMemoryRepository()
-            self.place_repo = InMemoryRepository()
-            self.review_repo = InMemoryRepository()
-            self.amenity_repo = InMemoryRepository()
+            from app import models
+            logger.info("Using SQLAlchemy repository for %s", model_name)
+            return SQLAlchemyRepository(getattr(models, model_name))
+        if self.journal_dir:
+            from app.persistence.journal import DurableInMemoryRepository
+            from app import models
+            logger.info("Using journaled InMemory repository for %s in %s",
+                        model_name, self.journal_dir)
+            return DurableInMemoryRepository(getattr(models, model_name), self.journal_dir,
+                                             self.journal_options, **memory_options)
+        from app.persistence.memory_repository import InMemoryRepository
+        logger.info("Using InMemory repository for %s", model_name)
+        return InMemoryRepository(**memory_options)
+
+    @cached_property
+    def user_repo(self):
+        return self._make_repository('User', unique_indexes=('email',))
+
+    @cached_property
+    def place_repo(self):
+        return self._make_repository(
+            'Place',
+            indexes=('owner_id',),
+            ordered_indexes=('price', 'latitude', 'longitude', 'geo_cell', 'average_rating'),
+            columns=('created_at', 'price', 'latitude', 'longitude', 'average_rating')
+        )
+
+    @cached_property
+    def review_repo(self):
+        return self._make_repository('Review', indexes=('place_id', 'user_id'))
+
+    @cached_property
+    def amenity_repo(self):
+        return self._make_repository('Amenity', unique_indexes=('name',))
 
     # ----- USER OPERATIONS -----
+    @invalidates('users', 'places')
     def create_user(self, user_data):
         """Create a new user with hashed password."""
         from app.models.user import User
+        user_data = dict(user_data)
+        password = user_data.pop('password', None)
         user = User(**user_data)
-        return  self.user_repo.add(user)
+        if password:
+            user.set_password(password)
+        return self.user_repo.add(user)
     
+    @read_only
     def get_user(self, user_id):
         """Get a user by ID"""
         return self.user_repo.get(user_id)
 
+    @read_only
     def get_user_by_email(self, email):
         """Get a user by email"""
         return self.user_repo.get_by_attribute('email', email)
 
+    @read_only
     def get_all_users(self):
         """Get all users."""
         return self.user_repo.get_all()
 
+    @read_only
+    def list_users(self, limit, cursor=None):
+        """Get one page of users ordered by creation date."""
+        return self.user_repo.get_page(limit, cursor)
+
+    @invalidates('users', 'places')
     def update_user(self, user_id, user_data):
         """Update a user information (handle password hashing inside repo)"""
         return self.user_repo.update(user_id, user_data)
 
+    def rehash_password(self, user_id, password):
+        """
+        Store a new hash of a verified password, made with the configured cost.
+
+        Only the hash is written: updated_at and the caches are left alone,
+        the hash is never output.
+
+        Raises:
+            PasswordPoolBusy: If the password pool is saturated
+        """
+        from app import hasher
+        return self.user_repo.set_columns(user_id, {'_password_hash': hasher.hash(password)})
+
+    @invalidates('users', 'places', 'reviews')
     def delete_user(self, user_id):
-        """Delete user."""
-        self.user_repo.delete(user_id)
+        """
+        Delete a user with their places and reviews.
+
+        The ratings of the user's reviews are removed from the aggregates
+        of the places they reviewed. The database cascades to the places
+        of the user; in memory they are deleted here.
+        """
+        with self._transaction('users', 'places', 'reviews'):
+            owned = [place.id for place in self.place_repo.get_all_by_attribute('owner_id', user_id)]
+            reviews = self.review_repo.get_all_by_attribute('user_id', user_id)
+            self.review_repo.delete_many([review.id for review in reviews])
+            # The aggregates of the user's own places go away with them
+            self._increment_ratings((review.place_id, None, review.rating)
+                                    for review in reviews if review.place_id not in owned)
+            if not self.use_database:
+                self._delete_place_reviews(owned)
+                self.place_repo.delete_many(owned)
+            self.user_repo.delete(user_id)
 
     # ----- PLACE OPERATIONS -----
+    @invalidates('places')
     def create_place(self, place_data):
         """Create a new place."""
         from app.models.place import Place
         place = Place(**place_data)
         return self.place_repo.add(place)
 
-    def get_place(self, place_id):
-        """Get a place by ID"""
-        return self.place_repo.get(place_id)
+    @read_only
+    def get_place(self, place_id, include=()):
+        """
+        Get a place by ID.
+
+        Args:
+            place_id: Place ID
+            include: Relations to load with the place (see Place.INCLUDES)
+
+        Returns:
+            Place or None if not found
+        """
+        place = self.place_repo.get(place_id, include=include)
+        if place is not None:
+            place, = self._attach_place_relations([place], include)
+        return place
+
+    def _attach_place_relations(self, places, include):
+        """
+        Load place relations from the in-memory repositories.
+
+        The SQLAlchemy repository eager-loads them in the query; in memory
+        the related objects live in other repositories, so they are looked
+        up through their indexes and set as already-loaded values. Stored
+        objects are shared and never modified, so the values are set on
+        copies of the places.
+
+        Returns:
+            List of the places, or of their copies with the relations
+        """
+        if self.use_database or not {'owner', 'reviews'} & set(include):
+            return places
+        attached = []
+        for place in places:
+            place = self.place_repo._copy(place)
+            if 'owner' in include:
+                set_committed_value(place, 'owner', self.user_repo.get(place.owner_id))
+            if 'reviews' in include:
+                set_committed_value(place, 'reviews',
+                                    self.review_repo.get_all_by_attribute('place_id', place.id))
+            attached.append(place)
+        return attached
     
+    @read_only
     def get_all_places(self):
         """Get all places."""
         return self.place_repo.get_all()
+
+    @read_only
+    def list_places(self, limit, cursor=None, sort='created_at',
+                    min_price=None, max_price=None,
+                    lat_min=None, lat_max=None, lon_min=None, lon_max=None,
+                    include=()):
+        """
+        Get one page of places within a price range and bounding box.
+
+        Args:
+            limit: Maximum number of places to return
+            cursor: Cursor returned with the previous page, or None
+            sort: 'created_at', 'price' or 'rating', prefixed with '-' for descending
+            min_price, max_price: Inclusive price bounds
+            lat_min, lat_max, lon_min, lon_max: Inclusive bounding box
+            include: Relations to load with the places (see Place.INCLUDES)
+
+        Returns:
+            Page of places with the cursor of the next page
+        """
+        order_by = self.PLACE_SORTS.get(sort.lstrip('-'))
+        if order_by is None:
+            raise ValueError(f"Invalid sort: {sort}")
+        ranges = {
+            'price': (min_price, max_price),
+            'latitude': (lat_min, lat_max),
+            'longitude': (lon_min, lon_max)
+        }
+        page = self.place_repo.get_page(
+            limit, cursor,
+            order_by=order_by,
+            descending=sort.startswith('-'),
+            ranges=ranges,
+            include=include
+        )
+        return page._replace(items=self._attach_place_relations(page.items, include))
     
+    @read_only
+    def find_places_nearby(self, latitude, longitude, radius_km, limit):
+        """
+        Find the places within a radius, nearest first.
+
+        Candidates come from the grid-cell index and are refined with the
+        haversine distance. Radii over geo.MAX_CELL_ROWS rows (~710 km) read
+        the bounding box of the circle instead. MAX_NEARBY_RADIUS_KM caps
+        its latitude band at 18 degrees: the index walk then visits that
+        band, at most a tenth of the places for evenly spread ones. Only
+        the places in the box are returned and refined.
+
+        Args:
+            latitude: Center latitude in degrees
+            longitude: Center longitude in degrees
+            radius_km: Search radius in kilometers
+            limit: Maximum number of places to return
+
+        Returns:
+            List of (distance_km, place) tuples sorted by distance
+        """
+        if not -90 <= latitude <= 90:
+            raise ValueError("Latitude must be between -90 and 90")
+        if not -180 <= longitude <= 180:
+            raise ValueError("Longitude must be between -180 and 180")
+        if not 0 < radius_km <= self.MAX_NEARBY_RADIUS_KM:
+            raise ValueError(f"Radius must be between 0 and {self.MAX_NEARBY_RADIUS_KM} km")
+
+        (lat_min, lat_max), lon_intervals = geo.bounding_box(latitude, longitude, radius_km)
+        latitude_band = {'latitude': (lat_min, lat_max)}
+        cells = geo.cell_ranges(latitude, longitude, radius_km)
+        if cells is not None:
+            candidates = self.place_repo.find_within('geo_cell', cells, latitude_band)
+        elif len(lon_intervals) == 1:
+            candidates = self.place_repo.find_within('latitude', [(lat_min, lat_max)],
+                                                     {'longitude': lon_intervals[0]})
+        else:
+            # Across the antimeridian: one interval per side, within the band
+            candidates = self.place_repo.find_within('longitude', lon_intervals, latitude_band)
+        return geo.nearest(latitude, longitude, candidates, radius_km, limit)
+
+    @read_only
+    def get_places(self, place_ids):
+        """Get several places by ID as a dictionary {id: place}"""
+        return self.place_repo.get_many(place_ids)
+
+    @invalidates('places')
+    def create_places(self, items):
+        """Create places in one transaction, see _add_many."""
+        from app.models.place import Place
+        return self._add_many(self.place_repo, Place, items)
+
+    @invalidates('places')
+    def update_places(self, updates):
+        """Apply (place_id, data) updates in one transaction."""
+        return self.place_repo.update_many(updates)
+
+    @invalidates('places', 'reviews')
+    def delete_places(self, place_ids):
+        """Delete places (and their reviews) in one transaction."""
+        place_ids = list(place_ids)
+        with self._transaction('places', 'reviews'):
+            self._delete_place_reviews(place_ids)
+            return self.place_repo.delete_many(place_ids)
+
+    @invalidates('places')
     def update_place(self, place_id, place_data):
         """Update a place"""
         return self.place_repo.update(place_id, place_data)
     
+    @invalidates('places', 'reviews')
     def delete_place(self, place_id):
         """Delete a place and all its associated reviews."""
-        self.place_repo.delete(place_id)
+        with self._transaction('places', 'reviews'):
+            self._delete_place_reviews([place_id])
+            self.place_repo.delete(place_id)
+
+    def _delete_place_reviews(self, place_ids):
+        """
+        Delete the reviews of places about to be deleted.
+
+        The database cascades the place deletes to their reviews; the
+        in-memory repositories do not, so the reviews are deleted here.
+        Their ratings leave with the places, the aggregates are untouched.
+        """
+        if self.use_database:
+            return
+        self.review_repo.delete_many([review.id for place_id in place_ids
+                                      for review in self.review_repo.get_all_by_attribute(
+                                          'place_id', place_id)])
 
     # ----- REVIEW OPERATIONS -----
+    @invalidates('reviews', 'places')
     def create_review(self, review_data):
-        """Create a new review."""
+        """Create a new review and count it in the place rating aggregates."""
         from app.models.review import Review
+        from app.models.place import Place
         review = Review(**review_data)
-        return self.review_repo.add(review)
+        with self._transaction('places', 'reviews'):
+            review = self.review_repo.add(review)
+            self.place_repo.increment(review.place_id, Place.rating_deltas(added=review.rating))
+        return review
     
+    @read_only
     def get_review(self, review_id):
         """Get a review by ID"""
         return self.review_repo.get(review_id)
     
+    @read_only
     def get_all_reviews(self):
         """Get all reviews."""
         return self.review_repo.get_all()
+
+    @read_only
+    def list_reviews(self, limit, cursor=None):
+        """Get one page of reviews ordered by creation date."""
+        return self.review_repo.get_page(limit, cursor)
     
+    @read_only
     def get_reviews_by_place(self, place_id):
         """Get all reviews for a specific place"""
-        all_reviews = self.review_repo.get_all()
-        return [r for r in all_reviews if r.place_id == place_id]
+        return self.review_repo.get_all_by_attribute('place_id', place_id)
+
+    @read_only
+    def get_reviews_by_user(self, user_id):
+        """Get all reviews written by a user"""
+        return self.review_repo.get_all_by_attribute('user_id', user_id)
 
+    @read_only
+    def get_reviews(self, review_ids):
+        """Get several reviews by ID as a dictionary {id: review}"""
+        return self.review_repo.get_many(review_ids)
+
+    @invalidates('reviews', 'places')
+    def create_reviews(self, items):
+        """Create reviews and count them in the place aggregates, in one transaction."""
+        from app.models.review import Review
+        with self._transaction('places', 'reviews'):
+            result = self._add_many(self.review_repo, Review, items)
+            self._increment_ratings(
+                (review.place_id, review.rating, None) for review in result.items.values())
+        return result
+
+    @invalidates('reviews', 'places')
+    def update_reviews(self, updates):
+        """Apply (review_id, data) updates and move their ratings, in one transaction."""
+        with self._transaction('places', 'reviews'):
+            # Read the old values first: in the database the objects are updated in place
+            before = {review_id: (review.place_id, review.rating)
+                      for review_id, review in self.review_repo.get_many(
+                          review_id for review_id, _ in updates).items()}
+            result = self.review_repo.update_many(updates)
+            changes = []
+            for review in result.items.values():
+                old_place_id, old_rating = before[review.id]
+                changes.append((old_place_id, None, old_rating))
+                changes.append((review.place_id, review.rating, None))
+            self._increment_ratings(changes)
+        return result
+
+    @invalidates('reviews', 'places')
+    def delete_reviews(self, review_ids):
+        """Delete reviews and remove them from the aggregates, in one transaction."""
+        with self._transaction('places', 'reviews'):
+            before = {review_id: (review.place_id, review.rating)
+                      for review_id, review in self.review_repo.get_many(review_ids).items()}
+            result = self.review_repo.delete_many(review_ids)
+            self._increment_ratings(
+                (before[review_id][0], None, before[review_id][1])
+                for review_id in result.items.values())
+        return result
+
+    def _increment_ratings(self, changes):
+        """
+        Apply rating changes to the place aggregates, one increment per place.
+
+        Args:
+            changes: Iterable of (place_id, added_rating, removed_rating)
+        """
+        from app.models.place import Place
+        per_place = {}
+        for place_id, added, removed in changes:
+            totals = per_place.setdefault(place_id, {})
+            for key, delta in Place.rating_deltas(added=added, removed=removed).items():
+                totals[key] = totals.get(key, 0) + delta
+        for place_id, totals in per_place.items():
+            deltas = {key: delta for key, delta in totals.items() if delta}
+            if deltas:
+                self.place_repo.increment(place_id, deltas)
+
+    @invalidates('places')
+    def recompute_ratings(self):
+        """
+        Rebuild the place rating aggregates from the reviews.
+
+        Repairs aggregates that no longer match the reviews, e.g. after a
+        crash between the journal records of a review and of its place:
+        each in-memory repository has its own journal.
+
+        Returns:
+            Number of places whose aggregates were corrected
+        """
+        from app.models.place import Place
+        with self._transaction('places', 'reviews'):
+            totals = {}
+            for review in self.review_repo.iter_all():
+                place_totals = totals.setdefault(review.place_id, {})
+                for key, delta in Place.rating_deltas(added=review.rating).items():
+                    place_totals[key] = place_totals.get(key, 0) + delta
+            corrected = 0
+            for place in list(self.place_repo.iter_all()):
+                values = dict.fromkeys(Place.RATING_COLUMNS, 0)
+                values.update(totals.get(place.id, {}))
+                if any(getattr(place, key) != value for key, value in values.items()):
+                    self.place_repo.update(place.id, values)
+                    corrected += 1
+        return corrected
+
+    @invalidates('reviews', 'places')
     def update_review(self, review_id, review_data):
-        """Update a review"""
-        return self.review_repo.update(review_id, review_data)
+        """Update a review and move its rating in the place aggregates"""
+        with self._transaction('places', 'reviews'):
+            review = self.review_repo.get(review_id)
+            if not review:
+                return None
+            old_place_id, old_rating = review.place_id, review.rating
+
+            review = self.review_repo.update(review_id, review_data)
+            self._increment_ratings([(old_place_id, None, old_rating),
+                                     (review.place_id, review.rating, None)])
+        return review
 
+    @invalidates('reviews', 'places')
     def delete_review(self, review_id):
-        """Delete a review"""
-        self.review_repo.delete(review_id)
+        """Delete a review and remove it from the place rating aggregates"""
+        from app.models.place import Place
+        with self._transaction('places', 'reviews'):
+            review = self.review_repo.get(review_id)
+            if not review:
+                return
+            place_id, rating = review.place_id, review.rating
+            self.review_repo.delete(review_id)
+            self.place_repo.increment(place_id, Place.rating_deltas(removed=rating))
 
     # ----- AMENITY OPERATIONS -----
+    @invalidates('amenities', 'places')
     def create_amenity(self, amenity_data):
         """Create a new amenity"""
         from app.models.amenity import Amenity
         amenity = Amenity(**amenity_data)
         return self.amenity_repo.add(amenity)
 
+    @read_only
     def get_amenity(self, amenity_id):
         """Get an amenity by ID"""
         return self.amenity_repo.get(amenity_id)
     
+    @read_only
     def get_all_amenities(self):
         """Get all amenities."""
         return self.amenity_repo.get_all()
+
+    @read_only
+    def list_amenities(self, limit, cursor=None):
+        """Get one page of amenities ordered by creation date."""
+        return self.amenity_repo.get_page(limit, cursor)
     
+    @invalidates('amenities', 'places')
+    def create_amenities(self, items):
+        """Create amenities in one transaction, see _add_many."""
+        from app.models.amenity import Amenity
+        return self._add_many(self.amenity_repo, Amenity, items)
+
+    @invalidates('amenities', 'places')
+    def update_amenities(self, updates):
+        """Apply (amenity_id, data) updates in one transaction."""
+        return self.amenity_repo.update_many(updates)
+
+    @invalidates('amenities', 'places')
+    def delete_amenities(self, amenity_ids):
+        """Delete amenities in one transaction."""
+        return self.amenity_repo.delete_many(amenity_ids)
+
+    @invalidates('amenities', 'places')
     def update_amenity(self, amenity_id, amenity_data):
         """Update an amenity"""
         return self.amenity_repo.update(amenity_id, amenity_data)
     
+    @invalidates('amenities', 'places')
     def delete_amenity(self, amenity_id):
         """Delete amenity."""
         self.amenity_repo.delete(amenity_id)
 
-# Global facade instance
-facade = HBnBFacade()
\ No newline at end of file
+    # ----- COLLECTION OPERATIONS -----
+    # Collections served by the export endpoint
+    EXPORTS = ('places', 'reviews', 'amenities')
+
+    @contextmanager
+    def _transaction(self, *names):
+        """
+        Make the writes of a block to several collections one transaction.
+
+        The SQLAlchemy repositories share the session, which commits once
+        at the end of the block. The in-memory repositories are locked for
+        the block, always in users, places, reviews, amenities order so
+        that two blocks never wait for each other.
+
+        Args:
+            names: Collections written by the block
+        """
+        with ExitStack() as stack:
+            for name in ('users', 'places', 'reviews', 'amenities'):
+                if name in names:
+                    stack.enter_context(self._repository(name).transaction())
+            yield
+
+    def _repository(self, name):
+        """Get the repository of a collection by name."""
+        return {
+            'users': self.user_repo,
+            'places': self.place_repo,
+            'reviews': self.review_repo,
+            'amenities': self.amenity_repo
+        }[name]
+
+    @read_only
+    def collection_version(self, name):
+        """
+        Get the version of a collection, for conditional requests.
+
+        Args:
+            name: 'users', 'places', 'reviews' or 'amenities'
+
+        Returns:
+            Tuple (token, last_modified); the token changes on every write
+        """
+        return self._repository(name).version()
+
+    @read_only
+    def iter_collection(self, name, since=None, batch_size=1000):
+        """
+        Iterate over a whole collection ordered by (updated_at, id).
+
+        Args:
+            name: One of EXPORTS
+            since: Only objects updated at or after this datetime, or None
+            batch_size: Rows fetched per database round trip
+
+        Returns:
+            Iterator of objects
+
+        Raises:
+            ValueError: If the collection cannot be exported
+        """
+        if name not in self.EXPORTS:
+            raise ValueError(f"Unknown collection: {name}")
+        return self._repository(name).iter_all(since=since, batch_size=batch_size)
+
+    # ----- BATCH OPERATIONS -----
+    def _add_many(self, repo, model, items):
+        """
+        Build model objects and add the valid ones in one transaction.
+
+        Args:
+            repo: Repository to add to
+            model: Model class called with each item as keyword arguments
+            items: List of attribute dictionaries
+
+        Returns:
+            BatchResult keyed by position in items, with validation and
+            constraint errors
+        """
+        objs, positions, errors = [], [], {}
+        for index, data in enumerate(items):
+            try:
+                objs.append(model(**data))
+            except (TypeError, ValueError) as e:
+                errors[index] = str(e)
+            else:
+                positions.append(index)
+
+        result = repo.add_many(objs)
+        errors.update({positions[i]: message for i, message in result.errors.items()})
+        return BatchResult({positions[i]: obj for i, obj in result.items.items()}, errors)
+
+
+
+# Facade of the current application, created by create_app
+facade = LocalProxy(lambda: current_app.extensions['facade'])
\ No newline at end of file
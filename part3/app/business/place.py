@@ -1,9 +1,15 @@
 # app/business/place.py
-from app.business.base_model import BaseModel
+from app.business.base_model import BaseModel, LazyList
 
 class Place(BaseModel):
     """Place entity representing a property listing"""
 
+    __slots__ = ('title', 'description', 'price', 'latitude', 'longitude', 'owner_id',
+                 'geo_cell', '_reviews', '_amenities')
+
+    reviews = LazyList()
+    amenities = LazyList()
+
     def __init__(self, title, description, price, latitude, longitude, owner_id):
         super().__init__()
         self.title = self._validate_title(title)
@@ -12,8 +18,8 @@ class Place(BaseModel):
         self.latitude = self._validate_latitude(latitude)
         self.longitude = self._validate_longitude(longitude)
         self.owner_id = owner_id
-        self.reviews = []
-        self.amenities = []
+        # Cell of the geo index (see app.persistence.geo), set by the caller
+        self.geo_cell = None
     
     def _validate_title(self, title):
         """Validate place title."""
@@ -1,19 +1,22 @@
 # app/business/user.py
 import re
-from app.business.base_model import BaseModel
-from app import bcrypt
+from app.business.base_model import BaseModel, LazyList
+from app import hasher
 
 class User(BaseModel):
     """User entity representing a system user"""
 
+    __slots__ = ('first_name', 'last_name', 'email', 'is_admin', '_password_hash', '_places', '_reviews')
+
+    places = LazyList()
+    reviews = LazyList()
+
     def __init__(self, first_name, last_name, email, password, is_admin=False):
         super().__init__()
         self.first_name = first_name
         self.last_name = last_name
         self.email = self._validate_email(email)
         self.is_admin = is_admin
-        self.places = []
-        self.reviews = []
 
  # Hash password on creation
         if password:
@@ -33,15 +36,15 @@ class User(BaseModel):
         if not password:
             raise ValueError("Password cannot be empty")
         
-         # Generate password hash
-        self._password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+         # Generate password hash on the password worker pool
+        self._password_hash = hasher.hash(password)
 
     def verify_password(self, password):
          """Verify a password against the stored hash."""
          if not self._password_hash:
             return False
     
-         return bcrypt.check_password_hash(self._password_hash, password)
+         return hasher.verify(self._password_hash, password)
 
     def update_profile(self, **kwargs):
         """Update user attributes safely."""
@@ -0,0 +1,228 @@
+"""
+Response cache for hot read endpoints.
+
+Cached responses are grouped in namespaces ('places', 'amenities', ...).
+Each namespace has a generation counter that is part of every key, so
+invalidating a namespace is a single increment: entries of the old
+generation are never read again and age out of the backend.
+
+Two backends are available:
+    lru    In-process LRU dictionary (default), per worker process
+    redis  Any Redis-compatible server, shared by every worker
+    none   Caching disabled
+"""
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import request
+
+from app.metrics import registry
+
+try:
+    import redis
+except ImportError:  # pragma: no cover - optional dependency
+    redis = None
+
+cache_hits = registry.counter('hbnb_cache_hits', 'Responses served from the cache')
+cache_misses = registry.counter('hbnb_cache_misses', 'Cacheable responses built by the handler')
+cache_invalidations = registry.counter('hbnb_cache_invalidations', 'Namespace invalidations')
+
+
+def _unpack(result):
+    """Split a handler result into (data, code, headers)."""
+    if not isinstance(result, tuple):
+        return result, 200, {}
+    data, code, headers = result + (200, None)[len(result) - 1:]
+    return data, code, dict(headers or {})
+
+
+class LRUBackend:
+    """Thread-safe in-process LRU store with per-entry expiry."""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Generations are kept apart so eviction can never reset them
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Get a live value, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (forever if None)."""
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def generation(self, namespace):
+        """Current generation of a namespace."""
+        return self._generations.get(namespace, 0)
+
+    def bump(self, namespace):
+        """Start a new generation of a namespace."""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisBackend:
+    """Store shared through a Redis-compatible server."""
+
+    def __init__(self, url, prefix='hbnb:cache:'):
+        if redis is None:
+            raise RuntimeError("CACHE_BACKEND=redis requires the redis package")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        """Get a live value, or None."""
+        data = self.client.get(self.prefix + key)
+        return pickle.loads(data) if data is not None else None
+
+    def set(self, key, value, ttl=None):
+        """Store a value for ttl seconds (forever if None)."""
+        self.client.set(self.prefix + key, pickle.dumps(value), ex=ttl or None)
+
+    def generation(self, namespace):
+        """Current generation of a namespace."""
+        key = f'{self.prefix}gen:{namespace}'
+        # Start from the clock rather than 0: if the counter is ever evicted,
+        # the restarted generation cannot collide with old entries
+        self.client.set(key, time.time_ns(), nx=True)
+        return int(self.client.get(key))
+
+    def bump(self, namespace):
+        """Start a new generation of a namespace."""
+        self.generation(namespace)
+        self.client.incr(f'{self.prefix}gen:{namespace}')
+
+    def __len__(self):
+        return self.client.dbsize()
+
+
+class ResponseCache:
+    """Flask extension caching GET responses by namespace."""
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = None
+        self._namespaces = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the backend from the application configuration."""
+        kind = app.config.get('CACHE_BACKEND', 'lru')
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', 60)
+        if kind == 'redis':
+            self.backend = RedisBackend(app.config.get('CACHE_REDIS_URL', 'redis://localhost:6379/0'))
+        elif kind == 'lru':
+            self.backend = LRUBackend(app.config.get('CACHE_MAX_ENTRIES', 1024))
+        else:
+            self.backend = None
+        app.extensions['response_cache'] = self
+
+    def _key(self, namespace, key):
+        return f'{namespace}:{self.backend.generation(namespace)}:{key}'
+
+    def invalidate(self, *namespaces):
+        """Drop every cached response of the namespaces."""
+        if self.backend is None:
+            return
+        for namespace in namespaces:
+            self.backend.bump(namespace)
+            cache_invalidations.inc(namespace=namespace)
+
+    def stats(self):
+        """Hits and misses per namespace, plus the number of stored entries."""
+        return {
+            'entries': len(self.backend) if self.backend is not None else 0,
+            'namespaces': {
+                namespace: {
+                    'hits': cache_hits.value(namespace=namespace),
+                    'misses': cache_misses.value(namespace=namespace)
+                } for namespace in sorted(self._namespaces)
+            }
+        }
+
+    def cached(self, namespace, ttl=None, check_modified_since=True):
+        """
+        Decorate a GET handler to cache its 200 responses by full path.
+
+        The stored entry keeps the response headers, so a hit still gets
+        its ETag and can be answered with 304 without running the handler.
+        Put it after the authentication decorators and before marshal_with,
+        so the cache holds marshalled data.
+
+        Args:
+            namespace: Namespace invalidated by the writes affecting the data
+            ttl: Seconds to keep an entry, CACHE_DEFAULT_TTL if None
+            check_modified_since: Whether the handler answers
+                If-Modified-Since (False for collections, see
+                collection_conditional())
+        """
+        self._namespaces.add(namespace)
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return func(*args, **kwargs)
+                from app.api.conditional import revalidate
+
+                # Read the generation first: a write during the handler
+                # leaves the result under the old, already dead, generation
+                key = self._key(namespace, request.full_path)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    cache_hits.inc(namespace=namespace)
+                    data, headers = entry
+                    revalidate(headers, check_modified_since)
+                    return data, 200, headers
+
+                cache_misses.inc(namespace=namespace)
+                result = func(*args, **kwargs)
+                data, code, headers = _unpack(result)
+                if code == 200:
+                    self.backend.set(key, (data, headers), ttl or self.default_ttl)
+                return result
+            return wrapper
+        return decorator
+
+
+def invalidates(*namespaces):
+    """
+    Decorate a facade write method to invalidate cache namespaces.
+
+    The namespaces are invalidated once the method returns or raises, so a
+    partially applied batch is invalidated too.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            try:
+                return method(*args, **kwargs)
+            finally:
+                from app import cache
+                cache.invalidate(*namespaces)
+        return wrapper
+    return decorator
@@ -0,0 +1,145 @@
+"""
+Negotiated response compression.
+
+Responses whose body is larger than COMPRESS_MIN_SIZE are compressed with
+the best encoding the client accepts: brotli when the brotli package is
+installed, gzip otherwise. Streamed responses (the NDJSON export) are
+compressed incrementally and flushed every COMPRESS_STREAM_FLUSH_SIZE
+input bytes, so the client keeps receiving rows as they are produced.
+"""
+import gzip
+import zlib
+
+from flask import request
+
+from app.metrics import registry
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+bytes_in = registry.counter(
+    'hbnb_compression_input_bytes', 'Response bytes before compression, by encoding')
+bytes_out = registry.counter(
+    'hbnb_compression_output_bytes', 'Response bytes after compression, by encoding')
+
+DEFAULT_MIMETYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'application/javascript'
+)
+
+
+class _GzipStream:
+    """Incremental gzip encoder (zlib with a gzip header)."""
+
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def chunk(self, data, flush):
+        data = self._compressor.compress(data)
+        return data + self._compressor.flush(zlib.Z_SYNC_FLUSH) if flush else data
+
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    """Incremental brotli encoder."""
+
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def chunk(self, data, flush):
+        data = self._compressor.process(data)
+        return data + self._compressor.flush() if flush else data
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+class Compress:
+    """Flask extension compressing responses in an after_request hook."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the settings and register the hook."""
+        self.min_size = app.config.get('COMPRESS_MIN_SIZE', 500)
+        self.level = app.config.get('COMPRESS_LEVEL', 6)
+        self.brotli_quality = app.config.get('COMPRESS_BROTLI_QUALITY', 4)
+        self.flush_size = app.config.get('COMPRESS_STREAM_FLUSH_SIZE', 16384)
+        self.mimetypes = set(app.config.get('COMPRESS_MIMETYPES', DEFAULT_MIMETYPES))
+        self.encodings = ('br', 'gzip') if brotli is not None else ('gzip',)
+        # Registered once per app, init_app may run again to reload settings
+        if app.config.get('COMPRESS_ENABLED', True) and 'compress' not in app.extensions:
+            app.after_request(self.after_request)
+        app.extensions['compress'] = self
+
+    def _stream(self, encoding):
+        if encoding == 'br':
+            return _BrotliStream(self.brotli_quality)
+        return _GzipStream(self.level)
+
+    def _compress(self, encoding, data):
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, self.level, mtime=0)
+
+    def after_request(self, response):
+        """Compress the response if it is worth it and the client accepts it."""
+        response.vary.add('Accept-Encoding')
+        if (response.status_code < 200 or response.status_code in (204, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.mimetypes):
+            return response
+
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_stream(encoding, response.response)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                return response
+            compressed = self._compress(encoding, data)
+            bytes_in.inc(len(data), encoding=encoding)
+            bytes_out.inc(len(compressed), encoding=encoding)
+            response.set_data(compressed)
+        response.headers['Content-Encoding'] = encoding
+        return response
+
+    def _compress_stream(self, encoding, chunks):
+        """Compress a streamed body, flushing every flush_size input bytes."""
+        stream = self._stream(encoding)
+        pending = 0
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                pending += len(chunk)
+                flush = pending >= self.flush_size
+                if flush:
+                    pending = 0
+                data = stream.chunk(chunk, flush)
+                bytes_in.inc(len(chunk), encoding=encoding)
+                bytes_out.inc(len(data), encoding=encoding)
+                if data:
+                    yield data
+            data = stream.finish()
+            bytes_out.inc(len(data), encoding=encoding)
+            yield data
+        finally:
+            # Let the wrapped body (e.g. stream_with_context) clean up
+            if hasattr(chunks, 'close'):
+                chunks.close()
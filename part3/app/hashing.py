@@ -0,0 +1,148 @@
+"""
+Bounded worker pool for bcrypt password hashing and verification.
+
+bcrypt is deliberately slow. Running it on the request thread lets a burst
+of logins hold every worker, so password work is handed to a small pool
+instead. When more operations are waiting than PASSWORD_POOL_MAX_PENDING
+allows, new ones are rejected with PasswordPoolBusy (served as 503) rather
+than queued behind the burst.
+"""
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import bcrypt as bcrypt_lib
+
+from app.metrics import registry
+
+hash_seconds = registry.summary(
+    'hbnb_password_hash_seconds', 'Time spent running bcrypt, by operation')
+queue_wait_seconds = registry.summary(
+    'hbnb_password_queue_wait_seconds', 'Time password operations waited for a worker')
+rejected_total = registry.counter(
+    'hbnb_password_rejected', 'Password operations shed because the pool was saturated')
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when the password pool cannot take more work."""
+
+
+def _hash(password, rounds):
+    """Hash a password (module level so process pools can pickle it)."""
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    salt = bcrypt_lib.gensalt(rounds=rounds, prefix=b'2b')
+    return bcrypt_lib.hashpw(password, salt).decode('utf-8')
+
+
+def _verify(pw_hash, password):
+    """Check a password against a hash (module level so process pools can pickle it)."""
+    if isinstance(password, str):
+        password = password.encode('utf-8')
+    if isinstance(pw_hash, str):
+        pw_hash = pw_hash.encode('utf-8')
+    return bcrypt_lib.checkpw(password, pw_hash)
+
+
+def hash_cost(pw_hash):
+    """
+    Read the cost (log2 rounds) of a bcrypt hash.
+
+    Args:
+        pw_hash: Hash in modular crypt format, e.g. "$2b$12$..."
+
+    Returns:
+        Cost as an integer, or None if the hash is not a bcrypt hash
+    """
+    try:
+        return int(pw_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def _timed(operation, submitted, func, *args):
+    """Run func, recording queue wait and bcrypt time."""
+    started = time.perf_counter()
+    queue_wait_seconds.observe(started - submitted, operation=operation)
+    try:
+        return func(*args)
+    finally:
+        hash_seconds.observe(time.perf_counter() - started, operation=operation)
+
+
+class PasswordHasher:
+    """Flask extension running bcrypt on a bounded thread or process pool."""
+
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.timeout = None
+        self._executor = None
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Create the pool from the application configuration."""
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', 12)
+        self.timeout = app.config.get('PASSWORD_POOL_TIMEOUT', 10)
+        workers = app.config.get('PASSWORD_POOL_WORKERS', 4)
+        max_pending = app.config.get('PASSWORD_POOL_MAX_PENDING', 32)
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        if app.config.get('PASSWORD_POOL_KIND', 'thread') == 'process':
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            # bcrypt releases the GIL, threads run hashes in parallel
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        app.extensions['password_hasher'] = self
+
+    def _run(self, operation, func, *args):
+        """Run a password operation on the pool, or inline without an app."""
+        if self._executor is None:
+            return func(*args)
+
+        if not self._slots.acquire(blocking=False):
+            rejected_total.inc(operation=operation)
+            raise PasswordPoolBusy("Too many password operations in progress")
+
+        submitted = time.perf_counter()
+        if isinstance(self._executor, ProcessPoolExecutor):
+            # Child processes cannot report back, time the whole round trip
+            future = self._executor.submit(func, *args)
+            future.add_done_callback(lambda _: hash_seconds.observe(
+                time.perf_counter() - submitted, operation=operation))
+        else:
+            future = self._executor.submit(_timed, operation, submitted, func, *args)
+        # The slot is held until the work is really finished, even on timeout
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            rejected_total.inc(operation=operation)
+            raise PasswordPoolBusy("Password operation timed out")
+
+    def hash(self, password):
+        """
+        Hash a password with the configured bcrypt cost.
+
+        Raises:
+            PasswordPoolBusy: If the pool is saturated
+        """
+        return self._run('hash', _hash, password, self.rounds)
+
+    def needs_rehash(self, pw_hash):
+        """Tell whether a hash was made with a different cost than configured."""
+        return hash_cost(pw_hash) != self.rounds
+
+    def verify(self, pw_hash, password):
+        """
+        Check a password against a bcrypt hash.
+
+        Raises:
+            PasswordPoolBusy: If the pool is saturated
+        """
+        return self._run('verify', _verify, pw_hash, password)
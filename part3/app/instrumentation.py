@@ -0,0 +1,134 @@
+"""
+Per-request timing and SQL instrumentation.
+
+Each request records its wall time, the number and total duration of the
+SQL statements it ran and the time spent encoding its JSON body. The
+numbers are added to the metrics registry by endpoint, and sent back in
+a Server-Timing header so that browser developer tools can show them.
+A statement run more than N_PLUS_ONE_THRESHOLD times by one request (the
+same SQL with different parameters, typically a lazy load in a loop) is
+logged as a probable N+1 query.
+"""
+import logging
+from collections import Counter
+from time import perf_counter
+
+from flask import g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+request_seconds = registry.summary(
+    'hbnb_request_duration_seconds', 'Wall time of requests, by endpoint and method')
+sql_statements = registry.summary(
+    'hbnb_request_sql_statements', 'SQL statements run per request, by endpoint')
+sql_seconds = registry.summary(
+    'hbnb_request_sql_duration_seconds', 'SQL time per request, by endpoint')
+serialize_seconds = registry.summary(
+    'hbnb_request_serialize_duration_seconds', 'JSON encoding time per request, by endpoint')
+n_plus_one = registry.counter(
+    'hbnb_n_plus_one_requests', 'Requests repeating one statement more than N_PLUS_ONE_THRESHOLD times')
+
+
+class RequestTimings:
+    """Measurements of one request."""
+
+    __slots__ = ('started', 'sql_count', 'sql_seconds', 'serialize_seconds', 'statements')
+
+    def __init__(self, count_statements=True):
+        self.started = perf_counter()
+        self.sql_count = 0
+        self.sql_seconds = 0.0
+        self.serialize_seconds = 0.0
+        # Executions of each SQL string, for N+1 detection
+        self.statements = Counter() if count_statements else None
+
+
+def current_timings():
+    """Timings of the current request, or None when it is not instrumented."""
+    if has_app_context():
+        return g.get('_request_timings')
+    return None
+
+
+def add_serialize_time(seconds):
+    """Charge JSON encoding time to the current request."""
+    timings = current_timings()
+    if timings is not None:
+        timings.serialize_seconds += seconds
+
+
+# ----- SQLALCHEMY EVENTS -----
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._hbnb_started = perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_hbnb_started', None)
+    timings = current_timings()
+    if started is None or timings is None:
+        return
+    timings.sql_count += 1
+    timings.sql_seconds += perf_counter() - started
+    if timings.statements is not None:
+        timings.statements[statement] += 1
+
+
+class RequestInstrumentation:
+    """Flask extension timing requests and their SQL statements."""
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Read the settings and register the hooks."""
+        self.server_timing = app.config.get('SERVER_TIMING_ENABLED', True)
+        self.n_plus_one_threshold = app.config.get('N_PLUS_ONE_THRESHOLD', 10)
+        # Registered once per app, init_app may run again to reload settings
+        if app.config.get('INSTRUMENTATION_ENABLED', True) and 'instrumentation' not in app.extensions:
+            # Every engine (primary and replica binds) reports to the current request
+            if not event.contains(Engine, 'after_cursor_execute', _after_cursor_execute):
+                event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+                event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+            app.before_request(self.before_request)
+            app.after_request(self.after_request)
+        app.extensions['instrumentation'] = self
+
+    def before_request(self):
+        """Start timing the request."""
+        g._request_timings = RequestTimings(count_statements=self.n_plus_one_threshold > 0)
+
+    def after_request(self, response):
+        """Record the request metrics and add the Server-Timing header."""
+        timings = g.pop('_request_timings', None)
+        if timings is None:
+            return response
+        elapsed = perf_counter() - timings.started
+        endpoint = request.endpoint or 'unmatched'
+
+        request_seconds.observe(elapsed, endpoint=endpoint, method=request.method)
+        sql_statements.observe(timings.sql_count, endpoint=endpoint)
+        sql_seconds.observe(timings.sql_seconds, endpoint=endpoint)
+        serialize_seconds.observe(timings.serialize_seconds, endpoint=endpoint)
+        if timings.statements:
+            self._check_n_plus_one(timings.statements, endpoint)
+
+        if self.server_timing:
+            response.headers['Server-Timing'] = (
+                f'app;dur={elapsed * 1000:.2f}, '
+                f'db;dur={timings.sql_seconds * 1000:.2f};desc="{timings.sql_count} queries", '
+                f'serialize;dur={timings.serialize_seconds * 1000:.2f}'
+            )
+        return response
+
+    def _check_n_plus_one(self, statements, endpoint):
+        statement, count = statements.most_common(1)[0]
+        if count > self.n_plus_one_threshold:
+            n_plus_one.inc(endpoint=endpoint)
+            logger.warning("Probable N+1 query in %s %s: %d executions of %s",
+                           request.method, endpoint, count, ' '.join(statement.split())[:300])
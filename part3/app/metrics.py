@@ -0,0 +1,181 @@
+"""
+In-process metrics for the HBnB application.
+
+Metrics live in a process-wide registry and can be rendered in the
+Prometheus text exposition format.
+"""
+import threading
+import time
+
+
+def _escape(text, quotes=True):
+    """Escape a label value (or, without quotes, HELP text) for the text format."""
+    text = str(text).replace('\\', '\\\\').replace('\n', '\\n')
+    return text.replace('"', '\\"') if quotes else text
+
+
+class Counter:
+    """Monotonic count of events, optionally split by labels."""
+
+    kind = 'counter'
+
+    def __init__(self, name, description):
+        self.name = name
+        self.description = description
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        """Add to the count of the given label set."""
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        """Current count of the given label set."""
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples."""
+        for key, value in list(self._values.items()):
+            yield '_total', key, value
+
+
+class Summary:
+    """
+    Count, sum and recent maximum of observations (e.g. durations in seconds).
+
+    The maximum covers the last one to two windows of max_window seconds:
+    observations go to the current window, and the previous one is kept
+    until the current one ends. It is rendered as a separate gauge,
+    <name>_max, since summaries only have _count and _sum samples.
+    """
+
+    kind = 'summary'
+
+    def __init__(self, name, description, max_window=60.0):
+        self.name = name
+        self.description = description
+        self.max_window = max_window
+        self._values = {}
+        # labels -> [start of the current window, its maximum, previous window maximum]
+        self._maxima = {}
+        self._lock = threading.Lock()
+
+    def _window(self, key, now):
+        """Maxima of a label set, rotated to the window containing now (under the lock)."""
+        window = self._maxima.setdefault(key, [now, 0.0, 0.0])
+        elapsed = now - window[0]
+        if elapsed >= self.max_window:
+            window[2] = window[1] if elapsed < 2 * self.max_window else 0.0
+            window[0] = now - elapsed % self.max_window
+            window[1] = 0.0
+        return window
+
+    def observe(self, value, **labels):
+        """Record one observation for the given label set."""
+        key = tuple(sorted(labels.items()))
+        now = time.monotonic()
+        with self._lock:
+            count, total = self._values.get(key, (0, 0.0))
+            self._values[key] = (count + 1, total + value)
+            window = self._window(key, now)
+            window[1] = max(window[1], value)
+
+    def _recent_max(self, key, now):
+        """Largest observation of a label set in the current and previous windows."""
+        with self._lock:
+            _, current, previous = self._window(key, now)
+            return max(current, previous)
+
+    def stats(self, **labels):
+        """Dictionary with count, sum and recent max of the given label set."""
+        key = tuple(sorted(labels.items()))
+        count, total = self._values.get(key, (0, 0.0))
+        maximum = self._recent_max(key, time.monotonic()) if key in self._maxima else 0.0
+        return {'count': count, 'sum': total, 'max': maximum}
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples."""
+        for key, (count, total) in list(self._values.items()):
+            yield '_count', key, count
+            yield '_sum', key, total
+
+    def max_samples(self):
+        """Yield (labels, value) pairs of the recent maximum of every label set."""
+        now = time.monotonic()
+        for key in list(self._maxima):
+            yield key, self._recent_max(key, now)
+
+
+class Gauge:
+    """Value read from a callback at collection time."""
+
+    kind = 'gauge'
+
+    def __init__(self, name, description, callback):
+        self.name = name
+        self.description = description
+        self.callback = callback
+
+    def samples(self):
+        """Yield (suffix, labels, value) tuples."""
+        value = self.callback()
+        if value is not None:
+            yield '', (), value
+
+
+class Registry:
+    """Named collection of metrics."""
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, description):
+        """Get or create a counter."""
+        return self._get_or_create(Counter, name, description)
+
+    def summary(self, name, description):
+        """Get or create a summary."""
+        return self._get_or_create(Summary, name, description)
+
+    def gauge(self, name, description, callback):
+        """Register (or replace) a gauge read from callback()."""
+        with self._lock:
+            self._metrics[name] = Gauge(name, description, callback)
+        return self._metrics[name]
+
+    def render(self):
+        """Render every metric in the Prometheus text format."""
+        lines = []
+
+        def family(name, description, kind, samples):
+            lines.append(f'# HELP {name} {_escape(description, quotes=False)}')
+            lines.append(f'# TYPE {name} {kind}')
+            for suffix, labels, value in samples:
+                label_text = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+                if label_text:
+                    label_text = '{' + label_text + '}'
+                lines.append(f'{name}{suffix}{label_text} {value}')
+
+        for metric in list(self._metrics.values()):
+            family(metric.name, metric.description, metric.kind, metric.samples())
+            if metric.kind == 'summary':
+                family(f'{metric.name}_max',
+                       f'{metric.description}, largest in the last {metric.max_window:g} to '
+                       f'{2 * metric.max_window:g} seconds', 'gauge',
+                       (('', labels, value) for labels, value in metric.max_samples()))
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry
+registry = Registry()
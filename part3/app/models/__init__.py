@@ -7,6 +7,7 @@ from app.models.place import Place
 from app.models.review import Review
 from app.models.amenity import Amenity
 from app.models.place_amenity import place_amenity
+from app.models.collection_version import collection_versions
 
 __all__ = [
     'BaseModel',
@@ -14,5 +15,6 @@ __all__ = [
     'Place',
     'Review',
     'Amenity',
-    'place_amenity'
+    'place_amenity',
+    'collection_versions'
 ]
@@ -2,6 +2,7 @@
 Base model with common attributes for all entities.
 """
 from app import db
+from sqlalchemy import inspect as sa_inspect
 from datetime import datetime
 import uuid
 
@@ -12,16 +13,49 @@ class BaseModel(db.Model):
     __abstract__ = True  # This won't create a table for BaseModel
     
     id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False, index=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False, index=True)
     
-    def to_dict(self):
-        """Convert model to dictionary."""
+    # Column attributes to_dict() never outputs
+    __serialize_exclude__ = ()
+    # Computed values subclasses add to to_dict(), selectable with ?fields=
+    __serialize_computed__ = ()
+
+    @classmethod
+    def __declare_last__(cls):
+        """Compile the serializer once the mapper is configured."""
+        mapper = sa_inspect(cls)
+        serializer = []
+        for column in cls.__table__.columns:
+            # Attribute key, which may differ from the column name
+            key = mapper.get_property_by_column(column).key
+            if key not in cls.__serialize_exclude__:
+                convert = datetime.isoformat if isinstance(column.type, db.DateTime) else None
+                serializer.append((key, convert))
+        cls.__serializer__ = tuple(serializer)
+
+    @classmethod
+    def serializable_fields(cls):
+        """Names ?fields= can select: serialized columns and computed values."""
+        return tuple(key for key, _ in cls.__serializer__) + cls.__serialize_computed__
+
+    def to_dict(self, fields=None):
+        """
+        Convert model to dictionary.
+
+        Args:
+            fields: Collection of names to output, every field if None
+
+        Returns:
+            Dictionary of the serialized columns
+        """
+        # Loaded values sit in the instance dict; only expired or deferred
+        # columns need the (much slower) instrumented attribute
+        loaded = self.__dict__
         result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
-            if isinstance(value, datetime):
-                result[column.name] = value.isoformat()
-            else:
-                result[column.name] = value
+        for key, convert in self.__serializer__:
+            if fields is not None and key not in fields:
+                continue
+            value = loaded[key] if key in loaded else getattr(self, key)
+            result[key] = convert(value) if convert and value is not None else value
         return result
@@ -0,0 +1,71 @@
+"""
+Version counter of each collection table, for conditional requests.
+
+A row per table counts the commits that wrote to it, so the validators
+of a collection response are read by primary key instead of computed
+over the whole table. The tables written by a transaction are recorded
+at each flush (increment() and other bulk UPDATEs record theirs with
+touch()) and their counters are bumped just before the outermost
+commit, in name order so that concurrent transactions lock the rows in
+the same order.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import db
+
+# Tables with a version row
+COLLECTIONS = ('users', 'places', 'reviews', 'amenities')
+
+# Session.info key of the tables written since the last commit
+_WRITTEN = 'hbnb_written_tables'
+
+collection_versions = db.Table('collection_versions',
+    db.Column('name', db.String(32), primary_key=True),
+    db.Column('counter', db.Integer, nullable=False),
+    db.Column('updated_at', db.DateTime, nullable=True)
+)
+
+
+@event.listens_for(collection_versions, 'after_create')
+def _add_rows(target, connection, **kw):
+    connection.execute(target.insert(), [{'name': name, 'counter': 0} for name in COLLECTIONS])
+
+
+def touch(session, table_name):
+    """Record a write to a table that was not flushed (e.g. a bulk UPDATE)."""
+    session.info.setdefault(_WRITTEN, set()).add(table_name)
+
+
+@event.listens_for(Session, 'after_flush')
+def _record_flushed(session, flush_context):
+    # Cascaded deletes are part of session.deleted by now
+    for obj in session.deleted.union(session.new):
+        touch(session, obj.__table__.name)
+    for obj in session.dirty:
+        if session.is_modified(obj):
+            touch(session, obj.__table__.name)
+
+
+@event.listens_for(Session, 'before_commit')
+def _bump_written(session):
+    # Also called when a SAVEPOINT is released: wait for the real commit
+    if session.in_nested_transaction():
+        return
+    session.flush()
+    written = session.info.pop(_WRITTEN, None)
+    if not written:
+        return
+    now = datetime.utcnow()
+    for name in sorted(written.intersection(COLLECTIONS)):
+        session.execute(collection_versions.update()
+                        .where(collection_versions.c.name == name)
+                        .values(counter=collection_versions.c.counter + 1, updated_at=now))
+
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _forget_written(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_WRITTEN, None)
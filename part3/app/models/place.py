@@ -3,6 +3,9 @@ Place model with SQLAlchemy mapping.
 """
 from app import db
 from app.models.base import BaseModel
+from app.persistence.geo import cell_for
+from sqlalchemy import case
+from sqlalchemy.ext.hybrid import hybrid_property
 
 
 class Place(BaseModel):
@@ -15,11 +18,45 @@ class Place(BaseModel):
     price = db.Column(db.Float, nullable=False)
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
-    owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    owner_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False, index=True)
+    # Grid cell of (latitude, longitude), kept in sync for proximity search
+    geo_cell = db.Column(db.Integer, nullable=True, index=True)
+
+    # Rating aggregates, maintained incrementally by the facade on review writes
+    review_count = db.Column(db.Integer, nullable=False, default=0)
+    rating_sum = db.Column(db.Integer, nullable=False, default=0)
+    ratings_1 = db.Column(db.Integer, nullable=False, default=0)
+    ratings_2 = db.Column(db.Integer, nullable=False, default=0)
+    ratings_3 = db.Column(db.Integer, nullable=False, default=0)
+    ratings_4 = db.Column(db.Integer, nullable=False, default=0)
+    ratings_5 = db.Column(db.Integer, nullable=False, default=0)
+    # Every aggregate column, see the facade recompute_ratings()
+    RATING_COLUMNS = ('review_count', 'rating_sum') + tuple(f'ratings_{star}' for star in range(1, 6))
+
+    # Bounding-box searches filter on latitude first, then longitude; price
+    # pages are ordered by (price, id), which the second index returns as is
+    __table_args__ = (
+        db.Index('ix_places_latitude_longitude', 'latitude', 'longitude'),
+        db.Index('ix_places_price_id', 'price', 'id'),
+    )
 
      # Relationships
     reviews = db.relationship('Review', backref='place', lazy=True, cascade='all, delete-orphan')
     amenities = db.relationship('Amenity', secondary='place_amenity', back_populates='places', lazy=True)
+
+    # Relations the repositories can eager-load, and the loader strategy of each:
+    # one JOIN for the single owner, one extra SELECT ... IN for each collection
+    EAGER_LOADERS = {
+        'owner': 'joined',
+        'amenities': 'selectin',
+        'reviews': 'selectin'
+    }
+    # Everything to_dict() can nest; review_summary comes from the aggregates
+    INCLUDES = ('owner', 'amenities', 'reviews', 'review_summary')
+
+    # The grid cell is internal; the rating counts are output as rating_histogram
+    __serialize_exclude__ = ('geo_cell',) + tuple(f'ratings_{star}' for star in range(1, 6))
+    __serialize_computed__ = ('average_rating', 'rating_histogram')
         
     def __init__(self, title, description, price, latitude, longitude, owner_id):
         """Initialize place with validation."""
@@ -43,6 +80,60 @@ class Place(BaseModel):
         self.latitude = latitude
         self.longitude = longitude
         self.owner_id = owner_id
+        self.review_count = 0
+        self.rating_sum = 0
+        for star in range(1, 6):
+            setattr(self, f'ratings_{star}', 0)
+
+    @hybrid_property
+    def average_rating(self):
+        """Average review rating, 0 when the place has no reviews."""
+        if not self.review_count:
+            return 0.0
+        return self.rating_sum / self.review_count
+
+    @average_rating.expression
+    def average_rating(cls):
+        """SQL expression of the average rating, usable in ORDER BY."""
+        return case(
+            (cls.review_count > 0, cls.rating_sum * 1.0 / cls.review_count),
+            else_=0.0
+        )
+
+    def rating_histogram(self):
+        """Number of reviews per star, keyed '1' to '5'."""
+        return {str(star): getattr(self, f'ratings_{star}') or 0 for star in range(1, 6)}
+
+    @staticmethod
+    def rating_deltas(added=None, removed=None):
+        """
+        Get the aggregate changes caused by adding and/or removing a rating.
+
+        Args:
+            added: Rating of a new or updated review, or None
+            removed: Rating of a deleted or replaced review, or None
+
+        Returns:
+            Dictionary {column: delta} for the repository increment()
+        """
+        deltas = {}
+        for rating, sign in ((added, 1), (removed, -1)):
+            if rating is None:
+                continue
+            deltas['review_count'] = deltas.get('review_count', 0) + sign
+            deltas['rating_sum'] = deltas.get('rating_sum', 0) + sign * rating
+            key = f'ratings_{rating}'
+            deltas[key] = deltas.get(key, 0) + sign
+        return {key: delta for key, delta in deltas.items() if delta}
+
+    @db.validates('latitude', 'longitude')
+    def _update_geo_cell(self, key, value):
+        """Recompute the grid cell whenever a coordinate changes."""
+        if key == 'latitude':
+            self.geo_cell = cell_for(value, self.longitude)
+        else:
+            self.geo_cell = cell_for(self.latitude, value)
+        return value
 
     def add_amenity(self, amenity):
         """Add an amenity to this place."""
@@ -52,4 +143,45 @@ class Place(BaseModel):
     def remove_amenity(self, amenity):
         """Remove an amenity from this place."""
         if amenity in self.amenities:
-            self.amenities.remove(amenity)
\ No newline at end of file
+            self.amenities.remove(amenity)
+
+    def to_dict(self, include=(), fields=None):
+        """
+        Convert to dictionary without the internal grid cell.
+
+        Args:
+            include: Names from INCLUDES to nest in the result; load them
+                eagerly first, or each one costs a lazy query per place
+            fields: Collection of names from serializable_fields() to
+                output, every field if None; included data is always output
+
+        Returns:
+            Dictionary of the place
+        """
+        data = super().to_dict(fields)
+        if fields is None or 'average_rating' in fields:
+            data['average_rating'] = round(self.average_rating, 2)
+        if fields is None or 'rating_histogram' in fields:
+            data['rating_histogram'] = self.rating_histogram()
+
+        if 'owner' in include:
+            owner = self.owner
+            data['owner'] = {
+                'id': owner.id,
+                'first_name': owner.first_name,
+                'last_name': owner.last_name
+            } if owner else None
+        if 'amenities' in include:
+            data['amenities'] = [
+                {'id': amenity.id, 'name': amenity.name, 'description': amenity.description}
+                for amenity in self.amenities
+            ]
+        if 'reviews' in include:
+            data['reviews'] = [review.to_dict() for review in self.reviews]
+        if 'review_summary' in include:
+            data['review_summary'] = {
+                'count': self.review_count or 0,
+                'average_rating': round(self.average_rating, 2),
+                'rating_histogram': self.rating_histogram()
+            }
+        return data
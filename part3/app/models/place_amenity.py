@@ -5,5 +5,7 @@ from app import db
 
 place_amenity = db.Table('place_amenity',
     db.Column('place_id', db.String(36), db.ForeignKey('places.id'), primary_key=True),
-    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True)
+    db.Column('amenity_id', db.String(36), db.ForeignKey('amenities.id'), primary_key=True),
+    # The primary key starts with place_id; loading the places of an amenity needs this one
+    db.Index('ix_place_amenity_amenity_id', 'amenity_id')
 )
@@ -13,7 +13,12 @@ class Review(BaseModel):
     rating = db.Column(db.Integer, nullable=False)
     comment = db.Column(db.Text, nullable=False)
     user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
-    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False)
+    place_id = db.Column(db.String(36), db.ForeignKey('places.id'), nullable=False, index=True)
+
+    # One review per user and place; also serves the lookups by user_id
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'place_id', name='uq_reviews_user_place'),
+    )
     
     def __init__(self, rating, comment, user_id, place_id):
         """Initialize review with validation."""
@@ -29,3 +34,10 @@ class Review(BaseModel):
         self.comment = comment
         self.user_id = user_id
         self.place_id = place_id
+
+    @db.validates('rating')
+    def _validate_rating(self, key, rating):
+        """Keep ratings within 1-5 on updates too, the place aggregates rely on it."""
+        if not isinstance(rating, int) or isinstance(rating, bool) or not (1 <= rating <= 5):
+            raise ValueError("Rating must be between 1 and 5")
+        return rating
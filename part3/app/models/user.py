@@ -1,7 +1,7 @@
 """
 User model with SQLAlchemy mapping.
 """
-from app import db, bcrypt
+from app import db, hasher
 from app.models.base import BaseModel
 import re
 
@@ -17,6 +17,9 @@ class User(BaseModel):
     _password_hash = db.Column('password', db.String(128), nullable=False)
     is_admin = db.Column(db.Boolean, default=False, nullable=False)
 
+    # The password hash never leaves the model
+    __serialize_exclude__ = ('_password_hash',)
+
      # Relationships
     places = db.relationship('Place', backref='owner', lazy=True, cascade='all, delete-orphan')
     reviews = db.relationship('Review', backref='user', lazy=True, cascade='all, delete-orphan')
@@ -38,22 +41,20 @@ class User(BaseModel):
         return email
     
     def set_password(self, password):
-        """Hash and set the password."""
-        self._password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        """Hash and set the password (on the password worker pool)."""
+        self._password_hash = hasher.hash(password)
     
     def verify_password(self, password):
-        """Verify the password against the hash."""
-        return bcrypt.check_password_hash(self._password_hash, password)
+        """Verify the password against the hash (on the password worker pool)."""
+        if not self._password_hash:
+            return False
+        return hasher.verify(self._password_hash, password)
+
+    def password_needs_rehash(self):
+        """Tell whether the stored hash uses a different bcrypt cost than configured."""
+        return bool(self._password_hash) and hasher.needs_rehash(self._password_hash)
     
     @property
     def password(self):
         """Prevent password from being accessed."""
         raise AttributeError('password is not a readable attribute')
-    
-    def to_dict(self):
-        """Convert to dictionary without password."""
-        data = super().to_dict()
-        # Remove password hash from output
-        data.pop('password', None)
-        data.pop('_password_hash', None)
-        return data
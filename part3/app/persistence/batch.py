@@ -0,0 +1,11 @@
+"""
+Result type of the repositories' batch operations (add_many, update_many,
+delete_many).
+
+Both mappings are keyed by the position of the item in the input, so a
+caller can report the outcome of every item of a request.
+"""
+from collections import namedtuple
+
+# items: {index: object (or ID for deletes)}, errors: {index: message}
+BatchResult = namedtuple('BatchResult', ['items', 'errors'])
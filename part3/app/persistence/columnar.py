@@ -0,0 +1,192 @@
+# app/persistence/columnar.py
+"""
+Columnar copy of numeric attributes, for vectorized filtering.
+
+A ColumnStore keeps chosen attributes of every object of an
+InMemoryRepository in contiguous float64 NumPy arrays, one row per
+object, with an id -> row mapping. Range and bounding-box filters become
+boolean masks over all rows, and the first page of a sort is found with
+argpartition, instead of visiting Python objects one at a time.
+
+NumPy is optional: without it available() is False and the repository
+keeps using its ordered indexes.
+"""
+import math
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def available():
+    """Whether NumPy is installed."""
+    return np is not None
+
+
+def _number(value):
+    """Column value of an attribute: datetimes as epoch seconds, None as NaN."""
+    if value is None:
+        return math.nan
+    if isinstance(value, datetime):
+        return (value - _EPOCH).total_seconds()
+    return float(value)
+
+
+class ColumnStore:
+    """
+    Float columns of the objects of one repository.
+
+    Rows are kept dense: deleting an object moves the last row into its
+    place. Ids are stored UTF-8 encoded in a bytes array, which sorts
+    like the str ids, to break ties between equal values.
+    """
+
+    def __init__(self, columns, capacity=1024):
+        """
+        Args:
+            columns: Attribute names to store; values must be numbers,
+                datetimes or None
+            capacity: Initial number of rows
+        """
+        self.columns = tuple(columns)
+        self._positions = {attr: index for index, attr in enumerate(self.columns)}
+        self._data = np.full((len(self.columns), capacity), np.nan)
+        self._ids = np.zeros(capacity, dtype='S36')
+        # obj_id -> row
+        self._rows = {}
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, attr):
+        return attr in self._positions
+
+    def _reserve(self, count, id_width):
+        """Grow the arrays to hold count rows and ids of id_width bytes"""
+        capacity = self._data.shape[1]
+        if id_width > self._ids.dtype.itemsize:
+            self._ids = self._ids.astype(f'S{id_width}')
+        if count <= capacity:
+            return
+        while capacity < count:
+            capacity *= 2
+        used = len(self._rows)
+        data = np.full((len(self.columns), capacity), np.nan)
+        data[:, :used] = self._data[:, :used]
+        ids = np.zeros(capacity, dtype=self._ids.dtype)
+        ids[:used] = self._ids[:used]
+        # Readers holding the old arrays keep a consistent copy
+        self._data, self._ids = data, ids
+
+    # ----- WRITES -----
+    def put(self, obj_id, values):
+        """
+        Store or replace the row of an object.
+
+        Args:
+            obj_id: Object ID
+            values: {attribute: value}, missing attributes are stored as None
+        """
+        row = self._rows.get(obj_id)
+        if row is None:
+            encoded = obj_id.encode('utf-8')
+            row = len(self._rows)
+            self._reserve(row + 1, len(encoded))
+            self._ids[row] = encoded
+        self._data[:, row] = [_number(values.get(attr)) for attr in self.columns]
+        self._rows[obj_id] = row
+
+    def put_many(self, items):
+        """Store the rows of (obj_id, values) pairs of new objects at once"""
+        items = [(obj_id, values) for obj_id, values in items if obj_id not in self._rows]
+        if not items:
+            return
+        encoded = [obj_id.encode('utf-8') for obj_id, _ in items]
+        start = len(self._rows)
+        self._reserve(start + len(items), max(map(len, encoded)))
+        end = start + len(items)
+        self._data[:, start:end] = np.array(
+            [[_number(values.get(attr)) for attr in self.columns] for _, values in items],
+            dtype=float).T
+        self._ids[start:end] = encoded
+        self._rows.update((obj_id, row) for row, (obj_id, _) in enumerate(items, start))
+
+    def delete(self, obj_id):
+        """Remove the row of an object, if it has one"""
+        row = self._rows.pop(obj_id, None)
+        if row is None:
+            return
+        last = len(self._rows)
+        if row != last:
+            moved = self._ids[last]
+            self._data[:, row] = self._data[:, last]
+            self._ids[row] = moved
+            self._rows[moved.decode('utf-8')] = row
+        self._data[:, last] = np.nan
+        self._ids[last] = b''
+
+    # ----- QUERIES -----
+    def select(self, ranges, order_by, descending=False, after=None, limit=None):
+        """
+        Get the ids of the objects within ranges, ordered by (order_by, id).
+
+        Objects whose order_by or range-filtered attribute is None are
+        left out, like the ordered indexes of the repository do.
+
+        Args:
+            ranges: {attribute: (low, high)} inclusive bounds, None for open
+            order_by: Column to sort by
+            descending: Sort from the highest value down
+            after: (value, obj_id) to start after, as decoded from a cursor
+            limit: Maximum number of ids to return, None for all
+
+        Returns:
+            List of object IDs
+        """
+        count = len(self._rows)
+        data, ids = self._data, self._ids[:count]
+        keys = data[self._positions[order_by], :count]
+        mask = ~np.isnan(keys)
+        for attr, (low, high) in ranges.items():
+            column = data[self._positions[attr], :count]
+            # NaN fails both comparisons, so None values never match
+            if low is not None:
+                mask &= column >= _number(low)
+            if high is not None:
+                mask &= column <= _number(high)
+        if after is not None:
+            value, after_id = _number(after[0]), after[1].encode('utf-8')
+            beyond = keys < value if descending else keys > value
+            tied = np.flatnonzero(keys == value)
+            tied_ids = ids[tied]
+            beyond[tied[tied_ids < after_id if descending else tied_ids > after_id]] = True
+            mask &= beyond
+
+        rows = np.flatnonzero(mask)
+        if limit is not None and len(rows) > limit:
+            rows = self._first_rows(rows, keys, ids, limit, descending)
+        order = np.lexsort((ids[rows], keys[rows]))
+        if descending:
+            order = order[::-1]
+        return [obj_id.decode('utf-8') for obj_id in ids[rows[order]].tolist()]
+
+    @staticmethod
+    def _first_rows(rows, keys, ids, limit, descending):
+        """The limit rows coming first in (key, id) order, unsorted"""
+        signed = -keys[rows] if descending else keys[rows]
+        boundary = np.partition(signed, limit - 1)[limit - 1]
+        before = rows[signed < boundary]
+        # Rows sharing the boundary value are picked by id
+        tied = rows[signed == boundary]
+        needed = limit - len(before)
+        if len(tied) > needed:
+            tied_ids = ids[tied]
+            if descending:
+                tied = tied[np.argpartition(tied_ids, len(tied) - needed)[len(tied) - needed:]]
+            else:
+                tied = tied[np.argpartition(tied_ids, needed - 1)[:needed]]
+        return np.concatenate((before, tied))
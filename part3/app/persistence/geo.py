@@ -0,0 +1,186 @@
+"""
+Grid-cell spatial index for place proximity search.
+
+The globe is cut into CELL_DEGREES x CELL_DEGREES cells numbered row by
+row from the south-west corner, so the cells of one row form a contiguous
+integer range. A radius search becomes a few BETWEEN ranges on the
+indexed geo_cell column (one per row), followed by an exact haversine
+distance check on the candidates. The check is vectorized with NumPy
+when it is installed (it is optional, as for app.persistence.columnar).
+"""
+import heapq
+import math
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+EARTH_RADIUS_KM = 6371.0088
+
+# ~11 km of latitude per cell
+CELL_DEGREES = 0.1
+ROWS = int(round(180 / CELL_DEGREES))
+COLUMNS = int(round(360 / CELL_DEGREES))
+
+# Above this many rows (~710 km of radius) the cell ranges stop paying
+# off and the search falls back to the bounding box of the circle
+MAX_CELL_ROWS = 64
+
+# Below this many candidates the plain loop is faster than building arrays
+VECTORIZE_MIN = 64
+
+
+def cell_for(latitude, longitude):
+    """
+    Get the grid cell containing a coordinate.
+
+    Args:
+        latitude: Latitude in degrees, or None
+        longitude: Longitude in degrees, or None
+
+    Returns:
+        Cell number, or None if either coordinate is missing
+    """
+    if latitude is None or longitude is None:
+        return None
+    row = min(int((latitude + 90) / CELL_DEGREES), ROWS - 1)
+    column = int((longitude + 180) / CELL_DEGREES) % COLUMNS
+    return row * COLUMNS + column
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Get the latitude range and longitude intervals covering a circle.
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        radius_km: Radius in kilometers
+
+    Returns:
+        Tuple ((lat_min, lat_max), [(lon_min, lon_max), ...]); the
+        longitude range is split in two when it crosses the antimeridian
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    lat_min = max(latitude - delta_lat, -90.0)
+    lat_max = min(latitude + delta_lat, 90.0)
+
+    # The circle contains a pole: every longitude is in range
+    if lat_min == -90.0 or lat_max == 90.0:
+        return (lat_min, lat_max), [(-180.0, 180.0)]
+
+    delta_lon = math.degrees(radius_km / (EARTH_RADIUS_KM * math.cos(math.radians(latitude))))
+    if delta_lon >= 180:
+        return (lat_min, lat_max), [(-180.0, 180.0)]
+
+    lon_min = longitude - delta_lon
+    lon_max = longitude + delta_lon
+    if lon_min < -180:
+        return (lat_min, lat_max), [(lon_min + 360, 180.0), (-180.0, lon_max)]
+    if lon_max > 180:
+        return (lat_min, lat_max), [(lon_min, 180.0), (-180.0, lon_max - 360)]
+    return (lat_min, lat_max), [(lon_min, lon_max)]
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """
+    Get the cell number ranges covering a circle.
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        radius_km: Radius in kilometers
+
+    Returns:
+        List of inclusive (first_cell, last_cell) ranges, or None when the
+        circle spans more than MAX_CELL_ROWS rows
+    """
+    (lat_min, lat_max), lon_intervals = bounding_box(latitude, longitude, radius_km)
+    first_row = cell_for(lat_min, 0) // COLUMNS
+    last_row = cell_for(lat_max, 0) // COLUMNS
+    if last_row - first_row + 1 > MAX_CELL_ROWS:
+        return None
+
+    columns = []
+    for lon_min, lon_max in lon_intervals:
+        first_column = cell_for(0, lon_min) % COLUMNS
+        last_column = min(int((lon_max + 180) / CELL_DEGREES), COLUMNS - 1)
+        columns.append((first_column, last_column))
+
+    return [(row * COLUMNS + first, row * COLUMNS + last)
+            for row in range(first_row, last_row + 1)
+            for first, last in columns]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometers."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def nearest(latitude, longitude, candidates, radius_km, limit):
+    """
+    Keep the candidates within the radius, nearest first.
+
+    Distances are computed in a single pass with the center terms hoisted
+    out of the loop (as NumPy arrays for VECTORIZE_MIN candidates or
+    more), and only the top `limit` are sorted. Ties keep the order of
+    the candidates.
+
+    Args:
+        latitude: Center latitude in degrees
+        longitude: Center longitude in degrees
+        candidates: Objects with latitude and longitude attributes
+        radius_km: Radius in kilometers
+        limit: Maximum number of results
+
+    Returns:
+        List of (distance_km, object) tuples sorted by distance
+    """
+    phi1 = math.radians(latitude)
+    cos_phi1 = math.cos(phi1)
+    lambda1 = math.radians(longitude)
+    # Compare squared half-chord lengths instead of distances
+    max_a = math.sin(min(radius_km / EARTH_RADIUS_KM, math.pi) / 2) ** 2
+    if np is not None:
+        candidates = [obj for obj in candidates
+                      if obj.latitude is not None and obj.longitude is not None]
+        if len(candidates) >= VECTORIZE_MIN:
+            return _nearest_arrays(phi1, cos_phi1, lambda1, candidates, max_a, limit)
+    sin, cos, radians = math.sin, math.cos, math.radians
+
+    within = []
+    for index, obj in enumerate(candidates):
+        if obj.latitude is None or obj.longitude is None:
+            continue
+        phi2 = radians(obj.latitude)
+        a = (sin((phi2 - phi1) / 2) ** 2
+             + cos_phi1 * cos(phi2) * sin((radians(obj.longitude) - lambda1) / 2) ** 2)
+        if a <= max_a:
+            within.append((a, index, obj))
+
+    top = heapq.nsmallest(limit, within)
+    return [(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a))), obj) for a, _, obj in top]
+
+
+def _nearest_arrays(phi1, cos_phi1, lambda1, candidates, max_a, limit):
+    """nearest() over located candidates, with the distances as NumPy arrays"""
+    if limit <= 0:
+        return []
+    count = len(candidates)
+    phi2 = np.radians(np.fromiter((obj.latitude for obj in candidates), float, count))
+    lambda2 = np.radians(np.fromiter((obj.longitude for obj in candidates), float, count))
+    a = np.sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * np.cos(phi2) * np.sin((lambda2 - lambda1) / 2) ** 2
+
+    rows = np.flatnonzero(a <= max_a)
+    if len(rows) > limit:
+        # Keep every tie of the limit-th distance, the sort below picks by position
+        values = a[rows]
+        rows = rows[values <= np.partition(values, limit - 1)[limit - 1]]
+    rows = rows[np.lexsort((rows, a[rows]))][:limit]
+    return [(2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a[row]))), candidates[row])
+            for row in rows]
@@ -0,0 +1,564 @@
+# app/persistence/journal.py
+"""
+Durable storage for the in-memory repositories: snapshot plus journal.
+
+Every write of a DurableInMemoryRepository is appended to a binary
+journal, in the order the writes were applied, before the call returns. A
+journal record is a fixed header (payload length, CRC-32 of the payload,
+operation) followed by a pickled payload: the object id and its column
+values for a put, the id alone for a delete. With sync='group' a write
+also waits for fsync, but concurrent writers share one fsync. 'interval'
+fsyncs at most every sync_interval seconds and does not wait; 'off'
+leaves flushing to the OS.
+
+After snapshot_every records the journal is rotated: its records move
+to a previous segment and a new journal starts. The live objects are
+then written to a new snapshot (same record format) on a background
+thread, and the previous segment is dropped. Every file carries a
+generation number, so a crash at any step is detected on startup: a
+previous segment the snapshot does not cover yet is replayed, a stale
+journal is ignored. Startup maps both files with mmap and replays them; a torn
+record at the end of the journal (a crash during a write) is cut off.
+
+Payloads are unpickled on startup, so the data directory must only be
+writable by the application. One process at a time may open a journal.
+"""
+import gc
+import logging
+import mmap
+import os
+import pickle
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from sqlalchemy import inspect as sa_inspect
+
+from app.persistence.memory_repository import InMemoryRepository
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# File header: magic, generation, length of the pickled column keys
+FILE_HEADER = struct.Struct('<8sQI')
+MAGIC = b'HBNBJNL1'
+# Record header: payload length, CRC-32 of the payload, operation
+RECORD_HEADER = struct.Struct('<IIB')
+PUT, DELETE = 1, 2
+
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+
+def _file_header(generation, keys):
+    encoded_keys = pickle.dumps(tuple(keys), protocol=pickle.HIGHEST_PROTOCOL)
+    return FILE_HEADER.pack(MAGIC, generation, len(encoded_keys)) + encoded_keys
+
+
+def _record(op, payload):
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload), op) + payload
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _fsync_directory(path):
+    if os.name != 'posix':  # pragma: no cover
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replay(path, state):
+    """
+    Apply the records of a snapshot or journal file to state.
+
+    Args:
+        path: File to read
+        state: Dictionary {obj_id: {key: value}} updated in place
+
+    Returns:
+        (generation, keys, end, count) where end is the offset after the
+        last complete record and count the number of records, or None if
+        the file is missing or has no header
+    """
+    try:
+        file = open(path, 'rb')
+    except FileNotFoundError:
+        return None
+    with file:
+        size = os.fstat(file.fileno()).st_size
+        if size < FILE_HEADER.size:
+            return None
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, generation, keys_size = FILE_HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a journal file")
+            offset = FILE_HEADER.size + keys_size
+            keys = pickle.loads(mapped[FILE_HEADER.size:offset])
+
+            loads, crc32, unpack_from = pickle.loads, zlib.crc32, RECORD_HEADER.unpack_from
+            header_size = RECORD_HEADER.size
+            count = 0
+            while offset + header_size <= size:
+                length, checksum, op = unpack_from(mapped, offset)
+                start = offset + header_size
+                if start + length > size:
+                    break
+                payload = mapped[start:start + length]
+                if crc32(payload) != checksum:
+                    break
+                if op == PUT:
+                    obj_id, values = loads(payload)
+                    state[obj_id] = dict(zip(keys, values))
+                else:
+                    state.pop(payload.decode('utf-8'), None)
+                offset = start + length
+                count += 1
+    return generation, keys, offset, count
+
+
+class Journal:
+    """Snapshot and append-only journal of one repository."""
+
+    def __init__(self, directory, name, keys, sync='group', sync_interval=0.05,
+                 snapshot_every=100000):
+        """
+        Initialize the journal; nothing is read before load().
+
+        Args:
+            directory: Data directory, created if needed
+            name: File name prefix (e.g. 'places')
+            keys: Column keys of the stored values, in record order
+            sync: 'group', 'interval' or 'off' (see module docstring)
+            sync_interval: Seconds between fsyncs with sync='interval'
+            snapshot_every: Journal records that trigger a new snapshot
+        """
+        if sync not in ('group', 'interval', 'off'):
+            raise ValueError(f"Unknown journal sync mode: {sync}")
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.snapshot_path = os.path.join(directory, f'{name}.snapshot')
+        self.journal_path = os.path.join(directory, f'{name}.journal')
+        self.previous_path = os.path.join(directory, f'{name}.journal.previous')
+        self.lock_path = os.path.join(directory, f'{name}.lock')
+        self.keys = tuple(keys)
+        self.sync = sync
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.generation = 0
+        # Records appended since the last snapshot
+        self.records = 0
+        self._fd = None
+        self._lock_fd = None
+        self._lock = threading.Lock()
+        self._synced_cond = threading.Condition(self._lock)
+        self._written = 0
+        self._synced = 0
+        self._syncing = False
+        self._last_sync = time.monotonic()
+        # Between rotate() and the end of write_snapshot()
+        self._compacting = False
+
+    # ----- STARTUP -----
+
+    def load(self):
+        """
+        Read the snapshot and the journal, and open the journal for appending.
+
+        Returns:
+            Dictionary {obj_id: {key: value}} of the live objects
+        """
+        self._acquire_lock()
+        state = {}
+        snapshot = _replay(self.snapshot_path, state)
+        generation = snapshot[0] if snapshot else 0
+        needs_compaction = snapshot is not None and snapshot[1] != self.keys
+
+        # A rotated segment the snapshot does not cover yet (the process
+        # stopped during a compaction) comes before the journal
+        if self._generation_of(self.previous_path) == generation:
+            _replay(self.previous_path, state)
+            generation += 1
+            needs_compaction = True
+
+        journal = None
+        # A journal older than the snapshot is already part of it
+        if self._generation_of(self.journal_path) == generation:
+            journal = _replay(self.journal_path, state)
+
+        self.generation = generation
+        if journal is None:
+            self._reset_journal(generation)
+        else:
+            _, keys, end, count = journal
+            with open(self.journal_path, 'r+b') as file:
+                # Drop a record torn by a crash
+                file.truncate(end)
+            self._open(self.journal_path)
+            self.records = count
+            needs_compaction = needs_compaction or keys != self.keys
+        if needs_compaction:
+            # Columns changed: rewrite everything with the current keys
+            self.compact((obj_id, tuple(values.get(key) for key in self.keys))
+                         for obj_id, values in state.items())
+        return state
+
+    @staticmethod
+    def _generation_of(path):
+        """Generation in the header of a file, or None if it is missing or torn."""
+        try:
+            with open(path, 'rb') as file:
+                header = file.read(FILE_HEADER.size)
+        except FileNotFoundError:
+            return None
+        if len(header) < FILE_HEADER.size:
+            return None
+        return FILE_HEADER.unpack(header)[1]
+
+    def _acquire_lock(self):
+        """Lock the data files of this journal for the lifetime of the process."""
+        self._lock_fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+                raise RuntimeError(f"{self.journal_path} is already open in another process")
+
+    def _open(self, path):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = fd
+
+    def _write_file(self, path, generation, records=()):
+        """Atomically replace path with a header and records."""
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            file.write(_file_header(generation, self.keys))
+            for record in records:
+                file.write(record)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    def _reset_journal(self, generation):
+        self._write_file(self.journal_path, generation)
+        _fsync_directory(self.directory)
+        self._open(self.journal_path)
+        self.records = 0
+
+    # ----- WRITES -----
+
+    def put(self, obj_id, values):
+        """
+        Append the current column values of an object.
+
+        Returns:
+            Sequence number of the record, for commit()
+        """
+        payload = pickle.dumps((obj_id, tuple(values)), protocol=pickle.HIGHEST_PROTOCOL)
+        return self._append(_record(PUT, payload))
+
+    def delete(self, obj_id):
+        """Append the deletion of an object; returns its sequence number."""
+        return self._append(_record(DELETE, obj_id.encode('utf-8')))
+
+    def _append(self, data):
+        with self._lock:
+            # O_APPEND and a single write: records never interleave
+            _write_all(self._fd, data)
+            self._written += 1
+            self.records += 1
+            return self._written
+
+    def commit(self, sequence):
+        """Make records up to sequence durable, as the sync mode requires."""
+        if self.sync == 'group':
+            self._sync_to(sequence)
+        elif self.sync == 'interval' and time.monotonic() - self._last_sync >= self.sync_interval:
+            self._sync_to(sequence)
+
+    def _sync_to(self, sequence):
+        """Wait until record number sequence is on disk, fsyncing if nobody else is."""
+        with self._synced_cond:
+            while self._synced < sequence:
+                if self._syncing:
+                    self._synced_cond.wait()
+                    continue
+                # Leader: one fsync covers every record written so far
+                self._syncing = True
+                target = self._written
+                fd = self._fd
+                self._synced_cond.release()
+                try:
+                    _fdatasync(fd)
+                finally:
+                    self._synced_cond.acquire()
+                    self._syncing = False
+                    self._synced_cond.notify_all()
+                self._synced = max(self._synced, target)
+                self._last_sync = time.monotonic()
+
+    def should_compact(self):
+        """Whether enough records were appended to write a new snapshot."""
+        return self.records >= self.snapshot_every and not self._compacting
+
+    def _write_snapshot_file(self, generation, items):
+        self._write_file(self.snapshot_path, generation,
+                         (_record(PUT, pickle.dumps((obj_id, tuple(values)),
+                                                    protocol=pickle.HIGHEST_PROTOCOL))
+                          for obj_id, values in items))
+        _fsync_directory(self.directory)
+
+    def _pause_syncs(self):
+        """Make every record durable before the journal file is replaced (under the lock)."""
+        # Let a running fsync finish first
+        while self._syncing:
+            self._synced_cond.wait()
+        if self._synced < self._written:
+            _fdatasync(self._fd)
+        self._synced = self._written
+
+    def compact(self, items):
+        """
+        Write a snapshot of the live objects and start an empty journal.
+
+        Runs inline, with appends blocked; load() uses it to rewrite the
+        files, the repositories use rotate() and write_snapshot().
+
+        Args:
+            items: Iterable of (obj_id, values) covering every live object
+        """
+        with self._synced_cond:
+            self._pause_syncs()
+            generation = self.generation + 1
+            self._write_snapshot_file(generation, items)
+            # A crash before this point replays the old journal, which
+            # load() skips since its generation is behind the snapshot
+            self._reset_journal(generation)
+            self.generation = generation
+            if os.path.exists(self.previous_path):
+                os.remove(self.previous_path)
+
+    def rotate(self):
+        """
+        Start a new journal, the quick first step of a compaction.
+
+        The records so far move to the previous segment, which load()
+        replays until write_snapshot() covers them.
+
+        Returns:
+            Generation to pass to write_snapshot(), or None if a
+            compaction is already running
+        """
+        with self._synced_cond:
+            if self._compacting:
+                return None
+            self._pause_syncs()
+            os.replace(self.journal_path, self.previous_path)
+            self.generation += 1
+            self._reset_journal(self.generation)
+            self._compacting = True
+            return self.generation
+
+    def write_snapshot(self, generation, items):
+        """
+        Write the snapshot of a rotated journal and drop the previous segment.
+
+        Appends go on meanwhile. If the snapshot cannot be written, the
+        previous segment is kept for load() and compaction stays off.
+
+        Args:
+            generation: Value returned by rotate()
+            items: Iterable of (obj_id, values) covering every object live
+                at the rotation, or later
+        """
+        self._write_snapshot_file(generation, items)
+        os.remove(self.previous_path)
+        with self._lock:
+            self._compacting = False
+
+    def close(self):
+        """Flush and close the journal."""
+        with self._lock:
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+            if self._lock_fd is not None:
+                os.close(self._lock_fd)
+                self._lock_fd = None
+
+
+class DurableInMemoryRepository(InMemoryRepository):
+    """InMemoryRepository whose writes are journaled and replayed on startup."""
+
+    def __init__(self, model, journal_dir, journal_options=None, **index_options):
+        """
+        Initialize the repository and load its objects from disk.
+
+        Args:
+            model: Model class of the stored objects
+            journal_dir: Data directory of the snapshot and journal files
+            journal_options: Extra Journal arguments (sync, sync_interval,
+                snapshot_every)
+            **index_options: InMemoryRepository index arguments
+        """
+        super().__init__(**index_options)
+        self._local = threading.local()
+        self._compaction = None
+        self.model = model
+        mapper = sa_inspect(model)
+        self._keys = tuple(attr.key for attr in mapper.column_attrs)
+        self._journal = Journal(journal_dir, model.__tablename__, self._keys,
+                                **(journal_options or {}))
+
+        # Rebuild objects without running constructors or validators; the
+        # cyclic GC would otherwise rescan the growing heap many times
+        new_instance = mapper.class_manager.new_instance
+        gc_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            objs = []
+            for values in self._journal.load().values():
+                obj = new_instance()
+                obj.__dict__.update(values)
+                objs.append(obj)
+            self._load(objs)
+        finally:
+            if gc_enabled:
+                gc.enable()
+
+    def _values(self, obj):
+        return tuple(getattr(obj, key, None) for key in self._keys)
+
+    # Journaled under the write lock, so records follow the order of the writes
+
+    def _on_put(self, obj):
+        self._local.sequence = self._journal.put(obj.id, self._values(obj))
+
+    def _on_delete(self, obj_id):
+        self._local.sequence = self._journal.delete(obj_id)
+
+    def _commit(self):
+        """Wait for the records of this thread (after releasing the write lock)"""
+        if self._writer_thread == threading.get_ident():
+            # Nested in a batch write, which commits once at the end
+            return
+        sequence = getattr(self._local, 'sequence', None)
+        if sequence is not None:
+            self._local.sequence = None
+            self._journal.commit(sequence)
+        if self._journal.should_compact():
+            # The request that crossed snapshot_every does not wait for it
+            self.compact(wait=False)
+
+    @contextmanager
+    def transaction(self):
+        """Hold the write lock over a block of writes, then wait for all their records"""
+        with super().transaction():
+            yield
+        self._commit()
+
+    def create(self, obj):
+        """Add a new object and journal it"""
+        obj = super().create(obj)
+        self._commit()
+        return obj
+
+    add = create
+
+    def add_many(self, objs):
+        """Add objects, journaling each of them"""
+        result = super().add_many(objs)
+        self._commit()
+        return result
+
+    def update(self, obj_id, data=None, **kwargs):
+        """Update an object's attributes and journal its new values"""
+        obj = super().update(obj_id, data, **kwargs)
+        self._commit()
+        return obj
+
+    def update_many(self, updates):
+        """Apply updates, journaling each of them"""
+        result = super().update_many(updates)
+        self._commit()
+        return result
+
+    def increment(self, obj_id, deltas):
+        """Add deltas to numeric attributes and journal the new values"""
+        result = super().increment(obj_id, deltas)
+        self._commit()
+        return result
+
+    def set_columns(self, obj_id, values):
+        """Overwrite attributes that are never output and journal the new values"""
+        result = super().set_columns(obj_id, values)
+        self._commit()
+        return result
+
+    def delete(self, obj_id):
+        """Delete an object by ID and journal the deletion"""
+        obj = super().delete(obj_id)
+        self._commit()
+        return obj
+
+    def delete_many(self, obj_ids):
+        """Delete objects by ID, journaling each deletion"""
+        result = super().delete_many(obj_ids)
+        self._commit()
+        return result
+
+    def compact(self, wait=True):
+        """
+        Write a snapshot, e.g. before a planned restart.
+
+        The write lock is only held to rotate the journal and take the
+        shared tuple of objects; they are pickled and fsynced after it is
+        released, so reads and writes go on meanwhile. Updates replace
+        objects rather than changing them, and any change after the
+        rotation is also in the new journal, replayed over the snapshot.
+
+        Args:
+            wait: Write the snapshot on this thread, or on a background one
+        """
+        with self._writing():
+            generation = self._journal.rotate()
+            objs = self.list()
+        if generation is None:
+            return
+        if wait:
+            self._write_snapshot(generation, objs)
+        else:
+            self._compaction = threading.Thread(
+                target=self._write_snapshot, args=(generation, objs),
+                name=f'{self.model.__tablename__}-snapshot', daemon=True)
+            self._compaction.start()
+
+    def _write_snapshot(self, generation, objs):
+        try:
+            self._journal.write_snapshot(
+                generation, ((obj.id, self._values(obj)) for obj in objs))
+        except Exception:
+            logger.exception("Could not write the %s snapshot", self.model.__tablename__)
+
+    def close(self):
+        """Wait for a running snapshot and close the journal file."""
+        if self._compaction is not None:
+            self._compaction.join()
+        self._journal.close()
@@ -1,57 +1,605 @@
 # app/persistence/memory_repository.py
+"""
+In-memory repository, safe to share between request threads.
+
+Writes are serialized by a per-repository lock. Reads take no lock: a
+read that walks the indexes is a seqlock reader, retried when a write ran
+while it did (the sequence number is odd during a write and changes with
+every write). Stored objects are never modified in place: update()
+replaces an object with an updated copy, so an object a reader holds
+never changes under it, and list() shares one immutable snapshot of the
+objects between writes.
+"""
+import copy
+import threading
+import time
 import uuid
+from bisect import bisect_left, bisect_right, insort
+from contextlib import contextmanager
 from datetime import datetime
+from functools import wraps
+
+from app.persistence import columnar
+from app.persistence.batch import BatchResult
+from app.persistence.pagination import Page, encode_cursor, decode_cursor
+
+
+class _Last:
+    """Sorts after any id, to bisect past every (value, id) entry of a value"""
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return True
+
+
+_LAST = _Last()
+
+# Instance dict of objects that have none (__slots__ entities)
+_NO_DICT = {}
+
+
+def _writer(method):
+    """Run a write method under the repository write lock (see _writing)"""
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._writing():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+def _reader(method):
+    """
+    Run a read method without locking, retrying it if a write overlapped.
+
+    A result is kept only if the sequence number was even before the read
+    and unchanged after it. Errors a concurrent write can cause (an index
+    entry removed mid-scan, a set changing size) are retried the same way.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if self._writer_thread == threading.get_ident():
+            # Read from within a write of this thread
+            return method(self, *args, **kwargs)
+        while True:
+            sequence = self._sequence
+            if sequence & 1:
+                # A write is running, let it finish
+                time.sleep(0)
+                continue
+            try:
+                result = method(self, *args, **kwargs)
+            except (KeyError, IndexError, RuntimeError):
+                if self._sequence == sequence:
+                    raise
+                continue
+            if self._sequence == sequence:
+                return result
+    return wrapper
+
 
 class InMemoryRepository:
     """In-memory repository for storing entities"""
 
-    def __init__(self):
+    def __init__(self, unique_indexes=(), indexes=(), ordered_indexes=(), columns=()):
+        """
+        Initialize the repository.
+
+        Args:
+            unique_indexes: Attribute names whose values identify at most
+                one object (e.g. 'email')
+            indexes: Attribute names shared by many objects
+                (e.g. 'place_id', 'user_id')
+            ordered_indexes: Attribute names kept in sorted order for
+                range filters and sorting (e.g. 'price'); created_at is
+                always ordered
+            columns: Numeric or datetime attributes also kept in NumPy
+                arrays, to filter and sort pages by several ranges at once
+                (see app.persistence.columnar); ignored without NumPy
+        """
         self.storage = {}
+        # attribute -> {value: obj_id}
+        self._unique = {attr: {} for attr in unique_indexes}
+        # attribute -> {value: set of obj_ids}
+        self._index = {attr: {} for attr in indexes}
+        # attribute -> sorted list of (value, obj_id), used for range scans
+        # and keyset pagination
+        self._ordered = {attr: [] for attr in ('created_at',) + tuple(ordered_indexes)}
+        self._columns = columnar.ColumnStore(columns) if columns and columnar.available() else None
+        self._indexed_attrs = (set(self._unique) | set(self._index) | set(self._ordered)
+                               | set(columns))
+        # obj_id -> {attribute: value} as currently indexed
+        self._indexed_values = {}
+        # Bumped by every write, see version()
+        self._version = 0
+        self._last_modified = None
+        # Serializes writes; odd sequence number while one runs (see _reader)
+        self._write_lock = threading.RLock()
+        self._writer_thread = None
+        self._sequence = 0
+        # (sequence, tuple of objects) shared by list() calls between writes
+        self._snapshot = (0, ())
+
+    @contextmanager
+    def _writing(self):
+        """Hold the write lock; the outermost write makes the sequence number odd"""
+        with self._write_lock:
+            outermost = self._writer_thread is None
+            if outermost:
+                self._writer_thread = threading.get_ident()
+                self._sequence += 1
+            try:
+                yield
+            finally:
+                if outermost:
+                    self._sequence += 1
+                    self._writer_thread = None
+
+    def transaction(self):
+        """
+        Hold the write lock over a block of writes.
+
+        No other thread writes to the repository until the block ends, and
+        readers wait for it (see _reader). Nothing is rolled back: a write
+        that raises changes nothing, the writes before it stay.
+        """
+        return self._writing()
 
+    def _on_put(self, obj):
+        """Called under the write lock once an object is created or replaced"""
+
+    def _on_delete(self, obj_id):
+        """Called under the write lock once an object is deleted"""
+
+    @staticmethod
+    def _copy(obj):
+        """Shallow copy of an object, for update() to modify"""
+        state = getattr(obj, '_sa_instance_state', None)
+        if state is None:
+            return copy.copy(obj)
+        # Mapped entities need their own instance state
+        clone = state.manager.new_instance()
+        clone.__dict__.update((key, value) for key, value in obj.__dict__.items()
+                              if key != '_sa_instance_state')
+        return clone
+
+    # ----- SECONDARY INDEXES -----
+    def _check_unique(self, obj_id, values):
+        """Raise ValueError if a unique value is already taken by another object"""
+        for attr, value in values.items():
+            if attr not in self._unique or value is None:
+                continue
+            owner_id = self._unique[attr].get(value)
+            if owner_id is not None and owner_id != obj_id:
+                raise ValueError(f"{attr} '{value}' already exists")
+
+    def _index_obj(self, obj, keep_sorted=True):
+        """Add an object to every declared index"""
+        values = {}
+        # Stored attributes sit in the instance dict; computed ones (e.g.
+        # average_rating) and slotted entities need getattr
+        loaded = getattr(obj, '__dict__', _NO_DICT)
+        obj_id = loaded['id'] if 'id' in loaded else obj.id
+        for attr in self._indexed_attrs:
+            value = loaded[attr] if attr in loaded else getattr(obj, attr, None)
+            if value is None:
+                continue
+            values[attr] = value
+            if attr in self._unique:
+                self._unique[attr][value] = obj_id
+            if attr in self._index:
+                self._index[attr].setdefault(value, set()).add(obj_id)
+            if attr in self._ordered:
+                if keep_sorted:
+                    insort(self._ordered[attr], (value, obj_id))
+                else:
+                    self._ordered[attr].append((value, obj_id))
+        self._indexed_values[obj_id] = values
+        # Bulk loads fill the columns at once (see _load)
+        if self._columns is not None and keep_sorted:
+            self._columns.put(obj_id, values)
+
+    @_writer
+    def _load(self, objs):
+        """Store and index objects in bulk, sorting each ordered index once"""
+        loaded = []
+        for obj in objs:
+            self.storage[obj.id] = obj
+            self._index_obj(obj, keep_sorted=False)
+            loaded.append(obj.id)
+        for keys in self._ordered.values():
+            keys.sort()
+        if self._columns is not None:
+            self._columns.put_many((obj_id, self._indexed_values[obj_id]) for obj_id in loaded)
+        if self.storage:
+            self._touch()
+
+    def _unindex_obj(self, obj_id):
+        """Remove an object from every declared index"""
+        values = self._indexed_values.pop(obj_id, {})
+        if self._columns is not None:
+            self._columns.delete(obj_id)
+        for attr, value in values.items():
+            if attr in self._unique:
+                self._unique[attr].pop(value, None)
+            if attr in self._index:
+                ids = self._index[attr].get(value)
+                if ids is not None:
+                    ids.discard(obj_id)
+                    if not ids:
+                        del self._index[attr][value]
+            if attr in self._ordered:
+                keys = self._ordered[attr]
+                pos = bisect_left(keys, (value, obj_id))
+                if pos < len(keys) and keys[pos] == (value, obj_id):
+                    del keys[pos]
+
+    def _touch(self):
+        """Record a write for version()"""
+        self._version += 1
+        self._last_modified = datetime.utcnow()
+
+    def version(self):
+        """Get (token, last_modified) changing with every write"""
+        return str(self._version), self._last_modified
+
+    # ----- CRUD -----
+    @_writer
     def create(self, obj):
         """Add a new object to the repository"""
-        if not hasattr(obj, 'id'):
+        if not getattr(obj, 'id', None):
             obj.id = str(uuid.uuid4())
-        if not hasattr(obj, 'created_at'):
+        if not getattr(obj, 'created_at', None):
             obj.created_at = datetime.utcnow()
-        if not hasattr(obj, 'updated_at'):
+        if not getattr(obj, 'updated_at', None):
             obj.updated_at = datetime.utcnow()
-        
+
+        self._check_unique(obj.id, {attr: getattr(obj, attr, None) for attr in self._unique})
         self.storage[obj.id] = obj
+        self._index_obj(obj)
+        self._touch()
+        self._on_put(obj)
         return obj
 
-    def get(self, obj_id):
-        """Retrieve an object by ID"""
+    # Alias for compatibility with SQLAlchemyRepository
+    add = create
+
+    @_writer
+    def add_many(self, objs):
+        """Add objects one by one, collecting per-item errors"""
+        added, errors = {}, {}
+        for index, obj in enumerate(objs):
+            try:
+                added[index] = self.create(obj)
+            except ValueError as e:
+                errors[index] = str(e)
+        return BatchResult(added, errors)
+
+    def get(self, obj_id, include=()):
+        """
+        Retrieve an object by ID.
+
+        include is accepted for parity with SQLAlchemyRepository; related
+        objects live in other repositories, so the facade attaches them.
+        """
         return self.storage.get(obj_id)
-    
-    def get_by_email(self, email):
-        """Get user by email (for User entities)"""
+
+    @_reader
+    def get_many(self, obj_ids):
+        """Retrieve several objects by ID as a dictionary {id: object}"""
+        return {obj_id: self.storage[obj_id] for obj_id in obj_ids if obj_id in self.storage}
+
+    @_reader
+    def get_by_attribute(self, attr_name, attr_value):
+        """Get the first object whose attribute matches the value"""
+        if attr_name in self._unique:
+            obj_id = self._unique[attr_name].get(attr_value)
+            return self.storage.get(obj_id) if obj_id is not None else None
+        if attr_name in self._index:
+            for obj_id in self._index[attr_name].get(attr_value, ()):
+                return self.storage[obj_id]
+            return None
         for obj in self.storage.values():
-            if hasattr(obj, 'email') and obj.email == email:
+            if getattr(obj, attr_name, None) == attr_value:
                 return obj
         return None
 
+    @_reader
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """Get every object whose attribute matches the value"""
+        if attr_name in self._unique:
+            obj = self.get_by_attribute(attr_name, attr_value)
+            return [obj] if obj is not None else []
+        if attr_name in self._index:
+            return [self.storage[obj_id] for obj_id in self._index[attr_name].get(attr_value, ())]
+        return [obj for obj in self.storage.values() if getattr(obj, attr_name, None) == attr_value]
+
+    def get_by_email(self, email):
+        """Get user by email (for User entities)"""
+        return self.get_by_attribute('email', email)
+
     def list(self):
-        """List all objects"""
-        return list(self.storage.values())
+        """
+        List all objects.
+
+        Returns:
+            Tuple of the objects, built once after each write and shared
+            by every caller until the next one
+        """
+        sequence, objs = self._snapshot
+        if sequence == self._sequence:
+            return objs
+        while True:
+            sequence = self._sequence
+            if sequence & 1 and self._writer_thread != threading.get_ident():
+                time.sleep(0)
+                continue
+            objs = tuple(self.storage.values())
+            if sequence & 1:
+                return objs
+            if self._sequence == sequence:
+                self._snapshot = (sequence, objs)
+                return objs
+
+    # Alias for compatibility with SQLAlchemyRepository
+    get_all = list
+
+    def _range_bounds(self, attr, low, high):
+        """Positions delimiting low <= value <= high in an ordered index"""
+        keys = self._ordered[attr]
+        start = 0 if low is None else bisect_left(keys, (low,))
+        end = len(keys) if high is None else bisect_right(keys, (high, _LAST))
+        return start, end
+
+    @staticmethod
+    def _in_ranges(obj, ranges):
+        """Check an object against {attribute: (low, high)} bounds"""
+        for attr, (low, high) in ranges.items():
+            value = getattr(obj, attr, None)
+            if value is None:
+                return False
+            if low is not None and value < low:
+                return False
+            if high is not None and value > high:
+                return False
+        return True
+
+    def iter_all(self, since=None, batch_size=None):
+        """Iterate over objects ordered by (updated_at, id), optionally updated since a datetime"""
+        objs = [obj for obj in self.list()
+                if since is None or obj.updated_at >= since]
+        return iter(sorted(objs, key=lambda obj: (obj.updated_at, obj.id)))
+
+    @_reader
+    def get_page(self, limit, cursor=None, order_by='created_at', descending=False, ranges=None,
+                 include=()):
+        """
+        Get one page of objects ordered by (order_by, id).
+
+        The ordered index of order_by is walked from the cursor position.
+        When another ordered attribute is range-filtered and order_by is
+        not, the matching slice of that index is sorted instead, so a
+        selective filter never walks the whole collection. With columns,
+        filters on attributes other than order_by are evaluated as NumPy
+        masks over every row instead.
+
+        Args:
+            limit: Maximum number of objects to return
+            cursor: Cursor returned with the previous page, or None
+            order_by: Ordered attribute to sort by
+            descending: Sort from the highest value down
+            ranges: {attribute: (low, high)} inclusive bounds, None for open
+            include: Accepted for parity with SQLAlchemyRepository (see get)
+
+        Returns:
+            Page of objects with the cursor of the next page
+
+        Raises:
+            ValueError: If order_by has no ordered index or the cursor is invalid
+        """
+        if order_by not in self._ordered:
+            raise ValueError(f"Cannot sort by {order_by}")
+        sort_key = ('-' if descending else '') + order_by
+        after = decode_cursor(cursor, sort_key) if cursor else None
+        ranges = {attr: bounds for attr, bounds in (ranges or {}).items()
+                  if bounds != (None, None)}
+
+        columns = self._columns
+        if (columns is not None and order_by in columns
+                and any(attr != order_by for attr in ranges)
+                and all(attr in columns for attr in ranges)):
+            values = self._indexed_values
+            matches = [((values[obj_id][order_by], obj_id), self.storage[obj_id])
+                       for obj_id in columns.select(ranges, order_by, descending, after, limit + 1)]
+            return self._page(matches, limit, sort_key)
+
+        scan_attr = None
+        if order_by not in ranges:
+            sizes = {}
+            for attr in ranges:
+                if attr in self._ordered:
+                    start, end = self._range_bounds(attr, *ranges[attr])
+                    sizes[attr] = end - start
+            if sizes:
+                scan_attr = min(sizes, key=sizes.get)
+
+        if scan_attr is None:
+            # Walk the order_by index from the cursor position
+            keys = self._ordered[order_by]
+            start, end = self._range_bounds(order_by, *ranges.get(order_by, (None, None)))
+            if after is not None:
+                if descending:
+                    end = min(end, bisect_left(keys, after))
+                else:
+                    start = max(start, bisect_right(keys, after))
+            positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+            matches = []
+            for pos in positions:
+                obj = self.storage[keys[pos][1]]
+                if self._in_ranges(obj, ranges):
+                    matches.append((keys[pos], obj))
+                    if len(matches) > limit:
+                        break
+        else:
+            # Sort the slice of the most selective range-filtered index
+            start, end = self._range_bounds(scan_attr, *ranges[scan_attr])
+            matches = []
+            for _, obj_id in self._ordered[scan_attr][start:end]:
+                obj = self.storage[obj_id]
+                key = self._indexed_values[obj_id].get(order_by)
+                if key is None or not self._in_ranges(obj, ranges):
+                    continue
+                key = (key, obj_id)
+                if after is not None and (key >= after if descending else key <= after):
+                    continue
+                matches.append((key, obj))
+            matches.sort(key=lambda match: match[0], reverse=descending)
+            matches = matches[:limit + 1]
+        return self._page(matches, limit, sort_key)
+
+    @staticmethod
+    def _page(matches, limit, sort_key):
+        """Page of the first limit of ((value, obj_id), object) matches"""
+        items = [obj for _, obj in matches[:limit]]
+        next_cursor = None
+        if len(matches) > limit:
+            (value, obj_id), _ = matches[limit - 1]
+            next_cursor = encode_cursor(sort_key, value, obj_id)
+        return Page(items, next_cursor)
 
-    def update(self, obj_id, **kwargs):
-        """Update an object's attributes"""
+    @_reader
+    def find_within(self, attr_name, intervals, ranges=None):
+        """
+        Get the objects whose attribute falls in any of the intervals.
+
+        Args:
+            attr_name: Attribute with an ordered index (e.g. 'geo_cell')
+            intervals: Inclusive (low, high) intervals, assumed disjoint
+            ranges: Extra {attribute: (low, high)} bounds every object must meet
+
+        Returns:
+            List of matching objects
+        """
+        ranges = ranges or {}
+        if attr_name not in self._ordered:
+            return [obj for obj in self.storage.values()
+                    if any(self._in_ranges(obj, {attr_name: interval}) for interval in intervals)
+                    and self._in_ranges(obj, ranges)]
+
+        keys = self._ordered[attr_name]
+        matches = []
+        for low, high in intervals:
+            start, end = self._range_bounds(attr_name, low, high)
+            for _, obj_id in keys[start:end]:
+                obj = self.storage[obj_id]
+                if self._in_ranges(obj, ranges):
+                    matches.append(obj)
+        return matches
+
+    def update(self, obj_id, data=None, **kwargs):
+        """
+        Update an object's attributes.
+
+        The changes (and password hashing) are applied to a copy outside
+        the write lock; the copy then replaces the stored object, unless a
+        concurrent write replaced it first, in which case the update is
+        applied again to the new version.
+        """
+        data = dict(data or {}, **kwargs)
+        while True:
+            current = self.storage.get(obj_id)
+            if not current:
+                return None
+            obj = self._copy(current)
+
+            # Handle password separately if it's a User
+            if 'password' in data:
+                if hasattr(obj, 'set_password'):
+                    obj.set_password(data['password'])
+                elif hasattr(obj, 'hash_password'):
+                    obj.hash_password(data['password'])
+
+            changes = {key: value for key, value in data.items()
+                       if hasattr(obj, key) and key not in ['id', 'created_at', '_password_hash', 'password']}
+            for key, value in changes.items():
+                setattr(obj, key, value)
+            obj.updated_at = datetime.utcnow()
+
+            with self._writing():
+                if self.storage.get(obj_id) is not current:
+                    continue
+                self._check_unique(obj_id, changes)
+                self._unindex_obj(obj_id)
+                self.storage[obj_id] = obj
+                self._index_obj(obj)
+                self._touch()
+                self._on_put(obj)
+            return obj
+
+    @_writer
+    def update_many(self, updates):
+        """Apply (obj_id, data) updates one by one, collecting per-item errors"""
+        updated, errors = {}, {}
+        for index, (obj_id, data) in enumerate(updates):
+            try:
+                obj = self.update(obj_id, data)
+            except ValueError as e:
+                errors[index] = str(e)
+                continue
+            if obj is None:
+                errors[index] = "Not found"
+            else:
+                updated[index] = obj
+        return BatchResult(updated, errors)
+
+    @_writer
+    def increment(self, obj_id, deltas):
+        """Add deltas to numeric attributes of an object"""
         obj = self.storage.get(obj_id)
         if not obj:
-            return None
- # Handle password separately if it's a User
-        if 'password' in kwargs and hasattr(obj, 'hash_password'):
-            obj.hash_password(kwargs.pop('password')) 
+            return False
+        self.update(obj_id, {key: (getattr(obj, key) or 0) + delta
+                             for key, delta in deltas.items()})
+        return True
 
-# Update other attributes        
-        for key, value in kwargs.items():
-            if hasattr(obj, key) and key not in ['id', 'created_at', '_password_hash']:
-                setattr(obj, key, value)
-        
-        obj.updated_at = datetime.utcnow()
-        return obj
+    @_writer
+    def set_columns(self, obj_id, values):
+        """
+        Overwrite attributes that are never output, e.g. the password hash.
+
+        Neither updated_at nor version() change, so nothing derived from
+        the object's output is invalidated. Returns False if not found.
+        """
+        current = self.storage.get(obj_id)
+        if not current:
+            return False
+        obj = self._copy(current)
+        for key, value in values.items():
+            setattr(obj, key, value)
+        self._unindex_obj(obj_id)
+        self.storage[obj_id] = obj
+        self._index_obj(obj)
+        self._on_put(obj)
+        return True
 
+    @_writer
     def delete(self, obj_id):
         """Delete an object by ID"""
-        return self.storage.pop(obj_id, None)
\ No newline at end of file
+        self._unindex_obj(obj_id)
+        obj = self.storage.pop(obj_id, None)
+        if obj is not None:
+            self._touch()
+            self._on_delete(obj_id)
+        return obj
+
+    @_writer
+    def delete_many(self, obj_ids):
+        """Delete objects by ID, reporting the ones that do not exist"""
+        deleted, errors = {}, {}
+        for index, obj_id in enumerate(obj_ids):
+            if self.delete(obj_id) is None:
+                errors[index] = "Not found"
+            else:
+                deleted[index] = obj_id
+        return BatchResult(deleted, errors)
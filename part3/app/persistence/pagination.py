@@ -0,0 +1,59 @@
+"""
+Keyset (cursor) pagination shared by the repositories.
+
+A cursor records the sort key and id of the last item of a page, so the
+next page starts right after it with an indexed range scan instead of an
+OFFSET that grows with the page number.
+"""
+import base64
+import json
+from collections import namedtuple
+from datetime import datetime
+
+# items: objects of the page, next_cursor: cursor of the following page or None
+Page = namedtuple('Page', ['items', 'next_cursor'])
+
+
+def encode_cursor(key, value, obj_id):
+    """
+    Encode the position of an item into an opaque cursor.
+
+    Args:
+        key: Name of the sort key (e.g. 'created_at')
+        value: Sort key value of the item
+        obj_id: Item ID (tie-breaker)
+
+    Returns:
+        URL-safe cursor string
+    """
+    if isinstance(value, datetime):
+        value = {'dt': value.isoformat()}
+    payload = json.dumps({'k': key, 'v': value, 'id': obj_id}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, key):
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+        key: Sort key the cursor is expected to belong to
+
+    Returns:
+        Tuple (value, obj_id)
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another sort key
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        value, obj_id = payload['v'], payload['id']
+        if payload['k'] != key:
+            raise ValueError
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['dt'])
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Invalid cursor")
+    return value, obj_id
@@ -0,0 +1,67 @@
+# app/persistence/pool.py
+"""
+Instrumented SQLAlchemy connection pool.
+
+TimedQueuePool records how long each checkout waited for a connection
+and how many checkouts timed out, and exports its occupancy as gauges
+from its first checkout on (see register_pool_metrics()). Together they
+show whether DB_POOL_SIZE and DB_MAX_OVERFLOW fit the number of threads
+of each worker process.
+"""
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+from app.metrics import registry
+
+checkout_wait_seconds = registry.summary(
+    'hbnb_db_pool_checkout_wait_seconds', 'Time spent waiting for a pooled connection')
+checkout_timeouts = registry.counter(
+    'hbnb_db_pool_checkout_timeouts', 'Checkouts that gave up after DB_POOL_TIMEOUT')
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool recording checkout wait times and timeouts.
+
+    The occupancy gauges are registered by the first checkout, so apps
+    that never connect (CLI commands, most tests) register none, and a
+    pool recreated by engine.dispose() takes over the gauges once used.
+    """
+
+    _gauges_registered = False
+
+    def _do_get(self):
+        if not self._gauges_registered:
+            self._gauges_registered = True
+            register_pool_metrics(self)
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            checkout_timeouts.inc()
+            raise
+        finally:
+            checkout_wait_seconds.observe(time.perf_counter() - started)
+
+
+def register_pool_metrics(pool):
+    """
+    Export the occupancy of a pool as gauges, replacing those of any other pool.
+
+    Args:
+        pool: SQLAlchemy QueuePool
+    """
+    def saturation():
+        # A negative max overflow means no limit, so no saturation point
+        if pool._max_overflow < 0:
+            return None
+        return round(pool.checkedout() / (pool.size() + pool._max_overflow), 4)
+
+    registry.gauge('hbnb_db_pool_size', 'Configured number of pooled connections', pool.size)
+    registry.gauge('hbnb_db_pool_checked_out', 'Connections currently in use', pool.checkedout)
+    registry.gauge('hbnb_db_pool_overflow', 'Connections open beyond the pool size',
+                   lambda: max(pool.overflow(), 0))
+    registry.gauge('hbnb_db_pool_saturation',
+                   'Connections in use over pool size plus max overflow', saturation)
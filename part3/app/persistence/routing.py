@@ -0,0 +1,81 @@
+# app/persistence/routing.py
+"""
+Read replica routing for the SQLAlchemy session.
+
+The default bind is the primary. When SQLALCHEMY_BINDS has a 'replica'
+engine, queries run by facade methods decorated with @read_only go to
+it, as long as the session has not written anything: once a flush or an
+UPDATE/DELETE statement went to the primary, every later read of the
+session (one per request) goes to the primary too, so a request always
+reads its own writes.
+
+Objects read from the replica stay in the identity map, possibly behind
+the primary. Once the session has used the replica, lookups outside
+read-only calls (the write paths) reload the objects from the primary
+instead of reusing them, so a write never starts from a lagging copy.
+"""
+from functools import wraps
+
+from flask import has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+# Bind key of the replica in SQLALCHEMY_BINDS
+REPLICA = 'replica'
+
+
+class RoutingSession(Session):
+    """Session sending the reads of read-only calls to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if self._flushing or isinstance(clause, UpdateBase):
+                self.info['wrote'] = True
+            elif self.info.get('read_only') and not self.info.get('wrote'):
+                replica = self._db.engines.get(REPLICA)
+                if replica is not None:
+                    self.info['replica_read'] = True
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def _refresh_replica_reads(self):
+        """Whether loads must overwrite objects that may come from the replica."""
+        return self.info.get('replica_read') and not self.info.get('read_only')
+
+    def get(self, entity, ident, **kwargs):
+        # The identity map would otherwise answer without a query
+        # (scoped_session passes populate_existing=False explicitly)
+        if self._refresh_replica_reads():
+            kwargs['populate_existing'] = True
+        return super().get(entity, ident, **kwargs)
+
+
+@event.listens_for(RoutingSession, 'do_orm_execute')
+def _reload_from_primary(orm_execute_state):
+    # Lazy loads are left alone: they could overwrite unflushed changes
+    if (orm_execute_state.is_select and not orm_execute_state.is_relationship_load
+            and orm_execute_state.session._refresh_replica_reads()):
+        orm_execute_state.update_execution_options(populate_existing=True)
+
+
+def read_only(method):
+    """
+    Decorate a facade method whose queries may be served by the replica.
+
+    Lazy loads triggered after the method returns go to the primary.
+    """
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        if not has_app_context():
+            return method(*args, **kwargs)
+        from app import db
+
+        info = db.session.info
+        outer = info.get('read_only', False)
+        info['read_only'] = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            info['read_only'] = outer
+    return wrapper
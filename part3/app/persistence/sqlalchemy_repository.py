@@ -1,5 +1,15 @@
 from app import db
+from app.models.collection_version import collection_versions, touch
+from app.persistence.batch import BatchResult
+from app.persistence.pagination import Page, encode_cursor, decode_cursor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from sqlalchemy import and_, func, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload
+
+# Session.info key counting the transaction() blocks open on the session
+_TRANSACTION_DEPTH = 'hbnb_transaction_depth'
 
 class SQLAlchemyRepository:
     """Base repository for SQLAlchemy models"""
@@ -24,25 +34,179 @@ class SQLAlchemyRepository:
             Created object
         """
         db.session.add(obj)
-        db.session.commit()
+        self._commit()
         db.session.refresh(obj)
         return obj
     
     # Alias for compatibility
     create = add
 
-    def get(self, obj_id):
+    @staticmethod
+    @contextmanager
+    def transaction():
+        """
+        Make the writes of a block one transaction, across repositories.
+
+        Inside the block the write methods flush instead of committing, so
+        their statements run (and constraint errors surface) where they are
+        called. The outermost block commits once at its end, or rolls back
+        every write of the block if it raises. Rows changed by increment()
+        are refreshed, so objects are not expired by that commit.
+        """
+        session = db.session()
+        depth = session.info.get(_TRANSACTION_DEPTH, 0)
+        session.info[_TRANSACTION_DEPTH] = depth + 1
+        try:
+            yield
+            if not depth:
+                expire_on_commit = session.expire_on_commit
+                session.expire_on_commit = False
+                try:
+                    session.commit()
+                finally:
+                    session.expire_on_commit = expire_on_commit
+        except BaseException:
+            if not depth:
+                session.rollback()
+            raise
+        finally:
+            session.info[_TRANSACTION_DEPTH] = depth
+
+    def _commit(self):
+        """Commit the session, or only flush it inside a transaction() block."""
+        session = db.session()
+        if session.info.get(_TRANSACTION_DEPTH):
+            session.flush()
+        else:
+            session.commit()
+
+    def add_many(self, objs):
+        """
+        Add objects in a single transaction.
+
+        The unit of work sends the INSERTs as batched executemany calls
+        and the transaction is committed once, instead of a commit and a
+        refresh per object.
+
+        Args:
+            objs: SQLAlchemy model instances
+
+        Returns:
+            BatchResult of the added objects and per-item constraint errors
+        """
+        objs = list(objs)
+        steps = [(index, lambda obj=obj: db.session.add(obj)) for index, obj in enumerate(objs)]
+        errors = self._commit_batch(steps)
+        return BatchResult({index: obj for index, obj in enumerate(objs) if index not in errors},
+                           errors)
+
+    def _commit_batch(self, steps):
+        """
+        Run (index, step) callables in one transaction and commit once.
+
+        A step raising ValueError is recorded and skipped. If the commit
+        violates a constraint, the transaction is rolled back and replayed
+        with a SAVEPOINT per step, so only the offending steps are dropped.
+        Inside a transaction() block the steps are flushed, not committed,
+        and a SAVEPOINT stands for the transaction that is rolled back.
+
+        Args:
+            steps: List of (index, callable) pairs
+
+        Returns:
+            Dictionary {index: message} of the failed steps
+        """
+        session = db.session()
+        deferred = bool(session.info.get(_TRANSACTION_DEPTH))
+        expire_on_commit = session.expire_on_commit
+        # Every value is known after the flush, don't reload each row after commit
+        session.expire_on_commit = False
+        try:
+            errors = {}
+            try:
+                with session.begin_nested() if deferred else nullcontext():
+                    for index, step in steps:
+                        try:
+                            step()
+                        except ValueError as e:
+                            errors[index] = str(e)
+                    self._commit()
+                return errors
+            except IntegrityError:
+                if not deferred:
+                    session.rollback()
+
+            for index, step in steps:
+                if index in errors:
+                    continue
+                try:
+                    with session.begin_nested():
+                        step()
+                except IntegrityError as e:
+                    errors[index] = str(e.orig)
+            self._commit()
+            return errors
+        finally:
+            session.expire_on_commit = expire_on_commit
+
+    def _load_options(self, include):
+        """
+        Translate relation names into eager loader options.
+
+        Args:
+            include: Relation names, looked up in the model's EAGER_LOADERS;
+                names without a loader (e.g. computed fields) are skipped
+
+        Returns:
+            List of joinedload/selectinload options
+        """
+        loaders = getattr(self.model, 'EAGER_LOADERS', {})
+        options = []
+        for name in include or ():
+            strategy = loaders.get(name)
+            if strategy == 'joined':
+                options.append(joinedload(getattr(self.model, name)))
+            elif strategy == 'selectin':
+                options.append(selectinload(getattr(self.model, name)))
+        return options
+
+    def get(self, obj_id, include=()):
         """
         Retrieve an object by ID.
         
         Args:
             obj_id: Object ID
+            include: Relation names to load in the same round trips
             
         Returns:
             Object or None if not found
         """
-        return db.session.get(self.model, obj_id)
+        options = self._load_options(include)
+        if not options:
+            return db.session.get(self.model, obj_id)
+        # A query (unlike session.get) also fills unloaded relations of an
+        # object already in the identity map
+        return db.session.query(self.model).options(*options).filter(
+            self.model.id == obj_id
+        ).first()
     
+    def get_many(self, obj_ids):
+        """
+        Retrieve several objects by ID in one query.
+
+        Args:
+            obj_ids: Object IDs
+
+        Returns:
+            Dictionary {id: object} of the objects found
+        """
+        obj_ids = set(obj_ids)
+        if not obj_ids:
+            return {}
+        return {obj.id: obj for obj in db.session.query(self.model).filter(
+            self.model.id.in_(obj_ids)
+        )}
+
     def get_all(self):
         """
         Get all objects.
@@ -55,6 +219,131 @@ class SQLAlchemyRepository:
     # Alias for compatibility
     list = get_all
 
+    def version(self):
+        """
+        Get a token that changes whenever the table changes.
+
+        Read from the table's row in collection_versions, bumped by every
+        commit writing to the table. Tables without a row fall back to
+        COUNT(*) and MAX(updated_at), a scan of the whole table.
+
+        Returns:
+            Tuple (token, last_modified)
+        """
+        row = db.session.execute(
+            select(collection_versions.c.counter, collection_versions.c.updated_at)
+            .where(collection_versions.c.name == self.model.__tablename__)
+        ).first()
+        if row is not None:
+            counter, last_modified = row
+            return f"v{counter}:{last_modified.isoformat() if last_modified else ''}", last_modified
+        count, last_modified = db.session.query(
+            func.count(self.model.id), func.max(self.model.updated_at)
+        ).one()
+        return f"{count}:{last_modified.isoformat() if last_modified else ''}", last_modified
+
+    def iter_all(self, since=None, batch_size=1000):
+        """
+        Iterate over every object ordered by (updated_at, id).
+
+        Rows are fetched batch_size at a time with yield_per, so memory use
+        does not grow with the table.
+
+        Args:
+            since: Only objects updated at or after this datetime, or None
+            batch_size: Number of rows fetched per round trip
+
+        Returns:
+            Iterator of objects
+        """
+        query = db.session.query(self.model)
+        if since is not None:
+            query = query.filter(self.model.updated_at >= since)
+        return iter(query.order_by(self.model.updated_at, self.model.id).yield_per(batch_size))
+
+    def get_page(self, limit, cursor=None, order_by='created_at', descending=False, ranges=None,
+                 include=()):
+        """
+        Get one page of objects ordered by (order_by, id).
+
+        Uses keyset pagination: the cursor and the range filters become
+        WHERE clauses on indexed columns, so every page costs the same.
+
+        Args:
+            limit: Maximum number of objects to return
+            cursor: Cursor returned with the previous page, or None
+            order_by: Column to sort by
+            descending: Sort from the highest value down
+            ranges: {column: (low, high)} inclusive bounds, None for open
+            include: Relation names to load in the same round trips
+
+        Returns:
+            Page of objects with the cursor of the next page
+
+        Raises:
+            ValueError: If the cursor is invalid
+        """
+        sort_key = ('-' if descending else '') + order_by
+        column = getattr(self.model, order_by)
+        query = db.session.query(self.model).options(*self._load_options(include))
+
+        for attr_name, (low, high) in (ranges or {}).items():
+            attr = getattr(self.model, attr_name)
+            if low is not None:
+                query = query.filter(attr >= low)
+            if high is not None:
+                query = query.filter(attr <= high)
+
+        if cursor:
+            value, obj_id = decode_cursor(cursor, sort_key)
+            if descending:
+                query = query.filter(or_(
+                    column < value,
+                    and_(column == value, self.model.id < obj_id)
+                ))
+            else:
+                query = query.filter(or_(
+                    column > value,
+                    and_(column == value, self.model.id > obj_id)
+                ))
+
+        if descending:
+            query = query.order_by(column.desc(), self.model.id.desc())
+        else:
+            query = query.order_by(column, self.model.id)
+
+        rows = query.limit(limit + 1).all()
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(sort_key, getattr(last, order_by), last.id)
+        return Page(items, next_cursor)
+
+    def find_within(self, attr_name, intervals, ranges=None):
+        """
+        Get the objects whose attribute falls in any of the intervals.
+
+        Args:
+            attr_name: Indexed column (e.g. 'geo_cell')
+            intervals: Inclusive (low, high) intervals
+            ranges: Extra {column: (low, high)} bounds every object must meet
+
+        Returns:
+            List of matching objects
+        """
+        attr = getattr(self.model, attr_name)
+        query = db.session.query(self.model).filter(
+            or_(*[attr.between(low, high) for low, high in intervals])
+        )
+        for name, (low, high) in (ranges or {}).items():
+            column = getattr(self.model, name)
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        return query.all()
+
     def get_by_attribute(self, attr_name, attr_value):
         """
         Get object by any attribute.
@@ -69,7 +358,22 @@ class SQLAlchemyRepository:
         return db.session.query(self.model).filter(
             getattr(self.model, attr_name) == attr_value
         ).first()
-    
+
+    def get_all_by_attribute(self, attr_name, attr_value):
+        """
+        Get all objects matching an attribute value.
+
+        Args:
+            attr_name: Attribute name (e.g., 'place_id')
+            attr_value: Attribute value
+
+        Returns:
+            List of matching objects
+        """
+        return db.session.query(self.model).filter(
+            getattr(self.model, attr_name) == attr_value
+        ).all()
+
     def get_by_email(self, email):
         """
         Get user by email (for User model).
@@ -97,6 +401,15 @@ class SQLAlchemyRepository:
         if not obj:
             return None
         
+        self._apply(obj, data)
+        self._commit()
+        db.session.refresh(obj)
+        return obj
+
+    def _apply(self, obj, data):
+        """Set the attributes of an object from an update dictionary."""
+        data = dict(data)
+
         # Handle password separately if it's a User model
         if 'password' in data and hasattr(obj, 'set_password'):
             obj.set_password(data.pop('password'))
@@ -109,11 +422,93 @@ class SQLAlchemyRepository:
         # Update timestamp if exists
         if hasattr(obj, 'updated_at'):
             obj.updated_at = datetime.utcnow()
-        
-        db.session.commit()
-        db.session.refresh(obj)
-        return obj
+
+    def update_many(self, updates):
+        """
+        Update objects in a single transaction.
+
+        The objects are loaded with one query and committed once.
+
+        Args:
+            updates: List of (obj_id, data) pairs
+
+        Returns:
+            BatchResult of the updated objects and per-item errors
+        """
+        updates = list(updates)
+        found = self.get_many(obj_id for obj_id, _ in updates)
+        updated, errors, steps = {}, {}, []
+        for index, (obj_id, data) in enumerate(updates):
+            obj = found.get(obj_id)
+            if obj is None:
+                errors[index] = "Not found"
+                continue
+            updated[index] = obj
+            steps.append((index, lambda obj=obj, data=data: self._apply_or_discard(obj, data)))
+
+        errors.update(self._commit_batch(steps))
+        return BatchResult({index: obj for index, obj in updated.items() if index not in errors},
+                           errors)
+
+    def _apply_or_discard(self, obj, data):
+        """Apply an update, discarding the object's pending changes if it is invalid."""
+        try:
+            self._apply(obj, data)
+        except ValueError:
+            db.session.expire(obj)
+            raise
     
+    def increment(self, obj_id, deltas):
+        """
+        Atomically add deltas to numeric columns of one row.
+
+        Runs a single UPDATE ... SET col = col + delta, so concurrent
+        increments never overwrite each other.
+
+        Args:
+            obj_id: Object ID
+            deltas: Dictionary {column: amount to add}
+
+        Returns:
+            True if a row was updated, False if not found
+        """
+        values = {getattr(self.model, key): getattr(self.model, key) + delta
+                  for key, delta in deltas.items()}
+        if hasattr(self.model, 'updated_at'):
+            values[self.model.updated_at] = datetime.utcnow()
+
+        # 'fetch' expires the changed columns of the row if it is loaded
+        updated = db.session.query(self.model).filter(
+            self.model.id == obj_id
+        ).update(values, synchronize_session='fetch')
+        touch(db.session(), self.model.__tablename__)
+        self._commit()
+        return updated > 0
+
+    def set_columns(self, obj_id, values):
+        """
+        Overwrite columns that are never output, e.g. the password hash.
+
+        Runs a single UPDATE without bumping updated_at, so nothing derived
+        from the object's output is invalidated.
+
+        Args:
+            obj_id: Object ID
+            values: Dictionary {attribute: new value}
+
+        Returns:
+            True if a row was updated, False if not found
+        """
+        values = {getattr(self.model, key): value for key, value in values.items()}
+        if hasattr(self.model, 'updated_at'):
+            # Keep the current value rather than the column's onupdate
+            values[self.model.updated_at] = self.model.updated_at
+        updated = db.session.query(self.model).filter(
+            self.model.id == obj_id
+        ).update(values, synchronize_session='fetch')
+        self._commit()
+        return updated > 0
+
     def delete(self, obj_id):
         """
         Delete an object by ID.
@@ -129,5 +524,32 @@ class SQLAlchemyRepository:
             return False
         
         db.session.delete(obj)
-        db.session.commit()
+        self._commit()
         return True
+
+    def delete_many(self, obj_ids):
+        """
+        Delete objects in a single transaction.
+
+        Objects are loaded with one query and deleted through the session
+        so relationship cascades still apply.
+
+        Args:
+            obj_ids: Object IDs
+
+        Returns:
+            BatchResult of the deleted IDs and per-item errors
+        """
+        obj_ids = list(obj_ids)
+        found = self.get_many(obj_ids)
+        errors, steps = {}, []
+        for index, obj_id in enumerate(obj_ids):
+            obj = found.pop(obj_id, None)
+            if obj is None:
+                errors[index] = "Not found"
+                continue
+            steps.append((index, lambda obj=obj: db.session.delete(obj)))
+
+        errors.update(self._commit_batch(steps))
+        return BatchResult({index: obj_ids[index] for index, _ in steps if index not in errors},
+                           errors)
@@ -0,0 +1,30 @@
+# app/persistence/sqlite.py
+"""
+Transactions the pysqlite driver leaves to SQLite.
+
+pysqlite only sends BEGIN before an INSERT, UPDATE or DELETE, so a
+SAVEPOINT opened earlier in a transaction starts a transaction of its
+own, which its RELEASE commits: a batch written in a transaction() block
+(see SQLAlchemyRepository) would be committed before the block ends.
+These listeners turn the driver's handling off and send BEGIN when
+SQLAlchemy starts a transaction, as the SQLAlchemy documentation
+recommends. Importing the module registers them for every SQLite engine.
+"""
+import sqlite3
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool
+
+
+@event.listens_for(Pool, 'connect')
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        dbapi_connection.isolation_level = None
+
+
+@event.listens_for(Engine, 'begin')
+def _begin(connection):
+    if connection.dialect.name == 'sqlite':
+        # On the driver connection, like the BEGIN pysqlite used to send
+        connection.connection.driver_connection.execute('BEGIN')
@@ -0,0 +1,141 @@
+"""
+Startup profiling of the HBnB application.
+
+With HBNB_PROFILE_STARTUP=1 in the environment (or ``run.py
+--profile-startup``) the profiler starts before app/__init__.py imports
+Flask and the extensions, times every module imported from then on, and
+create_app records how long each extension, namespace and setup phase
+takes. The report is written to stderr when create_app returns and kept
+in ``app.extensions['startup_profile']``.
+
+This module only uses the standard library, so importing it does not
+distort the import times it measures.
+"""
+import builtins
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+
+
+def profiling_requested():
+    """Whether HBNB_PROFILE_STARTUP asks for a startup profile."""
+    return os.environ.get('HBNB_PROFILE_STARTUP', '').lower() in ('1', 'true', 'yes')
+
+
+class StartupProfiler:
+    """
+    Per-module import times and named phase times of one startup.
+
+    Imports are timed by wrapping ``builtins.__import__``: each import
+    statement that loads new modules is charged its cumulative time, and
+    its self time excludes the nested imports, as in ``python -X importtime``.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.modules = {}
+        self.phases = []
+        self._original_import = None
+        self._local = threading.local()
+
+    # ----- IMPORT TIMING -----
+
+    def start(self):
+        """Start a new profile: enable phase recording and time imports."""
+        if not self.enabled:
+            self.modules = {}
+            self.phases = []
+        self.enabled = True
+        if self._original_import is None:
+            self._original_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def stop(self):
+        """Stop recording; the profile is kept for report()."""
+        self.enabled = False
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = name
+        if level and globals:
+            package = globals.get('__package__') or ''
+            base = package.rsplit('.', level - 1)[0] if level > 1 else package
+            module_name = f"{base}.{name}" if name else base
+        if module_name in sys.modules and fromlist:
+            # from package import submodule
+            module_name = f"{module_name}.{','.join(fromlist)}"
+
+        stack = self._local.__dict__.setdefault('stack', [])
+        loaded = len(sys.modules)
+        stack.append(0.0)
+        start = perf_counter()
+        try:
+            return self._original_import(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            if len(sys.modules) > loaded:
+                cumulative, own = self.modules.get(module_name, (0.0, 0.0))
+                self.modules[module_name] = (cumulative + elapsed, own + elapsed - nested)
+
+    # ----- PHASES -----
+
+    @contextmanager
+    def phase(self, name):
+        """Record the duration of the block under the given name."""
+        if not self.enabled:
+            yield
+            return
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, perf_counter() - start))
+
+    def record(self, name, seconds):
+        """Record a phase timed elsewhere (e.g. run.py loading .env)."""
+        if self.enabled:
+            self.phases.append((name, seconds))
+
+    # ----- REPORT -----
+
+    def report(self, top=25):
+        """
+        Startup profile as a dictionary.
+
+        Args:
+            top: Number of modules listed, slowest self time first
+
+        Returns:
+            Dictionary with the total import time, the slowest modules
+            and the phases in the order they ran
+        """
+        slowest = sorted(self.modules.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'import_seconds': sum(own for _, own in self.modules.values()),
+            'modules': [{'module': name, 'cumulative_seconds': cumulative, 'self_seconds': own}
+                        for name, (cumulative, own) in slowest[:top]],
+            'phases': [{'phase': name, 'seconds': seconds} for name, seconds in self.phases]
+        }
+
+    def format_report(self, top=25):
+        """Startup profile as a text table."""
+        report = self.report(top)
+        lines = [f"Startup profile: {len(self.modules)} imports, "
+                 f"{report['import_seconds'] * 1000:.1f} ms importing",
+                 f"{'phase':<48}{'ms':>10}"]
+        lines += [f"{p['phase']:<48}{p['seconds'] * 1000:>10.1f}" for p in report['phases']]
+        lines.append(f"{'module':<48}{'self ms':>10}{'cumul ms':>10}")
+        lines += [f"{m['module']:<48}{m['self_seconds'] * 1000:>10.1f}"
+                  f"{m['cumulative_seconds'] * 1000:>10.1f}" for m in report['modules']]
+        return '\n'.join(lines)
+
+
+# Profiler of this process, started by app/__init__.py when requested
+startup_profiler = StartupProfiler()
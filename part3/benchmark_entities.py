@@ -0,0 +1,60 @@
+"""
+Memory benchmark of the app.business entities.
+
+Creates N reviews, places, amenities and users with distinct values and
+reports the bytes allocated per entity (the object itself, its
+timestamps, relation containers and its own strings), as traced by
+tracemalloc.
+
+Usage: python benchmark_entities.py [entities per class]
+"""
+import gc
+import sys
+import tracemalloc
+
+from app.business.amenity import Amenity
+from app.business.place import Place
+from app.business.review import Review
+from app.business.user import User
+
+
+def make_review(i):
+    return Review(1 + i % 5, f"Review number {i}", f"user-{i % 1000}", f"place-{i % 1000}")
+
+
+def make_place(i):
+    return Place(f"Place {i}", f"Description {i}", 100.0 + i, 40.7, -74.0, f"user-{i % 1000}")
+
+
+def make_amenity(i):
+    return Amenity(f"Amenity {i}", f"Description {i}")
+
+
+def make_user(i):
+    return User("First", "Last", f"user{i}@example.com", None)
+
+
+def bytes_per_entity(factory, count):
+    """Average traced allocation of count entities built by factory."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    entities = [factory(i) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding them is not part of the entities
+    overhead = sys.getsizeof(entities)
+    del entities
+    return (after - before - overhead) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"{count} entities per class")
+    for name, factory in (('Review', make_review), ('Place', make_place),
+                          ('Amenity', make_amenity), ('User', make_user)):
+        print(f"  {name:<8} {bytes_per_entity(factory, count):8.0f} bytes/entity")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark of filtered place listings in the in-memory repository.
+
+Loads N places into a repository using the ordered indexes only and into
+one that also keeps NumPy columns (see app.persistence.columnar), then
+times the first page of bounding-box and price-range listings sorted
+by created_at and by price.
+
+Usage: python benchmark_places.py [places]
+"""
+import random
+import sys
+import timeit
+
+from app.business.place import Place
+from app.persistence.memory_repository import InMemoryRepository
+
+ORDERED = ('price', 'latitude', 'longitude')
+COLUMNS = ('created_at', 'price', 'latitude', 'longitude')
+CASES = {
+    'bbox, newest first': dict(order_by='created_at', descending=True,
+                               ranges={'latitude': (30.0, 50.0), 'longitude': (-20.0, 30.0)}),
+    'bbox + price, by price': dict(order_by='price',
+                                   ranges={'price': (100.0, 150.0), 'latitude': (30.0, 50.0),
+                                           'longitude': (-20.0, 30.0)}),
+    'price, by latitude': dict(order_by='latitude', ranges={'price': (100.0, 150.0)}),
+}
+
+
+def make_places(count):
+    rng = random.Random(42)
+    return [Place(f"Place {i}", "", round(rng.uniform(10, 500), 2),
+                  rng.uniform(-60, 70), rng.uniform(-180, 180), f"owner-{i % 1000}")
+            for i in range(count)]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    places = make_places(count)
+    repos = {'indexes': InMemoryRepository(ordered_indexes=ORDERED),
+             'columns': InMemoryRepository(ordered_indexes=ORDERED, columns=COLUMNS)}
+    for repo in repos.values():
+        repo._load(places)
+
+    print(f"{count} places, first page of 20")
+    for case, options in CASES.items():
+        timings = []
+        for name, repo in repos.items():
+            runs = 5
+            seconds = timeit.timeit(lambda: repo.get_page(20, **options), number=runs) / runs
+            timings.append(f"{name} {seconds * 1000:8.2f} ms")
+        print(f"  {case:<24} " + "  ".join(timings))
+
+
+if __name__ == '__main__':
+    main()
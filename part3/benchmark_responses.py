@@ -0,0 +1,83 @@
+"""
+Benchmark of the per-request cost of JSON list responses.
+
+Compares the stdlib encoder with orjson (JSON_BACKEND) on the place and
+review list endpoints, and flask-restx marshalling with plain to_dict()
+output for a page of reviews.
+
+Usage: python benchmark_responses.py [requests per case]
+"""
+import os
+import sys
+import timeit
+
+os.environ.setdefault('USE_DATABASE', 'true')
+
+from flask_jwt_extended import create_access_token
+from flask_restx import marshal
+
+from app import create_app, db
+from app.api.reviews import review_page_model
+from app.models import User
+
+PLACES = 100
+REVIEWS_PER_PLACE = 5
+
+
+def seed(facade):
+    """Store places with reviews, enough to fill 100 item pages."""
+    owner = User("Bench", "Owner", "owner@example.com")
+    owner._password_hash = "not-a-real-hash"
+    owner = facade.user_repo.add(owner)
+    for i in range(PLACES):
+        place = facade.create_place({
+            'title': f"Place {i}", 'description': "Benchmark place", 'price': 50.0 + i,
+            'latitude': 40.0 + i / 100, 'longitude': -74.0, 'owner_id': owner.id
+        })
+        facade.create_reviews([
+            {'rating': 1 + j, 'comment': "Fine", 'user_id': f"user-{j}", 'place_id': place.id}
+            for j in range(REVIEWS_PER_PLACE)
+        ])
+
+
+def per_request(func, number):
+    """Best average seconds per call over 5 runs."""
+    return min(timeit.repeat(func, number=number, repeat=5)) / number
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    app = create_app('testing')
+    # Measure encoding, not the response cache
+    app.config['CACHE_BACKEND'] = 'none'
+    from app import cache
+    cache.init_app(app)
+
+    with app.app_context():
+        db.create_all()
+        facade = app.extensions['facade']
+        seed(facade)
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity="bench")}'
+
+        print(f"{'case':<40}{'json':>12}{'orjson':>12}")
+        for path in ('/api/places/?limit=100', '/api/reviews/?limit=100'):
+            timings = []
+            for backend in ('json', 'orjson'):
+                app.config['JSON_BACKEND'] = backend
+                timings.append(per_request(lambda: client.get(path), number))
+            print(f"GET {path:<36}{timings[0] * 1000:>10.2f}ms{timings[1] * 1000:>10.2f}ms")
+
+        page = facade.list_reviews(100)
+        marshalled = per_request(
+            lambda: marshal({'items': page.items, 'next': page.next_cursor}, review_page_model), number)
+        plain = per_request(
+            lambda: {'items': [review.to_dict() for review in page.items], 'next': page.next_cursor}, number)
+        print(f"\n{'review page of 100':<40}{'marshal':>12}{'to_dict':>12}")
+        print(f"{'build response body':<40}{marshalled * 1000:>10.2f}ms{plain * 1000:>10.2f}ms")
+
+        db.drop_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Add the place grid cell, the rating aggregates and the timestamp indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 20:25:00.000000
+
+The new places columns are added with a server default of 0, so existing
+rows are valid at once, then filled in from the existing data before the
+indexes are built:
+- geo_cell from the coordinates (see app.persistence.geo.cell_for()),
+  batch by batch;
+- review_count, rating_sum and ratings_1..5 from the reviews, as
+  `flask recompute-ratings` computes them.
+
+geo_cell needs the rows, so it is only filled in online; with --sql, run
+the upgrade against the database instead.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+from app.persistence.geo import cell_for
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+RATING_COLUMNS = ['review_count', 'rating_sum'] + [f'ratings_{star}' for star in range(1, 6)]
+# Indexes of the keyset pages and time range exports
+TIMESTAMP_TABLES = ['users', 'places', 'reviews', 'amenities']
+BATCH_SIZE = 1000
+
+
+def _fill_geo_cells():
+    if context.is_offline_mode():
+        return
+    bind = op.get_bind()
+    places = sa.table('places', sa.column('id'), sa.column('latitude'),
+                      sa.column('longitude'), sa.column('geo_cell'))
+    rows = bind.execute(sa.select(places.c.id, places.c.latitude, places.c.longitude).where(
+        places.c.latitude.isnot(None), places.c.longitude.isnot(None)))
+    update = places.update().where(places.c.id == sa.bindparam('place_id')).values(
+        geo_cell=sa.bindparam('cell'))
+    while True:
+        batch = rows.fetchmany(BATCH_SIZE)
+        if not batch:
+            break
+        bind.execute(update, [{'place_id': place_id, 'cell': cell_for(latitude, longitude)}
+                              for place_id, latitude, longitude in batch])
+
+
+def _fill_rating_aggregates():
+    def per_place(aggregate, condition=''):
+        return (f'(SELECT {aggregate} FROM reviews '
+                f'WHERE reviews.place_id = places.id{condition})')
+
+    values = {'review_count': per_place('COUNT(*)'),
+              'rating_sum': per_place('COALESCE(SUM(rating), 0)')}
+    for star in range(1, 6):
+        values[f'ratings_{star}'] = per_place('COUNT(*)', f' AND reviews.rating = {star}')
+    op.execute('UPDATE places SET ' + ', '.join(
+        f'{column} = {value}' for column, value in values.items()))
+
+
+def upgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('geo_cell', sa.Integer(), nullable=True))
+        for column in RATING_COLUMNS:
+            batch_op.add_column(sa.Column(column, sa.Integer(), nullable=False,
+                                          server_default='0'))
+
+    _fill_geo_cells()
+    _fill_rating_aggregates()
+
+    for table in TIMESTAMP_TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.create_index(batch_op.f(f'ix_{table}_created_at'), ['created_at'], unique=False)
+            batch_op.create_index(batch_op.f(f'ix_{table}_updated_at'), ['updated_at'], unique=False)
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_places_geo_cell'), ['geo_cell'], unique=False)
+        batch_op.create_index('ix_places_latitude_longitude', ['latitude', 'longitude'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        batch_op.drop_index('ix_places_latitude_longitude')
+        batch_op.drop_index(batch_op.f('ix_places_geo_cell'))
+    for table in reversed(TIMESTAMP_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_index(batch_op.f(f'ix_{table}_updated_at'))
+            batch_op.drop_index(batch_op.f(f'ix_{table}_created_at'))
+
+    with op.batch_alter_table('places', schema=None) as batch_op:
+        for column in reversed(RATING_COLUMNS):
+            batch_op.drop_column(column)
+        batch_op.drop_column('geo_cell')
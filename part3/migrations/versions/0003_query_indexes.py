@@ -0,0 +1,112 @@
+"""Add the indexes of the hot queries and one review per user and place
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 20:30:00.000000
+
+Indexes are built without blocking writes where the database can:
+PostgreSQL uses CREATE INDEX CONCURRENTLY (outside the migration
+transaction), MySQL one in-place ALTER TABLE per table with LOCK=NONE,
+so each table is scanned once for all of its new indexes. SQLite builds
+them directly, and copies reviews in batch mode to add the constraint.
+
+The upgrade stops if reviews already holds several reviews of a place by
+the same user; remove the extra ones first.
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# table -> [(index name, columns)]
+INDEXES = {
+    'places': [('ix_places_price_id', ['price', 'id']),
+               ('ix_places_owner_id', ['owner_id'])],
+    'reviews': [('ix_reviews_place_id', ['place_id'])],
+    'place_amenity': [('ix_place_amenity_amenity_id', ['amenity_id'])],
+}
+UNIQUE_NAME, UNIQUE_COLUMNS = 'uq_reviews_user_place', ['user_id', 'place_id']
+# MySQL needs an index on every foreign key column and drops its implicit
+# ones when these are added, so a downgrade keeps them there
+FOREIGN_KEY_INDEXES = {'ix_places_owner_id', 'ix_reviews_place_id', 'ix_place_amenity_amenity_id'}
+
+
+def _columns(columns):
+    return ', '.join(columns)
+
+
+def _check_duplicate_reviews():
+    if context.is_offline_mode():
+        return
+    duplicates = op.get_bind().execute(sa.text(
+        'SELECT user_id, place_id FROM reviews '
+        'GROUP BY user_id, place_id HAVING COUNT(*) > 1')).fetchmany(5)
+    if duplicates:
+        raise RuntimeError(
+            f"{UNIQUE_NAME} cannot be added, some users reviewed a place more than once "
+            f"(user_id, place_id): {[tuple(row) for row in duplicates]}")
+
+
+def _alter_indexes(create, drop, unique):
+    """Create and drop {table: [(name, columns)]} indexes; unique adds (True) or drops the constraint"""
+    dialect = op.get_context().dialect.name
+    if dialect == 'postgresql':
+        # CONCURRENTLY cannot run inside a transaction
+        with op.get_context().autocommit_block():
+            for table, indexes in create.items():
+                for name, columns in indexes:
+                    op.create_index(name, table, columns, postgresql_concurrently=True)
+            if unique:
+                op.create_index(UNIQUE_NAME, 'reviews', UNIQUE_COLUMNS, unique=True,
+                                postgresql_concurrently=True)
+                op.execute(f'ALTER TABLE reviews ADD CONSTRAINT {UNIQUE_NAME} '
+                           f'UNIQUE USING INDEX {UNIQUE_NAME}')
+            else:
+                op.drop_constraint(UNIQUE_NAME, 'reviews', type_='unique')
+            for table, indexes in drop.items():
+                for name, _ in indexes:
+                    op.drop_index(name, table_name=table, postgresql_concurrently=True)
+    elif dialect == 'mysql':
+        clauses = {}
+        for table, indexes in create.items():
+            clauses.setdefault(table, []).extend(
+                f'ADD INDEX {name} ({_columns(columns)})' for name, columns in indexes)
+        if unique:
+            clauses.setdefault('reviews', []).append(
+                f'ADD CONSTRAINT {UNIQUE_NAME} UNIQUE ({_columns(UNIQUE_COLUMNS)})')
+        else:
+            # The constraint also stood for the index of the user_id foreign key
+            clauses.setdefault('reviews', []).extend(
+                ['ADD INDEX ix_reviews_user_id (user_id)', f'DROP INDEX {UNIQUE_NAME}'])
+        for table, indexes in drop.items():
+            clauses.setdefault(table, []).extend(
+                f'DROP INDEX {name}' for name, _ in indexes if name not in FOREIGN_KEY_INDEXES)
+        for table, changes in clauses.items():
+            if changes:
+                op.execute(f'ALTER TABLE {table} {", ".join(changes)}, ALGORITHM=INPLACE, LOCK=NONE')
+    else:
+        for table, indexes in create.items():
+            for name, columns in indexes:
+                op.create_index(name, table, columns)
+        with op.batch_alter_table('reviews') as batch_op:
+            if unique:
+                batch_op.create_unique_constraint(UNIQUE_NAME, UNIQUE_COLUMNS)
+            else:
+                batch_op.drop_constraint(UNIQUE_NAME, type_='unique')
+        for table, indexes in drop.items():
+            for name, _ in indexes:
+                op.drop_index(name, table_name=table)
+
+
+def upgrade():
+    _check_duplicate_reviews()
+    _alter_indexes(INDEXES, {}, unique=True)
+
+
+def downgrade():
+    _alter_indexes({}, INDEXES, unique=False)
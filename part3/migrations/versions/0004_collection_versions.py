@@ -0,0 +1,37 @@
+"""Add the version counters of the collections
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 21:00:00.000000
+
+One row per collection table, read by the conditional collection GETs
+instead of COUNT(*) and MAX(updated_at) over the table. The rows start
+from the latest updated_at of their table.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLLECTIONS = ('users', 'places', 'reviews', 'amenities')
+
+
+def upgrade():
+    op.create_table('collection_versions',
+    sa.Column('name', sa.String(length=32), nullable=False),
+    sa.Column('counter', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('name')
+    )
+    for name in COLLECTIONS:
+        op.execute(f"INSERT INTO collection_versions (name, counter, updated_at) "
+                   f"SELECT '{name}', 0, MAX(updated_at) FROM {name}")
+
+
+def downgrade():
+    op.drop_table('collection_versions')
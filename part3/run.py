@@ -1,14 +1,26 @@
-from dotenv import load_dotenv
 import os
+import sys
+import time
+
+# --profile-startup reports import, extension and route registration times
+if '--profile-startup' in sys.argv:
+    sys.argv.remove('--profile-startup')
+    os.environ['HBNB_PROFILE_STARTUP'] = '1'
+
+started = time.perf_counter()
+from dotenv import load_dotenv
 
 # CRITICAL: Load .env BEFORE importing app
 load_dotenv()
+dotenv_seconds = time.perf_counter() - started
 
 # Verify environment loaded
 print(f"🔧 Environment: USE_DATABASE = {os.getenv('USE_DATABASE')}")
 
 from app import create_app
+from app.profiling import startup_profiler
 
+startup_profiler.record('load_dotenv', dotenv_seconds)
 config_name = os.environ.get('FLASK_ENV', 'development')
 app = create_app(config_name)
 
@@ -46,16 +46,24 @@ LEFT JOIN amenities a ON pa.amenity_id = a.id
 GROUP BY p.id, p.title
 ORDER BY p.title;
 
--- Query 5: Get places with their reviews
+-- Query 5: Get places with their reviews (precomputed aggregates, no GROUP BY)
 SELECT 
     p.title as place,
-    COUNT(r.id) as review_count,
-    AVG(r.rating) as average_rating
+    p.review_count,
+    CASE WHEN p.review_count > 0 THEN p.rating_sum * 1.0 / p.review_count ELSE 0 END as average_rating
 FROM places p
-LEFT JOIN reviews r ON p.id = r.place_id
-GROUP BY p.id, p.title
 ORDER BY average_rating DESC;
 
+-- Query 5b: Check the aggregates against the reviews table (should return no rows)
+SELECT 
+    p.title as place,
+    p.review_count,
+    COUNT(r.id) as actual_count
+FROM places p
+LEFT JOIN reviews r ON p.id = r.place_id
+GROUP BY p.id, p.title, p.review_count, p.rating_sum
+HAVING p.review_count != COUNT(r.id) OR p.rating_sum != COALESCE(SUM(r.rating), 0);
+
 -- Query 6: Get detailed reviews with user and place info
 SELECT 
     r.id,
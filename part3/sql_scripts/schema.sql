@@ -23,6 +23,9 @@ CREATE TABLE users (
 -- Create index on email for faster lookups
 CREATE INDEX idx_users_email ON users(email);
 
+-- Create index on creation date for keyset pagination
+CREATE INDEX idx_users_created ON users(created_at, id);
+
 -- Create Places table
 CREATE TABLE places (
     id VARCHAR(36) PRIMARY KEY,
@@ -33,12 +36,25 @@ CREATE TABLE places (
     price FLOAT NOT NULL,
     latitude FLOAT,
     longitude FLOAT,
+    geo_cell INTEGER,
     owner_id VARCHAR(36) NOT NULL,
+    review_count INTEGER NOT NULL DEFAULT 0,
+    rating_sum INTEGER NOT NULL DEFAULT 0,
+    ratings_1 INTEGER NOT NULL DEFAULT 0,
+    ratings_2 INTEGER NOT NULL DEFAULT 0,
+    ratings_3 INTEGER NOT NULL DEFAULT 0,
+    ratings_4 INTEGER NOT NULL DEFAULT 0,
+    ratings_5 INTEGER NOT NULL DEFAULT 0,
     FOREIGN KEY (owner_id) REFERENCES users(id) ON DELETE CASCADE
 );
 
 -- Create index on owner_id for faster queries
 CREATE INDEX idx_places_owner ON places(owner_id);
+CREATE INDEX idx_places_created ON places(created_at, id);
+CREATE INDEX idx_places_updated ON places(updated_at, id);
+CREATE INDEX idx_places_price ON places(price, id);
+CREATE INDEX idx_places_location ON places(latitude, longitude);
+CREATE INDEX idx_places_geo_cell ON places(geo_cell);
 
 -- Create Reviews table
 CREATE TABLE reviews (
@@ -49,6 +65,8 @@ CREATE TABLE reviews (
     comment TEXT NOT NULL,
     user_id VARCHAR(36) NOT NULL,
     place_id VARCHAR(36) NOT NULL,
+    -- One review per user and place
+    CONSTRAINT uq_reviews_user_place UNIQUE (user_id, place_id),
     FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE,
     FOREIGN KEY (place_id) REFERENCES places(id) ON DELETE CASCADE
 );
@@ -56,6 +74,8 @@ CREATE TABLE reviews (
 -- Create indexes for faster queries
 CREATE INDEX idx_reviews_user ON reviews(user_id);
 CREATE INDEX idx_reviews_place ON reviews(place_id);
+CREATE INDEX idx_reviews_created ON reviews(created_at, id);
+CREATE INDEX idx_reviews_updated ON reviews(updated_at, id);
 
 -- Create Amenities table
 CREATE TABLE amenities (
@@ -68,6 +88,8 @@ CREATE TABLE amenities (
 
 -- Create index on name for faster lookups
 CREATE INDEX idx_amenities_name ON amenities(name);
+CREATE INDEX idx_amenities_created ON amenities(created_at, id);
+CREATE INDEX idx_amenities_updated ON amenities(updated_at, id);
 
 -- Create Place-Amenity association table (many-to-many)
 CREATE TABLE place_amenity (
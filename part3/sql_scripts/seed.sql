@@ -35,10 +35,11 @@ INSERT INTO users (id, first_name, last_name, email, password, is_admin, created
 ('user-002', 'Jane', 'Smith', 'jane@example.com', '$2b$12$LQv3c1yqBWVHxkd0LHAkCOYz6TtxMQJqhN8/LewY5GyYzpLaEkKt6', FALSE, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
 
 -- Insert Sample Places
-INSERT INTO places (id, title, description, price, latitude, longitude, owner_id, created_at, updated_at) VALUES
-('place-001', 'Cozy Studio in Downtown', 'Perfect for solo travelers', 75.00, 40.7128, -74.0060, 'user-001', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-('place-002', 'Luxury Apartment with View', 'Stunning city skyline views', 200.00, 34.0522, -118.2437, 'user-001', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
-('place-003', 'Beach House Paradise', 'Direct beach access', 350.00, 25.7617, -80.1918, 'user-002', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+-- geo_cell = row * 3600 + column of the 0.1 degree grid (see app/persistence/geo.py)
+INSERT INTO places (id, title, description, price, latitude, longitude, geo_cell, owner_id, created_at, updated_at) VALUES
+('place-001', 'Cozy Studio in Downtown', 'Perfect for solo travelers', 75.00, 40.7128, -74.0060, 4706259, 'user-001', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+('place-002', 'Luxury Apartment with View', 'Stunning city skyline views', 200.00, 34.0522, -118.2437, 4464617, 'user-001', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
+('place-003', 'Beach House Paradise', 'Direct beach access', 350.00, 25.7617, -80.1918, 4166198, 'user-002', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
 
 -- Associate amenities with places
 INSERT INTO place_amenity (place_id, amenity_id) VALUES
@@ -66,3 +67,13 @@ INSERT INTO reviews (id, rating, comment, user_id, place_id, created_at, updated
 ('review-001', 5, 'Amazing location! Clean and comfortable.', 'user-002', 'place-001', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
 ('review-002', 4, 'Great view but a bit pricey.', 'user-002', 'place-002', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP),
 ('review-003', 5, 'Perfect beach getaway! Highly recommended.', 'user-001', 'place-003', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP);
+
+-- Initialize the place rating aggregates from the seeded reviews
+UPDATE places SET
+    review_count = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id),
+    rating_sum = (SELECT COALESCE(SUM(r.rating), 0) FROM reviews r WHERE r.place_id = places.id),
+    ratings_1 = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id AND r.rating = 1),
+    ratings_2 = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id AND r.rating = 2),
+    ratings_3 = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id AND r.rating = 3),
+    ratings_4 = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id AND r.rating = 4),
+    ratings_5 = (SELECT COUNT(*) FROM reviews r WHERE r.place_id = places.id AND r.rating = 5);
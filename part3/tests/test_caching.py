@@ -0,0 +1,147 @@
+"""
+Unit Tests for the response cache
+Tests the LRU backend, namespace invalidation and cached endpoints
+"""
+
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import cache, create_app, db
+from app.caching import LRUBackend, cache_hits
+from app.models import User
+
+
+class TestLRUBackend:
+    """Test the in-process backend"""
+
+    def test_evicts_least_recently_used(self):
+        """Test that the oldest unread entry goes first"""
+        backend = LRUBackend(max_entries=2)
+        backend.set('a', 1)
+        backend.set('b', 2)
+        assert backend.get('a') == 1
+        backend.set('c', 3)
+        assert backend.get('b') is None
+        assert backend.get('a') == 1
+        assert len(backend) == 2
+
+    def test_ttl_expires_entries(self):
+        """Test that an entry is not served after its TTL"""
+        backend = LRUBackend()
+        backend.set('a', 1, ttl=0.01)
+        time.sleep(0.02)
+        assert backend.get('a') is None
+
+    def test_generations_survive_eviction(self):
+        """Test that evicting entries never resets a namespace generation"""
+        backend = LRUBackend(max_entries=1)
+        backend.bump('places')
+        backend.set('x', 1)
+        backend.set('y', 2)
+        assert backend.generation('places') == 1
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Database backed application and its facade"""
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        app.facade = app.extensions['facade']
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client sending a valid token"""
+    client = app.test_client()
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity="user-1")}'
+    return client
+
+
+@pytest.fixture
+def place(app):
+    """A place owned by a stored user"""
+    owner = User("John", "Doe", "john@example.com")
+    owner._password_hash = "not-a-real-hash"
+    owner = app.facade.user_repo.add(owner)
+    return app.facade.create_place({
+        'title': "Cozy Apartment", 'description': "Nice place", 'price': 100.0,
+        'latitude': 40.7, 'longitude': -74.0, 'owner_id': owner.id
+    })
+
+
+def fail(*args, **kwargs):
+    raise AssertionError("the repository should not be read")
+
+
+class TestCachedEndpoints:
+    """Test hits, 304s from cached validators and write invalidation"""
+
+    def test_hit_skips_repository(self, app, client, place, monkeypatch):
+        """Test that a repeated GET is served without reading the repository"""
+        first = client.get(f'/api/places/{place.id}')
+        hits = cache_hits.value(namespace='places')
+        monkeypatch.setattr(app.facade, 'get_place', fail)
+
+        second = client.get(f'/api/places/{place.id}')
+        assert second.status_code == 200
+        assert second.json == first.json
+        assert second.headers['ETag'] == first.headers['ETag']
+        assert cache_hits.value(namespace='places') == hits + 1
+
+        revalidated = client.get(f'/api/places/{place.id}',
+                                 headers={'If-None-Match': first.headers['ETag']})
+        assert revalidated.status_code == 304
+
+    def test_query_string_is_part_of_key(self, client, place):
+        """Test that different includes are cached separately"""
+        client.get(f'/api/places/{place.id}')
+        response = client.get(f'/api/places/{place.id}?include=owner')
+        assert response.json['owner']['first_name'] == "John"
+
+    def test_place_update_invalidates(self, app, client, place):
+        """Test that a facade write drops the cached list"""
+        assert client.get('/api/places/').json['items'][0]['price'] == 100.0
+        app.facade.update_place(place.id, {'price': 80.0})
+        assert client.get('/api/places/').json['items'][0]['price'] == 80.0
+
+    def test_review_write_invalidates_places(self, app, client, place):
+        """Test that a review refreshes the cached place aggregates"""
+        assert client.get(f'/api/places/{place.id}').json['review_count'] == 0
+        app.facade.create_review({
+            'rating': 4, 'comment': "Good", 'user_id': "user-2", 'place_id': place.id
+        })
+        assert client.get(f'/api/places/{place.id}').json['review_count'] == 1
+
+    def test_amenity_list_cached_marshalled(self, app, client):
+        """Test that the amenity list is cached after marshalling"""
+        app.facade.create_amenity({'name': "WiFi"})
+        first = client.get('/api/amenities/')
+        assert client.get('/api/amenities/').json == first.json
+        app.facade.create_amenity({'name': "Pool"})
+        assert len(client.get('/api/amenities/').json['items']) == 2
+        assert cache.stats()['namespaces']['amenities']['hits'] >= 1
+
+    def test_disabled_backend(self, app, client, place, monkeypatch):
+        """Test that CACHE_BACKEND=none always runs the handler"""
+        app.config['CACHE_BACKEND'] = 'none'
+        cache.init_app(app)
+        client.get(f'/api/places/{place.id}')
+        monkeypatch.setattr(app.facade, 'get_place', fail)
+        with pytest.raises(AssertionError):
+            client.get(f'/api/places/{place.id}')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,112 @@
+"""
+Unit Tests for the NumPy column store of the in-memory repository
+Tests that columnar pages match the ordered index ones and follow writes
+"""
+
+import pytest
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip('numpy')
+
+from app.business.place import Place
+from app.persistence.columnar import ColumnStore
+from app.persistence.memory_repository import InMemoryRepository
+
+ORDERED = ('price', 'latitude', 'longitude')
+COLUMNS = ('created_at', 'price', 'latitude', 'longitude')
+
+
+def make_places(count, seed=7):
+    """Places with repeated prices (to exercise ties) and some without location"""
+    rng = random.Random(seed)
+    places = []
+    for i in range(count):
+        latitude = None if i % 10 == 0 else rng.uniform(-60, 60)
+        longitude = None if latitude is None else rng.uniform(-120, 120)
+        places.append(Place(f"Place {i}", "D", rng.choice((50.0, 80.0, 120.0, 200.0)),
+                            latitude, longitude, "owner-1"))
+    return places
+
+
+def pages(repo, limit, **options):
+    """Ids of every page of a listing, following the cursors"""
+    ids, cursor = [], None
+    while True:
+        page = repo.get_page(limit, cursor, **options)
+        ids.append([place.id for place in page.items])
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+
+
+@pytest.fixture
+def repos():
+    """The same places in a repository with columns and one without"""
+    places = make_places(300)
+    indexed = InMemoryRepository(ordered_indexes=ORDERED)
+    columnar = InMemoryRepository(ordered_indexes=ORDERED, columns=COLUMNS)
+    for place in places:
+        indexed.create(place)
+        columnar.create(place)
+    return indexed, columnar
+
+
+class TestColumnarPages:
+    """Test that the columns give the same pages as the ordered indexes"""
+
+    @pytest.mark.parametrize('order_by', ['created_at', 'price', 'latitude'])
+    @pytest.mark.parametrize('descending', [False, True])
+    def test_pages_match_indexes(self, repos, order_by, descending):
+        """Test bounding box and price filters with every sort and direction"""
+        indexed, columnar = repos
+        ranges = {'price': (60.0, None), 'latitude': (-30.0, 45.0), 'longitude': (-100.0, 100.0)}
+        expected = pages(indexed, 7, order_by=order_by, descending=descending, ranges=ranges)
+        assert pages(columnar, 7, order_by=order_by, descending=descending, ranges=ranges) == expected
+        assert sum(map(len, expected)) > 20
+
+    def test_columns_follow_writes(self, repos):
+        """Test that updates and deletes are reflected in the columns"""
+        indexed, columnar = repos
+        for repo in repos:
+            for place in list(repo.list())[:40]:
+                if place.latitude is None:
+                    repo.delete(place.id)
+                else:
+                    repo.update(place.id, {'price': place.price + 1, 'latitude': -place.latitude})
+        ranges = {'price': (None, 150.0), 'latitude': (0.0, None)}
+        expected = pages(indexed, 5, order_by='price', ranges=ranges)
+        assert pages(columnar, 5, order_by='price', ranges=ranges) == expected
+        assert len(columnar._columns) == len(columnar.list())
+
+
+class TestColumnStore:
+    """Test the column store on its own"""
+
+    def test_ties_broken_by_id(self):
+        """Test that the first rows of many equal values are the lowest ids"""
+        store = ColumnStore(('price',), capacity=2)
+        ids = [f"id-{i:03d}" for i in range(100)]
+        random.Random(1).shuffle(ids)
+        for obj_id in ids:
+            store.put(obj_id, {'price': 10.0})
+        assert store.select({}, 'price', limit=3) == ["id-000", "id-001", "id-002"]
+        assert store.select({}, 'price', descending=True, limit=2) == ["id-099", "id-098"]
+        assert store.select({}, 'price', after=(10.0, "id-097")) == ["id-098", "id-099"]
+
+    def test_delete_moves_last_row(self):
+        """Test that the row moved into a deleted one keeps its id"""
+        store = ColumnStore(('price',))
+        store.put_many([("a", {'price': 1.0}), ("b", {'price': 2.0}), ("c", {'price': 3.0})])
+        store.delete("a")
+        store.put("b", {'price': 5.0})
+        assert store.select({'price': (2.0, None)}, 'price') == ["c", "b"]
+        assert len(store) == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
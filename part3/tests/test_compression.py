@@ -0,0 +1,77 @@
+"""
+Unit Tests for negotiated response compression
+Tests gzip encoding, the size threshold and streamed responses
+"""
+
+import pytest
+import sys
+import os
+import gzip
+import json
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Amenity
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Application with twenty amenities, enough for a compressible list"""
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        facade = app.extensions['facade']
+        for i in range(20):
+            facade.amenity_repo.add(Amenity(f"Amenity {i}", "A description that repeats well"))
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestCompression:
+    """Test Accept-Encoding negotiation"""
+
+    def test_gzip_list(self, app):
+        """Test that a large list is gzipped and decodes to the same JSON"""
+        client = app.test_client()
+        plain = client.get('/api/amenities/')
+        compressed = client.get('/api/amenities/', headers={'Accept-Encoding': 'gzip'})
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in compressed.headers['Vary']
+        assert int(compressed.headers['Content-Length']) < len(plain.data) / 3
+        assert json.loads(gzip.decompress(compressed.data)) == plain.json
+
+    def test_not_accepted(self, app):
+        """Test that nothing is compressed without, or with a refused, gzip"""
+        client = app.test_client()
+        assert 'Content-Encoding' not in client.get('/api/amenities/').headers
+        response = client.get('/api/amenities/', headers={'Accept-Encoding': 'gzip;q=0'})
+        assert 'Content-Encoding' not in response.headers
+
+    def test_small_body_left_alone(self, app):
+        """Test that bodies under COMPRESS_MIN_SIZE are sent as is"""
+        response = app.test_client().get('/api/amenities/missing',
+                                         headers={'Accept-Encoding': 'gzip'})
+        assert response.status_code == 404
+        assert 'Content-Encoding' not in response.headers
+
+    def test_streamed_export(self, app):
+        """Test that the NDJSON export is compressed while streaming"""
+        app.config['COMPRESS_STREAM_FLUSH_SIZE'] = 100
+        app.extensions['compress'].init_app(app)
+        token = create_access_token(identity="admin", additional_claims={'is_admin': True})
+        response = app.test_client().get('/api/export/amenities.ndjson', headers={
+            'Authorization': f'Bearer {token}', 'Accept-Encoding': 'gzip'})
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).decode('utf-8').splitlines()
+        assert len(lines) == 20
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
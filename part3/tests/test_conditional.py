@@ -0,0 +1,150 @@
+"""
+Unit Tests for conditional GET (ETag / Last-Modified / 304)
+Runs against the in-memory and the SQLAlchemy repositories
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Amenity, User
+
+
+@pytest.fixture(params=['memory', 'database'])
+def app(request, monkeypatch):
+    """Application over each repository, and its facade"""
+    monkeypatch.setenv('USE_DATABASE', 'true' if request.param == 'database' else 'false')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        app.facade = app.extensions['facade']
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    """Test client sending a valid token"""
+    client = app.test_client()
+    token = create_access_token(identity="user-1")
+    client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {token}'
+    return client
+
+
+@pytest.fixture
+def place(app):
+    """A place owned by a stored user"""
+    owner = User("John", "Doe", "john@example.com")
+    owner._password_hash = "not-a-real-hash"
+    owner = app.facade.user_repo.add(owner)
+    return app.facade.create_place({
+        'title': "Cozy Apartment", 'description': "Nice place", 'price': 100.0,
+        'latitude': 40.7, 'longitude': -74.0, 'owner_id': owner.id
+    })
+
+
+class TestConditionalGet:
+    """Test validators and 304 responses"""
+
+    def test_resource_not_modified(self, client, place):
+        """Test that a matching If-None-Match gets an empty 304"""
+        first = client.get(f'/api/places/{place.id}')
+        etag = first.headers['ETag']
+        assert etag.startswith('W/"')
+        assert 'Last-Modified' in first.headers
+
+        second = client.get(f'/api/places/{place.id}', headers={'If-None-Match': etag})
+        assert second.status_code == 304
+        assert second.data == b''
+        assert second.headers['ETag'] == etag
+
+    def test_resource_changes_after_review(self, app, client, place):
+        """Test that a review (which moves the place aggregates) changes the ETag"""
+        etag = client.get(f'/api/places/{place.id}').headers['ETag']
+        app.facade.create_review({
+            'rating': 5, 'comment': "Great", 'user_id': "user-2", 'place_id': place.id
+        })
+        response = client.get(f'/api/places/{place.id}', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.json['review_count'] == 1
+
+    def test_include_changes_etag(self, client, place):
+        """Test that representations with embedded data have their own ETag"""
+        plain = client.get(f'/api/places/{place.id}').headers['ETag']
+        response = client.get(f'/api/places/{place.id}?include=owner', headers={'If-None-Match': plain})
+        assert response.status_code == 200
+        assert response.json['owner']['first_name'] == "John"
+
+    def test_collection_changes_after_delete(self, app, client):
+        """Test that deleting a row changes the collection ETag"""
+        wifi = app.facade.amenity_repo.add(Amenity("WiFi"))
+        app.facade.amenity_repo.add(Amenity("Pool"))
+        etag = client.get('/api/amenities/').headers['ETag']
+        assert client.get('/api/amenities/', headers={'If-None-Match': etag}).status_code == 304
+
+        app.facade.delete_amenity(wifi.id)
+        response = client.get('/api/amenities/', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert [a['name'] for a in response.json['items']] == ["Pool"]
+
+    def test_if_modified_since(self, client, place):
+        """Test Last-Modified revalidation of a single resource"""
+        last_modified = client.get(f'/api/places/{place.id}').headers['Last-Modified']
+        response = client.get(f'/api/places/{place.id}',
+                              headers={'If-Modified-Since': last_modified})
+        assert response.status_code == 304
+
+
+class TestCollectionVersions:
+    """Test the version counters read by collection validators"""
+
+    @pytest.fixture(autouse=True)
+    def database_only(self, app):
+        if not app.facade.use_database:
+            pytest.skip("collection_versions is a database table")
+
+    def test_version_read_by_key(self, app, place):
+        """Test that the version is one primary key lookup, not a table scan"""
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            app.facade.collection_version('places')
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len(statements) == 1 and 'collection_versions' in statements[0]
+        assert 'count(' not in statements[0].lower()
+
+    def test_cascade_and_increment_bump(self, app, place):
+        """Test that cascaded deletes and bulk increments count as writes"""
+        before = app.facade.collection_version('places')
+        app.facade.place_repo.increment(place.id, {'review_count': 0})
+        after_increment = app.facade.collection_version('places')
+        assert after_increment != before
+
+        app.facade.user_repo.delete(place.owner_id)
+        assert app.facade.get_place(place.id) is None
+        assert app.facade.collection_version('places') != after_increment
+
+    def test_rollback_does_not_bump(self, app, place):
+        """Test that the counter only moves with a commit"""
+        before = app.facade.collection_version('places')
+        with pytest.raises(RuntimeError):
+            with app.facade.place_repo.transaction():
+                app.facade.place_repo.update(place.id, {'price': 90.0})
+                raise RuntimeError("abort")
+        assert app.facade.collection_version('places') == before
+        app.facade.place_repo.update(place.id, {'price': 90.0})
+        assert app.facade.collection_version('places') != before
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,74 @@
+"""
+Unit Tests for the NDJSON export endpoint
+Runs against the in-memory and the SQLAlchemy repositories
+"""
+
+import pytest
+import sys
+import os
+import json
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+
+from app import create_app, db
+from app.models import Amenity
+
+
+@pytest.fixture(params=['memory', 'database'])
+def client(request, monkeypatch):
+    """Test client over each repository, with three amenities stored"""
+    monkeypatch.setenv('USE_DATABASE', 'true' if request.param == 'database' else 'false')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        facade = app.extensions['facade']
+        for day, name in enumerate(["WiFi", "Pool", "Gym"], start=1):
+            amenity = Amenity(name)
+            amenity.updated_at = datetime(2024, 1, day)
+            facade.amenity_repo.add(amenity)
+        yield app.test_client()
+        db.session.remove()
+        db.drop_all()
+
+
+def auth(client, is_admin=True):
+    """Authorization header of a user"""
+    with client.application.app_context():
+        token = create_access_token(identity="user-1", additional_claims={'is_admin': is_admin})
+    return {'Authorization': f'Bearer {token}'}
+
+
+class TestExport:
+    """Test streaming collections as newline-delimited JSON"""
+
+    def test_streams_every_row_in_update_order(self, client):
+        """Test that each row is one JSON line, oldest update first"""
+        response = client.get('/api/export/amenities.ndjson', headers=auth(client))
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        assert response.is_streamed
+        rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        assert [row['name'] for row in rows] == ["WiFi", "Pool", "Gym"]
+
+    def test_since_filter(self, client):
+        """Test that ?since= only returns rows updated at or after it"""
+        response = client.get('/api/export/amenities.ndjson?since=2024-01-02T00:00:00Z',
+                              headers=auth(client))
+        names = [json.loads(line)['name'] for line in response.get_data(as_text=True).splitlines()]
+        assert names == ["Pool", "Gym"]
+
+    def test_rejected_requests(self, client):
+        """Test the admin check, unknown collections and invalid dates"""
+        assert client.get('/api/export/amenities.ndjson',
+                          headers=auth(client, is_admin=False)).status_code == 403
+        assert client.get('/api/export/users.ndjson', headers=auth(client)).status_code == 404
+        assert client.get('/api/export/amenities.ndjson?since=yesterday',
+                          headers=auth(client)).status_code == 400
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,288 @@
+"""
+Unit Tests for the HBnBFacade
+Runs every scenario against the in-memory and the SQLAlchemy repositories
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import current_app
+
+from app import create_app, db
+from app.business.facade import HBnBFacade
+from app.models import User
+
+
+@pytest.fixture(params=['memory', 'database'])
+def facade(request, monkeypatch):
+    """Facade over each repository implementation"""
+    monkeypatch.setenv('USE_DATABASE', 'true' if request.param == 'database' else 'false')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app.extensions['facade']
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def place(facade):
+    """A place owned by a user stored through the facade"""
+    owner = User("John", "Doe", "john@example.com")
+    owner._password_hash = "not-a-real-hash"
+    owner = facade.user_repo.add(owner)
+    return facade.create_place({
+        'title': "Cozy Apartment", 'description': "Nice place", 'price': 100.0,
+        'latitude': 40.7, 'longitude': -74.0, 'owner_id': owner.id
+    })
+
+
+def add_user(facade, email):
+    """A user stored through the facade"""
+    user = User("Jane", "Roe", email)
+    user._password_hash = "not-a-real-hash"
+    return facade.user_repo.add(user)
+
+
+def add_review(facade, place, rating, user_id="user-1"):
+    """Create a review for the place"""
+    return facade.create_review({
+        'rating': rating, 'comment': "Comment", 'user_id': user_id, 'place_id': place.id
+    })
+
+
+class TestRatingAggregates:
+    """Test that place rating aggregates follow review writes"""
+
+    def test_new_place_has_empty_aggregates(self, facade, place):
+        """Test the aggregates of a place without reviews"""
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 0
+        assert data['average_rating'] == 0.0
+        assert data['rating_histogram'] == {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}
+
+    def test_create_update_delete(self, facade, place):
+        """Test aggregates after creating, updating and deleting reviews"""
+        add_review(facade, place, 5, "user-1")
+        review = add_review(facade, place, 2, "user-2")
+        add_review(facade, place, 5, "user-3")
+
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 3
+        assert data['rating_sum'] == 12
+        assert data['average_rating'] == 4.0
+        assert data['rating_histogram'] == {'1': 0, '2': 1, '3': 0, '4': 0, '5': 2}
+
+        facade.update_review(review.id, {'rating': 4})
+        data = facade.get_place(place.id).to_dict()
+        assert data['rating_sum'] == 14
+        assert data['rating_histogram']['2'] == 0
+        assert data['rating_histogram']['4'] == 1
+
+        facade.delete_review(review.id)
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 2
+        assert data['average_rating'] == 5.0
+
+    def test_invalid_rating_update_rejected(self, facade, place):
+        """Test that an out-of-range rating cannot corrupt the aggregates"""
+        review = add_review(facade, place, 3)
+        with pytest.raises(ValueError, match="Rating must be between 1 and 5"):
+            facade.update_review(review.id, {'rating': 7})
+
+    def test_delete_user_removes_their_ratings(self, facade, place):
+        """Test that deleting a reviewer deletes their reviews and their ratings"""
+        reviewer = add_user(facade, "jane@example.com")
+        add_review(facade, place, 5, reviewer.id)
+        add_review(facade, place, 3, "user-2")
+        facade.delete_user(reviewer.id)
+
+        assert facade.get_reviews_by_user(reviewer.id) == []
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 1
+        assert data['rating_sum'] == 3
+        assert data['rating_histogram']['5'] == 0
+
+    def test_delete_owner_deletes_places_and_reviews(self, facade, place):
+        """Test that deleting an owner deletes their places and the reviews of those"""
+        review = add_review(facade, place, 4)
+        facade.delete_user(place.owner_id)
+        assert facade.get_place(place.id) is None
+        assert facade.get_review(review.id) is None
+
+    def test_delete_place_deletes_reviews(self, facade, place):
+        """Test that the reviews of a deleted place are deleted too"""
+        review = add_review(facade, place, 4)
+        facade.delete_place(place.id)
+        assert facade.get_review(review.id) is None
+        assert facade.get_reviews_by_place(place.id) == []
+
+    def test_failed_increment_rolls_back_review(self, facade, place, monkeypatch):
+        """Test that a review is not stored when its aggregate update fails"""
+        if not facade.use_database:
+            pytest.skip("the in-memory repositories do not roll back")
+
+        def fail(place_id, deltas):
+            raise RuntimeError("connection lost")
+        monkeypatch.setattr(facade.place_repo, 'increment', fail)
+        with pytest.raises(RuntimeError):
+            add_review(facade, place, 5)
+        assert facade.get_reviews_by_place(place.id) == []
+
+    def test_recompute_ratings(self, facade, place):
+        """Test that drifted aggregates are rebuilt from the reviews"""
+        add_review(facade, place, 5, "user-1")
+        add_review(facade, place, 2, "user-2")
+        facade.place_repo.update(place.id, {'review_count': 7, 'rating_sum': 1, 'ratings_3': 4})
+
+        assert facade.recompute_ratings() == 1
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 2
+        assert data['rating_sum'] == 7
+        assert data['rating_histogram'] == {'1': 0, '2': 1, '3': 0, '4': 0, '5': 1}
+
+        result = current_app.test_cli_runner().invoke(args=['recompute-ratings'])
+        assert "of 0 places" in result.output
+
+    def test_sort_by_rating(self, facade, place):
+        """Test listing places from the best rated down"""
+        other = facade.create_place({
+            'title': "Other", 'description': "Other place", 'price': 50.0,
+            'latitude': None, 'longitude': None, 'owner_id': place.owner_id
+        })
+        add_review(facade, place, 3)
+        add_review(facade, other, 5)
+        page = facade.list_places(10, sort='-rating')
+        assert [p.id for p in page.items] == [other.id, place.id]
+
+
+class TestPlaceIncludes:
+    """Test that related data is embedded the same way by both repositories"""
+
+    def test_get_place_with_owner_and_reviews(self, facade, place):
+        """Test owner, reviews and review summary of one place"""
+        review = add_review(facade, place, 4)
+        include = ('owner', 'reviews', 'review_summary')
+        data = facade.get_place(place.id, include).to_dict(include)
+        assert data['owner']['first_name'] == "John"
+        assert [r['id'] for r in data['reviews']] == [review.id]
+        assert data['review_summary']['average_rating'] == 4.0
+        assert 'amenities' not in data
+
+    def test_stored_place_left_unchanged(self, facade, place):
+        """Test that in memory the relations are set on a copy of the stored place"""
+        if facade.use_database:
+            pytest.skip("the session owns the database objects")
+        add_review(facade, place, 4)
+        loaded = facade.get_place(place.id, ('owner', 'reviews'))
+        stored = facade.place_repo.get(place.id)
+        assert loaded is not stored
+        assert 'owner' not in stored.__dict__ and 'reviews' not in stored.__dict__
+
+        facade.update_place(place.id, {'price': 120.0})
+        add_review(facade, place, 2, "user-2")
+        assert len(facade.get_place(place.id, ('reviews',)).reviews) == 2
+
+    def test_list_places_with_owner(self, facade, place):
+        """Test that every place of a page gets its owner"""
+        page = facade.list_places(10, include=('owner',))
+        assert [p.to_dict(('owner',))['owner']['id'] for p in page.items] == [place.owner_id]
+
+
+class TestNearby:
+    """Test proximity search through the facade"""
+
+    def test_large_radius_across_antimeridian(self, facade, place):
+        """Test the bounding box used beyond the grid cells, split at the antimeridian"""
+        east = facade.create_place({
+            'title': "East", 'description': "", 'price': 10.0,
+            'latitude': 0.0, 'longitude': 179.0, 'owner_id': place.owner_id})
+        west = facade.create_place({
+            'title': "West", 'description': "", 'price': 10.0,
+            'latitude': 1.0, 'longitude': -178.0, 'owner_id': place.owner_id})
+        facade.create_place({
+            'title': "Same band", 'description': "", 'price': 10.0,
+            'latitude': 0.0, 'longitude': 20.0, 'owner_id': place.owner_id})
+        results = facade.find_places_nearby(0.0, 179.5, 900, 10)
+        assert [p.id for _, p in results] == [east.id, west.id]
+
+
+class TestBatchOperations:
+    """Test batch writes through the facade"""
+
+    def test_create_reviews_updates_aggregates(self, facade, place):
+        """Test that valid reviews of a batch are counted once per place"""
+        result = facade.create_reviews([
+            {'rating': 5, 'comment': "Great", 'user_id': "user-1", 'place_id': place.id},
+            {'rating': 9, 'comment': "Invalid", 'user_id': "user-2", 'place_id': place.id},
+            {'rating': 3, 'comment': "Fine", 'user_id': "user-3", 'place_id': place.id}
+        ])
+        assert sorted(result.items) == [0, 2]
+        assert "Rating" in result.errors[1]
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 2
+        assert data['average_rating'] == 4.0
+
+    def test_update_and_delete_reviews(self, facade, place):
+        """Test that batch updates and deletes move ratings in the aggregates"""
+        first = add_review(facade, place, 5, "user-1")
+        second = add_review(facade, place, 1, "user-2")
+        facade.update_reviews([(first.id, {'rating': 3}), ("missing-id", {'rating': 2})])
+        facade.delete_reviews([second.id])
+        data = facade.get_place(place.id).to_dict()
+        assert data['review_count'] == 1
+        assert data['rating_histogram'] == {'1': 0, '2': 0, '3': 1, '4': 0, '5': 0}
+
+    def test_failed_increment_rolls_back_batch(self, facade, place, monkeypatch):
+        """Test that a batch of reviews is not stored when its aggregate update fails"""
+        if not facade.use_database:
+            pytest.skip("the in-memory repositories do not roll back")
+
+        def fail(place_id, deltas):
+            raise RuntimeError("connection lost")
+        monkeypatch.setattr(facade.place_repo, 'increment', fail)
+        with pytest.raises(RuntimeError):
+            facade.create_reviews([
+                {'rating': 5, 'comment': "Great", 'user_id': "user-1", 'place_id': place.id}
+            ])
+        assert facade.get_reviews_by_place(place.id) == []
+
+    def test_create_places_reports_invalid_items(self, facade, place):
+        """Test that invalid places are reported by position"""
+        result = facade.create_places([
+            {'title': "", 'description': "", 'price': 10.0,
+             'latitude': None, 'longitude': None, 'owner_id': place.owner_id},
+            {'title': "Loft", 'description': "", 'price': 80.0,
+             'latitude': 48.8, 'longitude': 2.3, 'owner_id': place.owner_id}
+        ])
+        assert list(result.errors) == [0]
+        assert result.items[1].title == "Loft"
+        assert facade.get_place(result.items[1].id) is not None
+
+
+class TestFacadeWiring:
+    """Test the app-scoped facade and its lazy repositories"""
+
+    def test_one_facade_per_app(self, facade):
+        """Test that every module sees the facade of the current app"""
+        from app import facade as app_facade
+        from app.api import auth, places
+        assert auth.facade._get_current_object() is facade
+        assert places.facade._get_current_object() is facade
+        assert app_facade._get_current_object() is facade
+
+    def test_repositories_built_on_first_use(self):
+        """Test that repositories are created when first accessed, then kept"""
+        facade = HBnBFacade(use_database=False)
+        assert 'review_repo' not in facade.__dict__
+        repo = facade.review_repo
+        assert facade.review_repo is repo
+        assert 'place_repo' not in facade.__dict__
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,104 @@
+"""
+Unit Tests for the grid-cell spatial index
+Tests cell coverage and nearest-first proximity search
+"""
+
+import pytest
+import sys
+import os
+import random
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.persistence import geo
+from app.persistence.memory_repository import InMemoryRepository
+from app.business.place import Place
+
+
+def in_cell_ranges(cell, ranges):
+    """Check whether a cell belongs to any of the ranges"""
+    return any(first <= cell <= last for first, last in ranges)
+
+
+class TestCellRanges:
+    """Test that cell ranges cover every point within the radius"""
+
+    @pytest.mark.parametrize("center", [
+        (40.7128, -74.0060),
+        (0.0, 179.95),
+        (-33.8688, 151.2093),
+        (89.5, 10.0),
+    ])
+    def test_points_within_radius_are_covered(self, center):
+        """Test random points inside the circle fall in a covered cell"""
+        rng = random.Random(42)
+        radius_km = 50
+        ranges = geo.cell_ranges(center[0], center[1], radius_km)
+        assert ranges is not None
+        checked = 0
+        while checked < 500:
+            lat = max(-90.0, min(90.0, center[0] + rng.uniform(-0.5, 0.5)))
+            lon = center[1] + rng.uniform(-1.5, 1.5)
+            lon = (lon + 180) % 360 - 180
+            if geo.haversine_km(center[0], center[1], lat, lon) <= radius_km:
+                assert in_cell_ranges(geo.cell_for(lat, lon), ranges)
+                checked += 1
+
+    def test_huge_radius_falls_back(self):
+        """Test that very large circles do not produce cell ranges"""
+        assert geo.cell_ranges(0.0, 0.0, 1000) is None
+
+
+class TestNearest:
+    """Test the haversine refinement step"""
+
+    def test_nearest_first_within_radius(self):
+        """Test ordering, radius cut-off and limit"""
+        places = [
+            Place("Far", "D", 10.0, 41.5, -74.0, "o"),
+            Place("Near", "D", 10.0, 40.72, -74.0, "o"),
+            Place("Mid", "D", 10.0, 40.9, -74.0, "o"),
+            Place("Nowhere", "D", 10.0, None, None, "o"),
+        ]
+        results = geo.nearest(40.7128, -74.0060, places, 50, 10)
+        assert [p.title for _, p in results] == ["Near", "Mid"]
+        assert results[0][0] < 1.0
+        assert len(geo.nearest(40.7128, -74.0060, places, 50, 1)) == 1
+
+
+    def test_arrays_match_loop(self, monkeypatch):
+        """Test that the NumPy refinement keeps the same places in the same order"""
+        pytest.importorskip('numpy')
+        rng = random.Random(3)
+        places = [Place(f"P{i}", "D", 10.0, round(rng.uniform(40, 41.5), 2),
+                        round(rng.uniform(-75, -73), 2), "o") for i in range(600)]
+        places[10].latitude = places[10].longitude = None
+        # Equal coordinates, so that ties are broken by position
+        places[20].latitude, places[20].longitude = places[30].latitude, places[30].longitude
+
+        monkeypatch.setattr(geo, 'VECTORIZE_MIN', 10 ** 9)
+        expected = geo.nearest(40.7, -74.0, places, 60, 25)
+        monkeypatch.setattr(geo, 'VECTORIZE_MIN', 0)
+        results = geo.nearest(40.7, -74.0, places, 60, 25)
+        assert [p for _, p in results] == [p for _, p in expected]
+        assert [d for d, _ in results] == pytest.approx([d for d, _ in expected])
+
+
+class TestFindWithin:
+    """Test interval scans on an ordered repository index"""
+
+    def test_find_within_cells(self):
+        """Test candidate lookup by cell ranges and latitude band"""
+        repo = InMemoryRepository(ordered_indexes=('geo_cell',))
+        inside = Place("Inside", "D", 10.0, 40.72, -74.0, "o")
+        outside = Place("Outside", "D", 10.0, 48.85, 2.35, "o")
+        for place in (inside, outside):
+            place.geo_cell = geo.cell_for(place.latitude, place.longitude)
+            repo.create(place)
+        ranges = geo.cell_ranges(40.7128, -74.0060, 10)
+        assert repo.find_within('geo_cell', ranges, {'latitude': (40.0, 41.0)}) == [inside]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,156 @@
+"""
+Unit Tests for the bcrypt worker pool
+Tests hashing, verification and load shedding
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Flask
+
+from app import create_app, db
+from app.hashing import PasswordHasher, PasswordPoolBusy, hash_cost, rejected_total
+from app.models import User
+
+
+def make_hasher(**config):
+    """Hasher bound to a bare app with cheap bcrypt rounds"""
+    app = Flask(__name__)
+    app.config.update({'BCRYPT_LOG_ROUNDS': 4, **config})
+    return PasswordHasher(app)
+
+
+class TestPasswordHasher:
+    """Test the bounded password pool"""
+
+    def test_hash_and_verify(self):
+        """Test that a hash verifies only its own password"""
+        hasher = make_hasher()
+        pw_hash = hasher.hash("secret")
+        assert pw_hash.startswith("$2b$04$")
+        assert hasher.verify(pw_hash, "secret")
+        assert not hasher.verify(pw_hash, "wrong")
+
+    def test_inline_without_app(self):
+        """Test that an unbound hasher still works on the calling thread"""
+        hasher = PasswordHasher()
+        hasher.rounds = 4
+        assert hasher.verify(hasher.hash("secret"), "secret")
+
+    def test_saturated_pool_sheds_work(self):
+        """Test that work beyond workers + max pending is rejected"""
+        hasher = make_hasher(PASSWORD_POOL_WORKERS=1, PASSWORD_POOL_MAX_PENDING=0)
+        release = threading.Event()
+        started = threading.Event()
+
+        def blocking(*args):
+            started.set()
+            release.wait(5)
+            return True
+
+        worker = threading.Thread(target=hasher._run, args=('hash', blocking))
+        worker.start()
+        started.wait(5)
+        before = rejected_total.value(operation='hash')
+        try:
+            with pytest.raises(PasswordPoolBusy):
+                hasher.hash("secret")
+        finally:
+            release.set()
+            worker.join()
+        assert rejected_total.value(operation='hash') == before + 1
+        # The slot is given back once the blocked operation finishes
+        assert hasher.hash("secret")
+
+    def test_timeout_sheds_work(self):
+        """Test that waiting longer than the timeout raises PasswordPoolBusy"""
+        hasher = make_hasher(PASSWORD_POOL_WORKERS=1, PASSWORD_POOL_TIMEOUT=0.01)
+        release = threading.Event()
+        with pytest.raises(PasswordPoolBusy, match="timed out"):
+            hasher._run('verify', lambda: release.wait(5))
+        release.set()
+
+
+    def test_needs_rehash(self):
+        """Test that hashes made with another cost are flagged"""
+        hasher = make_hasher()
+        assert hash_cost(hasher.hash("secret")) == 4
+        assert not hasher.needs_rehash(hasher.hash("secret"))
+        assert hasher.needs_rehash(make_hasher(BCRYPT_LOG_ROUNDS=5).hash("secret"))
+        assert hasher.needs_rehash("not-a-bcrypt-hash")
+
+
+class TestRehashOnLogin:
+    """Test that login upgrades hashes to the configured cost"""
+
+    @pytest.fixture
+    def app(self, monkeypatch):
+        """Application backed by an in-memory database"""
+        monkeypatch.setenv('USE_DATABASE', 'true')
+        app = create_app('testing')
+        with app.app_context():
+            db.create_all()
+            yield app
+            db.session.remove()
+            db.drop_all()
+
+    def _add_user(self, rounds):
+        """Store a user whose hash was made with the given cost"""
+        user = User("John", "Doe", "john@example.com")
+        user._password_hash = make_hasher(BCRYPT_LOG_ROUNDS=rounds).hash("secret")
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def _login(self, app, password):
+        """Post credentials to the login endpoint"""
+        return app.test_client().post('/api/auth/login', json={
+            'email': "john@example.com", 'password': password})
+
+    def test_login_rehashes_other_cost(self, app):
+        """Test that a successful login stores a hash with the configured cost"""
+        user = self._add_user(5)
+        assert self._login(app, "secret").status_code == 200
+        db.session.refresh(user)
+        assert hash_cost(user._password_hash) == app.config['BCRYPT_LOG_ROUNDS']
+        assert self._login(app, "secret").status_code == 200
+
+    def test_rehash_writes_only_the_hash(self, app):
+        """Test that the upgrade keeps updated_at and the user caches"""
+        user = self._add_user(5)
+        updated_at = user.updated_at
+        version = app.extensions['facade'].collection_version('users')
+        assert self._login(app, "secret").status_code == 200
+        db.session.refresh(user)
+        assert user.updated_at == updated_at
+        assert app.extensions['facade'].collection_version('users') == version
+
+    def test_busy_pool_skips_rehash(self, app, monkeypatch):
+        """Test that a saturated pool during the upgrade still logs the user in"""
+        user = self._add_user(5)
+        old_hash = user._password_hash
+
+        def busy(password):
+            raise PasswordPoolBusy("Too many password operations in progress")
+
+        monkeypatch.setattr(app.extensions['password_hasher'], 'hash', busy)
+        assert self._login(app, "secret").status_code == 200
+        db.session.refresh(user)
+        assert user._password_hash == old_hash
+
+    def test_failed_login_keeps_hash(self, app):
+        """Test that a wrong password never touches the stored hash"""
+        user = self._add_user(5)
+        old_hash = user._password_hash
+        assert self._login(app, "wrong").status_code == 401
+        db.session.refresh(user)
+        assert user._password_hash == old_hash
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Unit Tests for per-request instrumentation
+Tests the Server-Timing header, the endpoint metrics and N+1 detection
+"""
+
+import pytest
+import sys
+import os
+import logging
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask import Response
+from sqlalchemy import text
+
+from app import create_app, db, instrumentation
+from app.instrumentation import n_plus_one, sql_statements
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Database backed application with two amenities"""
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        facade = app.extensions['facade']
+        facade.create_amenity({'name': "WiFi"})
+        facade.create_amenity({'name': "Pool"})
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+class TestRequestInstrumentation:
+    """Test what is recorded for each request"""
+
+    def test_server_timing_header(self, app):
+        """Test that the header reports the request, SQL and encoding times"""
+        before = sql_statements.stats(endpoint='amenities_amenity_list')['count']
+        response = app.test_client().get('/api/amenities/')
+        timing = dict(part.split(';', 1) for part in response.headers['Server-Timing'].split(', '))
+        assert set(timing) == {'app', 'db', 'serialize'}
+        assert 'queries' in timing['db'] and 'desc="0 queries"' not in timing['db']
+        assert sql_statements.stats(endpoint='amenities_amenity_list')['count'] == before + 1
+
+    def test_server_timing_disabled(self, app):
+        """Test that SERVER_TIMING_ENABLED=false keeps the metrics only"""
+        app.config['SERVER_TIMING_ENABLED'] = False
+        instrumentation.init_app(app)
+        assert 'Server-Timing' not in app.test_client().get('/api/amenities/').headers
+
+    def test_metrics_endpoint(self, app):
+        """Test that /api/metrics renders the registry for Prometheus"""
+        client = app.test_client()
+        client.get('/api/amenities/')
+        response = client.get('/api/metrics')
+        assert response.status_code == 200
+        assert response.mimetype == 'text/plain'
+        body = response.get_data(as_text=True)
+        assert 'hbnb_request_duration_seconds_count{endpoint="amenities_amenity_list",method="GET"}' in body
+        assert '# TYPE hbnb_request_sql_duration_seconds summary' in body
+
+    def test_n_plus_one_logged(self, app, caplog):
+        """Test that a statement repeated above the threshold is reported"""
+        app.config['N_PLUS_ONE_THRESHOLD'] = 2
+        instrumentation.init_app(app)
+        before = n_plus_one.value(endpoint='unmatched')
+        with app.test_request_context('/loop'), caplog.at_level(logging.WARNING):
+            instrumentation.before_request()
+            for _ in range(3):
+                db.session.execute(text('SELECT 1'))
+            response = instrumentation.after_request(Response())
+
+        assert 'desc="3 queries"' in response.headers['Server-Timing']
+        assert n_plus_one.value(endpoint='unmatched') == before + 1
+        assert '3 executions of SELECT 1' in caplog.text
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
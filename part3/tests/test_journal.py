@@ -0,0 +1,219 @@
+"""
+Unit Tests for the journaled in-memory repository
+Tests replay after a restart, torn records, snapshots and facade wiring
+"""
+
+import pytest
+import sys
+import os
+import threading
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app
+from app.config import TestingConfig
+from app.models import Place, User
+from app.persistence.journal import DurableInMemoryRepository
+
+PLACE_INDEXES = {'indexes': ('owner_id',), 'ordered_indexes': ('price', 'average_rating')}
+
+
+@pytest.fixture
+def app():
+    """Application context for the models"""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+
+
+def open_places(directory, **journal_options):
+    """Place repository journaled in directory"""
+    return DurableInMemoryRepository(Place, str(directory), journal_options, **PLACE_INDEXES)
+
+
+def new_place(title, price, owner_id="owner-1"):
+    """Unsaved place"""
+    return Place(title, "Description", price, 40.7, -74.0, owner_id)
+
+
+class TestDurableRepository:
+    """Test that writes survive a restart"""
+
+    def test_replay_after_restart(self, app, tmp_path):
+        """Test that creates, updates and deletes are replayed with their indexes"""
+        repo = open_places(tmp_path)
+        kept = repo.add(new_place("Loft", 120.0))
+        gone = repo.add(new_place("Cabin", 80.0))
+        repo.update(kept.id, {'price': 150.0})
+        repo.increment(kept.id, Place.rating_deltas(added=4))
+        repo.delete(gone.id)
+        repo.close()
+
+        repo = open_places(tmp_path)
+        assert [p.title for p in repo.list()] == ["Loft"]
+        place = repo.get(kept.id)
+        assert place.price == 150.0
+        assert place.created_at == kept.created_at
+        assert place.to_dict()['rating_histogram']['4'] == 1
+        assert [p.id for p in repo.get_all_by_attribute('owner_id', "owner-1")] == [kept.id]
+        assert repo.get_page(10, order_by='average_rating').items[0].id == kept.id
+        assert repo.version()[1] is not None
+        repo.close()
+
+    def test_unique_index_rebuilt(self, app, tmp_path):
+        """Test that unique values are still enforced after a restart"""
+        repo = DurableInMemoryRepository(User, str(tmp_path), unique_indexes=('email',))
+        user = User("John", "Doe", "john@example.com")
+        user._password_hash = "not-a-real-hash"
+        repo.add(user)
+        repo.close()
+
+        repo = DurableInMemoryRepository(User, str(tmp_path), unique_indexes=('email',))
+        assert repo.get_by_email("john@example.com")._password_hash == "not-a-real-hash"
+        with pytest.raises(ValueError):
+            repo.add(User("Jane", "Doe", "john@example.com"))
+        repo.close()
+
+    def test_set_columns_replayed(self, app, tmp_path):
+        """Test that a rewritten hash survives a restart without a new version"""
+        repo = DurableInMemoryRepository(User, str(tmp_path), unique_indexes=('email',))
+        user = User("John", "Doe", "john@example.com")
+        user._password_hash = "old-hash"
+        repo.add(user)
+        version = repo.version()
+        assert repo.set_columns(user.id, {'_password_hash': "new-hash"})
+        assert repo.version() == version
+        repo.close()
+
+        repo = DurableInMemoryRepository(User, str(tmp_path), unique_indexes=('email',))
+        stored = repo.get(user.id)
+        assert stored._password_hash == "new-hash"
+        assert stored.updated_at == user.updated_at
+        repo.close()
+
+    def test_torn_record_dropped(self, app, tmp_path):
+        """Test that a partly written last record is ignored and cut off"""
+        repo = open_places(tmp_path)
+        repo.add(new_place("Loft", 120.0))
+        repo.close()
+        journal = tmp_path / 'places.journal'
+        size = journal.stat().st_size
+        with open(journal, 'ab') as file:
+            file.write(b'\x40\x00\x00\x00garbage')
+
+        repo = open_places(tmp_path)
+        assert len(repo.list()) == 1
+        assert journal.stat().st_size == size
+        repo.add(new_place("Cabin", 80.0))
+        repo.close()
+        assert len(open_places(tmp_path).list()) == 2
+
+    def test_snapshot_compacts_journal(self, app, tmp_path):
+        """Test that a snapshot replaces the journal and keeps every object"""
+        repo = open_places(tmp_path, snapshot_every=3)
+        place = repo.add(new_place("Loft", 120.0))
+        for price in (100.0, 110.0, 130.0):
+            repo.update(place.id, {'price': price})
+        # Written in the background by the write that reached snapshot_every
+        repo._compaction.join()
+        assert (tmp_path / 'places.snapshot').exists()
+        assert not (tmp_path / 'places.journal.previous').exists()
+        assert repo._journal.records == 1
+        repo.close()
+
+        repo = open_places(tmp_path)
+        assert repo.get(place.id).price == 130.0
+        repo.close()
+
+    def test_reads_and_writes_during_snapshot(self, app, tmp_path, monkeypatch):
+        """Test that a snapshot being written blocks neither reads nor writes"""
+        repo = open_places(tmp_path)
+        place = repo.add(new_place("Loft", 120.0))
+        started, release = threading.Event(), threading.Event()
+        write_snapshot = repo._journal.write_snapshot
+
+        def slow_write_snapshot(generation, items):
+            started.set()
+            release.wait(5)
+            write_snapshot(generation, items)
+
+        monkeypatch.setattr(repo._journal, 'write_snapshot', slow_write_snapshot)
+        repo.compact(wait=False)
+        assert started.wait(5)
+        try:
+            read = threading.Thread(target=lambda: (repo.get(place.id), repo.list()))
+            read.start()
+            read.join(1)
+            assert not read.is_alive()
+            repo.update(place.id, {'price': 150.0})
+        finally:
+            release.set()
+        repo.close()
+
+        repo = open_places(tmp_path)
+        assert repo.get(place.id).price == 150.0
+        repo.close()
+
+    def test_interrupted_snapshot_replayed(self, app, tmp_path, monkeypatch):
+        """Test that records rotated out before a failed snapshot are not lost"""
+        repo = open_places(tmp_path)
+        kept = repo.add(new_place("Loft", 120.0))
+
+        def crash(generation, items):
+            raise OSError("disk full")
+
+        monkeypatch.setattr(repo._journal, 'write_snapshot', crash)
+        repo.compact()
+        repo.update(kept.id, {'price': 150.0})
+        repo.close()
+        assert (tmp_path / 'places.journal.previous').exists()
+
+        repo = open_places(tmp_path)
+        assert [(p.id, p.price) for p in repo.list()] == [(kept.id, 150.0)]
+        assert not (tmp_path / 'places.journal.previous').exists()
+        repo.close()
+        assert [p.price for p in open_places(tmp_path).list()] == [150.0]
+
+    def test_stale_journal_ignored(self, app, tmp_path):
+        """Test that a journal already folded into the snapshot is not replayed"""
+        repo = open_places(tmp_path)
+        place = repo.add(new_place("Loft", 120.0))
+        old_journal = (tmp_path / 'places.journal').read_bytes()
+        repo.delete(place.id)
+        repo.compact()
+        repo.close()
+        # As if the process died between writing the snapshot and the new journal
+        (tmp_path / 'places.journal').write_bytes(old_journal)
+
+        assert open_places(tmp_path).list() == ()
+
+    def test_single_process(self, app, tmp_path):
+        """Test that a second repository cannot open the same files"""
+        repo = open_places(tmp_path)
+        with pytest.raises(RuntimeError):
+            open_places(tmp_path)
+        repo.close()
+
+
+class TestFacadeJournal:
+    """Test MEMORY_JOURNAL_DIR"""
+
+    def test_facade_survives_restart(self, tmp_path, monkeypatch):
+        """Test that a new application sees the amenities of the previous one"""
+        monkeypatch.setenv('USE_DATABASE', 'false')
+        monkeypatch.setattr(TestingConfig, 'MEMORY_JOURNAL_DIR', str(tmp_path))
+        first = create_app('testing')
+        with first.app_context():
+            amenity = first.extensions['facade'].create_amenity({'name': "WiFi"})
+            first.extensions['facade'].amenity_repo.close()
+
+        second = create_app('testing')
+        with second.app_context():
+            facade = second.extensions['facade']
+            assert facade.get_amenity(amenity.id).name == "WiFi"
+            facade.amenity_repo.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
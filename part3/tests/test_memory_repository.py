@@ -0,0 +1,290 @@
+"""
+Unit Tests for the InMemoryRepository
+Tests CRUD operations and secondary index maintenance
+"""
+
+import pytest
+import sys
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.persistence.memory_repository import InMemoryRepository
+from app.persistence.pagination import encode_cursor
+from app.business.review import Review
+from app.business.amenity import Amenity
+from app.business.place import Place
+
+
+class Account:
+    """Minimal entity with an email attribute"""
+
+    def __init__(self, email):
+        self.email = email
+
+
+class TestSecondaryIndexes:
+    """Test unique and non-unique secondary indexes"""
+
+    def test_unique_index_lookup(self):
+        """Test that a unique index finds the object by value"""
+        repo = InMemoryRepository(unique_indexes=('email',))
+        account = repo.create(Account("john@example.com"))
+        assert repo.get_by_email("john@example.com") is account
+        assert repo.get_by_attribute('email', "jane@example.com") is None
+
+    def test_unique_index_rejects_duplicates(self):
+        """Test that creating a duplicate unique value raises ValueError"""
+        repo = InMemoryRepository(unique_indexes=('email',))
+        repo.create(Account("john@example.com"))
+        with pytest.raises(ValueError, match="already exists"):
+            repo.create(Account("john@example.com"))
+        assert len(repo.list()) == 1
+
+    def test_unique_index_follows_update(self):
+        """Test that updating an indexed attribute moves the index entry"""
+        repo = InMemoryRepository(unique_indexes=('email',))
+        account = repo.create(Account("john@example.com"))
+        updated = repo.update(account.id, {'email': "johnny@example.com"})
+        assert repo.get_by_email("john@example.com") is None
+        assert repo.get_by_email("johnny@example.com") is updated
+        # The update is applied to a copy, the previous object is unchanged
+        assert updated is not account and account.email == "john@example.com"
+
+    def test_unique_index_update_conflict(self):
+        """Test that an update cannot steal another object's unique value"""
+        repo = InMemoryRepository(unique_indexes=('email',))
+        repo.create(Account("john@example.com"))
+        jane = repo.create(Account("jane@example.com"))
+        with pytest.raises(ValueError, match="already exists"):
+            repo.update(jane.id, email="john@example.com")
+        assert repo.get_by_email("jane@example.com") is jane
+
+    def test_non_unique_index_lookup(self):
+        """Test that a non-unique index returns every matching object"""
+        repo = InMemoryRepository(indexes=('place_id', 'user_id'))
+        first = repo.create(Review(5, "Great!", "user-1", "place-1"))
+        second = repo.create(Review(3, "Okay", "user-2", "place-1"))
+        repo.create(Review(4, "Nice", "user-1", "place-2"))
+        reviews = repo.get_all_by_attribute('place_id', "place-1")
+        assert {r.id for r in reviews} == {first.id, second.id}
+        assert len(repo.get_all_by_attribute('user_id', "user-1")) == 2
+        assert repo.get_all_by_attribute('place_id', "place-3") == []
+
+    def test_delete_removes_index_entries(self):
+        """Test that deleted objects disappear from the indexes"""
+        repo = InMemoryRepository(unique_indexes=('name',), indexes=('place_id',))
+        amenity = repo.create(Amenity("WiFi", "High-speed internet"))
+        review = repo.create(Review(5, "Great!", "user-1", "place-1"))
+        repo.delete(amenity.id)
+        repo.delete(review.id)
+        assert repo.get_by_attribute('name', "WiFi") is None
+        assert repo.get_all_by_attribute('place_id', "place-1") == []
+        repo.create(Amenity("WiFi", "Recreated"))
+
+    def test_unindexed_attribute_falls_back_to_scan(self):
+        """Test lookups on attributes without an index"""
+        repo = InMemoryRepository()
+        review = repo.create(Review(5, "Great!", "user-1", "place-1"))
+        assert repo.get_by_attribute('place_id', "place-1") is review
+        assert repo.get_all_by_attribute('rating', 5) == [review]
+
+
+class TestKeysetPagination:
+    """Test cursor-based pagination ordered by (created_at, id)"""
+
+    def _fill(self, repo, count):
+        """Create reviews sharing a few creation timestamps"""
+        base = datetime(2024, 1, 1)
+        for i in range(count):
+            review = Review(5, f"Review {i}", "user-1", "place-1")
+            review.created_at = base + timedelta(seconds=i // 3)
+            repo.create(review)
+
+    def test_pages_cover_every_object_once(self):
+        """Test that following cursors visits every object in order"""
+        repo = InMemoryRepository()
+        self._fill(repo, 10)
+        seen, cursor = [], None
+        while True:
+            page = repo.get_page(4, cursor)
+            seen.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert len(seen) == 10
+        assert len({r.id for r in seen}) == 10
+        keys = [(r.created_at, r.id) for r in seen]
+        assert keys == sorted(keys)
+
+    def test_last_page_has_no_cursor(self):
+        """Test that an exactly full last page returns no cursor"""
+        repo = InMemoryRepository()
+        self._fill(repo, 4)
+        page = repo.get_page(4)
+        assert len(page.items) == 4
+        assert page.next_cursor is None
+
+    def test_deleted_objects_leave_pages(self):
+        """Test that deleted objects are removed from the ordering"""
+        repo = InMemoryRepository()
+        self._fill(repo, 3)
+        first = repo.get_page(1).items[0]
+        repo.delete(first.id)
+        assert first not in repo.get_page(10).items
+
+    def test_invalid_cursor(self):
+        """Test that malformed or foreign cursors raise ValueError"""
+        repo = InMemoryRepository()
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            repo.get_page(10, "not-a-cursor")
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            repo.get_page(10, encode_cursor('price', 10.0, 'some-id'))
+
+
+class TestRangeSearch:
+    """Test range filters and sorting over ordered indexes"""
+
+    PRICES = [80.0, 120.0, 45.0, 300.0, 120.0, 95.0, 210.0, 60.0]
+
+    @pytest.fixture
+    def repo(self):
+        """Places spread over prices and latitudes"""
+        repo = InMemoryRepository(ordered_indexes=('price', 'latitude', 'longitude'))
+        for i, price in enumerate(self.PRICES):
+            repo.create(Place(f"Place {i}", "Description", price, 10.0 * i, 5.0 * i, "owner-id"))
+        return repo
+
+    def _all_pages(self, repo, limit, **kwargs):
+        """Collect every page of a query"""
+        items, cursor = [], None
+        while True:
+            page = repo.get_page(limit, cursor, **kwargs)
+            items.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                return items
+
+    def test_sort_by_price(self, repo):
+        """Test ascending and descending price order across pages"""
+        ascending = self._all_pages(repo, 3, order_by='price')
+        assert [p.price for p in ascending] == sorted(self.PRICES)
+        descending = self._all_pages(repo, 3, order_by='price', descending=True)
+        assert [p.price for p in descending] == sorted(self.PRICES, reverse=True)
+
+    def test_price_range(self, repo):
+        """Test inclusive price bounds on the sorted index"""
+        places = self._all_pages(repo, 2, order_by='price', ranges={'price': (60.0, 120.0)})
+        assert [p.price for p in places] == [60.0, 80.0, 95.0, 120.0, 120.0]
+
+    def test_bounding_box_with_other_sort(self, repo):
+        """Test a bounding box combined with ordering by another attribute"""
+        ranges = {'latitude': (10.0, 50.0), 'longitude': (None, 20.0)}
+        places = self._all_pages(repo, 2, order_by='price', ranges=ranges)
+        assert [p.price for p in places] == [45.0, 120.0, 120.0, 300.0]
+
+    def test_cursor_bound_to_sort(self, repo):
+        """Test that a cursor cannot be reused with a different sort"""
+        cursor = repo.get_page(2, order_by='price').next_cursor
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            repo.get_page(2, cursor, order_by='price', descending=True)
+
+    def test_unindexed_sort_rejected(self, repo):
+        """Test that sorting requires an ordered index"""
+        with pytest.raises(ValueError, match="Cannot sort by title"):
+            repo.get_page(2, order_by='title')
+
+
+class Item:
+    """Minimal entity for the concurrency tests"""
+
+    def __init__(self, group, value):
+        self.group = group
+        self.value = value
+        self.hits = 0
+
+
+class TestConcurrency:
+    """Hammer one repository from writer and reader threads"""
+
+    ITEMS = 200
+    WRITERS = 4
+    READERS = 4
+    WRITES = 400
+
+    @pytest.fixture(autouse=True)
+    def fast_switching(self):
+        """Switch threads very often so reads and writes interleave"""
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(interval)
+
+    def test_consistent_reads_and_no_lost_updates(self):
+        """Test that readers see whole versions and every increment is kept"""
+        repo = InMemoryRepository(indexes=('group',), ordered_indexes=('value',))
+        ids = [repo.create(Item(i % 10, i)).id for i in range(self.ITEMS)]
+        done = threading.Event()
+        errors = []
+        counts = {'reads': 0}
+
+        def write(seed):
+            rng = random.Random(seed)
+            for _ in range(self.WRITES):
+                obj_id = rng.choice(ids)
+                repo.increment(obj_id, {'hits': 1})
+                repo.update(obj_id, {'value': rng.randrange(1000)})
+                extra = repo.create(Item(rng.randrange(10), rng.randrange(1000)))
+                repo.delete(extra.id)
+
+        def read():
+            reads = 0
+            try:
+                while not done.is_set():
+                    values = [obj.value for obj in repo.get_page(50, order_by='value').items]
+                    assert values == sorted(values)
+                    group = reads % 10
+                    assert all(obj.group == group for obj in repo.get_all_by_attribute('group', group))
+                    assert self.ITEMS <= len(repo.list()) <= self.ITEMS + self.WRITERS
+                    reads += 3
+            except AssertionError as e:
+                errors.append(e)
+            counts['reads'] += reads
+
+        readers = [threading.Thread(target=read) for _ in range(self.READERS)]
+        writers = [threading.Thread(target=write, args=(seed,)) for seed in range(self.WRITERS)]
+        started = time.perf_counter()
+        for thread in readers + writers:
+            thread.start()
+        for thread in writers:
+            thread.join()
+        done.set()
+        for thread in readers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        assert errors == []
+        assert sum(obj.hits for obj in repo.list()) == self.WRITERS * self.WRITES
+        assert sorted(repo._ordered['value']) == sorted((obj.value, obj.id) for obj in repo.list())
+        writes = self.WRITERS * self.WRITES * 4
+        print(f"\n{writes / elapsed:,.0f} writes/s, {counts['reads'] / elapsed:,.0f} reads/s")
+
+    def test_list_snapshot_shared_until_write(self):
+        """Test that list() returns one immutable snapshot per version"""
+        repo = InMemoryRepository()
+        item = repo.create(Item(1, 1))
+        first = repo.list()
+        assert repo.list() is first and isinstance(first, tuple)
+        repo.update(item.id, {'value': 2})
+        second = repo.list()
+        assert second is not first
+        assert first[0].value == 1 and second[0].value == 2
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
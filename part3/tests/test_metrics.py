@@ -0,0 +1,61 @@
+"""
+Unit Tests for the metrics registry
+Tests the Prometheus text rendering and the recent maximum of summaries
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import metrics
+from app.metrics import Registry
+
+
+class TestRender:
+    """Test the text exposition format"""
+
+    def test_summary_max_is_a_gauge(self):
+        """Test that the maximum is its own gauge family, not a summary sample"""
+        registry = Registry()
+        registry.summary('job_seconds', 'Job duration').observe(0.5, job='a')
+        lines = registry.render().splitlines()
+        assert lines == [
+            '# HELP job_seconds Job duration',
+            '# TYPE job_seconds summary',
+            'job_seconds_count{job="a"} 1',
+            'job_seconds_sum{job="a"} 0.5',
+            '# HELP job_seconds_max Job duration, largest in the last 60 to 120 seconds',
+            '# TYPE job_seconds_max gauge',
+            'job_seconds_max{job="a"} 0.5',
+        ]
+
+    def test_label_values_escaped(self):
+        """Test that backslashes, quotes and newlines in label values are escaped"""
+        registry = Registry()
+        registry.counter('hits', 'Hits').inc(path='C:\\tmp\\"x"\nend')
+        assert 'hits_total{path="C:\\\\tmp\\\\\\"x\\"\\nend"} 1' in registry.render()
+
+
+class TestSummaryMax:
+    """Test that the maximum only covers recent observations"""
+
+    def test_max_expires(self, monkeypatch):
+        """Test that a peak is reported for one to two windows, then dropped"""
+        now = [1000.0]
+        monkeypatch.setattr(metrics.time, 'monotonic', lambda: now[0])
+        summary = Registry().summary('job_seconds', 'Job duration')
+        summary.observe(3.0)
+        now[0] += 70
+        summary.observe(1.0)
+        assert summary.stats()['max'] == 3.0
+        now[0] += 60
+        assert summary.stats()['max'] == 1.0
+        now[0] += 120
+        assert summary.stats() == {'count': 2, 'sum': 4.0, 'max': 0.0}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,136 @@
+"""
+Unit Tests for the Alembic migrations
+Tests that the migrated schema matches the models and that the hot
+queries are answered from an index
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import select, text
+import flask_migrate
+
+from app import create_app, db, init_migrate
+from app.config import TestingConfig
+from app.models import Place, Review, place_amenity
+from app.persistence.geo import cell_for
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application on an empty SQLite file, nothing migrated yet"""
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'hbnb.db'}")
+    app = create_app('testing')
+    with app.app_context():
+        init_migrate(app)
+        yield app
+        db.session.remove()
+
+
+def query_plan(statement):
+    """EXPLAIN QUERY PLAN details of a statement"""
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    # Own connection, so that no transaction stays open across migrations
+    with db.engine.connect() as connection:
+        return ' | '.join(row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}')))
+
+
+class TestMigrations:
+    """Test upgrading and downgrading"""
+
+    def test_cli_upgrade_matches_models(self, app):
+        """Test that `flask db upgrade` builds the schema the models declare"""
+        result = app.test_cli_runner().invoke(args=['db', 'upgrade'])
+        assert result.exit_code == 0, result.output
+        with db.engine.connect() as connection:
+            assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+
+    def test_downgrade_and_upgrade_again(self, app):
+        """Test that the index revision can be reverted and reapplied"""
+        flask_migrate.upgrade()
+        flask_migrate.downgrade(revision='0001')
+        assert 'ix_reviews_place_id' not in query_plan(select(Review).where(Review.place_id == 'p'))
+        flask_migrate.upgrade()
+        assert 'ix_reviews_place_id' in query_plan(select(Review).where(Review.place_id == 'p'))
+
+    def test_baseline_data_backfilled(self, app):
+        """Test that a pre-migration database gets its grid cells and rating aggregates"""
+        flask_migrate.upgrade(revision='0001')
+        with db.engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO places (id, title, price, latitude, longitude, owner_id, created_at, updated_at) "
+                "VALUES ('p1', 'Loft', 100, 40.7, -74.0, 'u1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP), "
+                "('p2', 'Boat', 80, NULL, NULL, 'u1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+            for review_id, rating, user_id in (('r1', 5, 'u2'), ('r2', 3, 'u3'), ('r3', 5, 'u4')):
+                connection.execute(text(
+                    "INSERT INTO reviews (id, rating, comment, user_id, place_id, created_at, updated_at) "
+                    f"VALUES ('{review_id}', {rating}, 'Nice', '{user_id}', 'p1', "
+                    "CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+        flask_migrate.upgrade()
+
+        loft, boat = db.session.get(Place, 'p1'), db.session.get(Place, 'p2')
+        assert loft.geo_cell == cell_for(40.7, -74.0) and boat.geo_cell is None
+        assert loft.to_dict(fields={'review_count', 'average_rating', 'rating_histogram'}) == {
+            'review_count': 3, 'average_rating': 4.33,
+            'rating_histogram': {'1': 0, '2': 0, '3': 1, '4': 0, '5': 2}}
+        assert boat.review_count == 0
+
+    def test_duplicate_reviews_stop_upgrade(self, app):
+        """Test that the unique constraint is not added over duplicate reviews"""
+        flask_migrate.upgrade(revision='0002')
+        with db.engine.begin() as connection:
+            for review_id in ('r1', 'r2'):
+                connection.execute(text(
+                    "INSERT INTO reviews (id, rating, comment, user_id, place_id, created_at, updated_at) "
+                    f"VALUES ('{review_id}', 5, 'Great', 'u1', 'p1', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"))
+        # Flask-Migrate logs the error and exits
+        with pytest.raises(SystemExit):
+            flask_migrate.upgrade()
+        with db.engine.connect() as connection:
+            assert connection.execute(text('SELECT version_num FROM alembic_version')).scalar() == '0002'
+
+
+class TestQueryPlans:
+    """Test that EXPLAIN shows an index for each hot query"""
+
+    @pytest.fixture(autouse=True)
+    def migrated(self, app):
+        flask_migrate.upgrade()
+
+    def test_reviews_of_place(self):
+        """Test the reviews listed for a place"""
+        assert 'USING INDEX ix_reviews_place_id' in query_plan(
+            select(Review).where(Review.place_id == 'p'))
+
+    def test_review_by_user_and_place(self):
+        """Test the already-reviewed check, served by the unique constraint"""
+        plan = query_plan(select(Review.id).where(Review.user_id == 'u', Review.place_id == 'p'))
+        assert 'user_id=? AND place_id=?' in plan and 'USING INDEX' in plan
+
+    def test_price_page(self):
+        """Test that a price range page is read in (price, id) order without sorting"""
+        plan = query_plan(select(Place).where(Place.price >= 10, Place.price <= 100)
+                          .order_by(Place.price, Place.id).limit(21))
+        assert 'USING INDEX ix_places_price_id' in plan
+        assert 'TEMP B-TREE' not in plan
+
+    def test_places_of_owner(self):
+        """Test the places listed for an owner"""
+        assert 'USING INDEX ix_places_owner_id' in query_plan(
+            select(Place).where(Place.owner_id == 'o'))
+
+    def test_places_of_amenity(self):
+        """Test the reverse lookup of the place-amenity association"""
+        assert 'USING INDEX ix_place_amenity_amenity_id' in query_plan(
+            select(place_amenity.c.place_id).where(place_amenity.c.amenity_id == 'a'))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
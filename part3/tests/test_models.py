@@ -329,6 +329,31 @@ class TestBaseModel:
         user.save()
         assert user.updated_at > original_updated_at
 
+    def test_no_instance_dict(self):
+        """Test that entities only have their declared slots"""
+        review = Review(5, "Great", "user-1", "place-1")
+        assert not hasattr(review, '__dict__')
+        with pytest.raises(AttributeError):
+            review.stars = 5
+
+    def test_timestamp_round_trip(self):
+        """Test that datetimes assigned to the epoch timestamps read back unchanged"""
+        from datetime import datetime
+        amenity = Amenity("WiFi", "Fast")
+        created = datetime(2024, 2, 29, 12, 30, 15, 123456)
+        amenity.created_at = created
+        assert amenity.created_at == created
+        assert amenity.to_dict()['created_at'] == "2024-02-29T12:30:15.123456"
+
+    def test_relations_allocated_lazily(self):
+        """Test that relation lists only exist once used"""
+        place = Place("Loft", "Nice", 100.0, 40.7, -74.0, "owner-1")
+        assert not hasattr(place, '_reviews')
+        assert place.reviews == []
+        place.add_amenity("wifi")
+        assert place.amenities == ["wifi"]
+        assert place.reviews is place.reviews
+
 
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
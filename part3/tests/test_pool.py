@@ -0,0 +1,88 @@
+"""
+Unit Tests for the connection pool settings and metrics
+Tests engine options from the environment and the instrumented pool
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.config import engine_options
+from app.metrics import registry
+from app.persistence.pool import TimedQueuePool, checkout_timeouts, checkout_wait_seconds
+
+
+def gauge(name):
+    """Current value of a registered gauge"""
+    return next(registry._metrics[name].samples())[2]
+
+
+class TestEngineOptions:
+    """Test SQLALCHEMY_ENGINE_OPTIONS built from the environment"""
+
+    def test_pool_settings(self, monkeypatch):
+        """Test that the pool is sized from DB_* variables"""
+        monkeypatch.setenv('DB_POOL_SIZE', '8')
+        monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+        options = engine_options('mysql+pymysql://u:p@localhost/db')
+        assert options['poolclass'] is TimedQueuePool
+        assert options['pool_size'] == 8
+        assert options['pool_pre_ping'] is False
+        assert 'connect_args' not in options
+
+    @pytest.mark.parametrize('uri, connect_args', [
+        ('mysql+pymysql://u:p@localhost/db', {'init_command': 'SET SESSION max_execution_time=2500'}),
+        ('postgresql://u:p@localhost/db', {'options': '-c statement_timeout=2500'})
+    ])
+    def test_statement_timeout(self, monkeypatch, uri, connect_args):
+        """Test that the statement timeout is applied the way each server expects"""
+        monkeypatch.setenv('DB_STATEMENT_TIMEOUT_MS', '2500')
+        assert engine_options(uri)['connect_args'] == connect_args
+
+
+class TestTimedQueuePool:
+    """Test checkout metrics"""
+
+    @pytest.fixture
+    def engine(self):
+        """Engine with a single connection and no overflow"""
+        engine = create_engine('sqlite://', poolclass=TimedQueuePool,
+                               pool_size=1, max_overflow=0, pool_timeout=0.01)
+        yield engine
+        engine.dispose()
+
+    def test_gauges_registered_on_first_checkout(self, engine):
+        """Test that the pool exports its gauges once used, not when created"""
+        registered = registry._metrics.get('hbnb_db_pool_size')
+        assert registered is None or registered.callback.__self__ is not engine.pool
+        with engine.connect():
+            assert registry._metrics['hbnb_db_pool_size'].callback.__self__ is engine.pool
+            assert gauge('hbnb_db_pool_size') == 1
+
+    def test_checkout_wait_recorded(self, engine):
+        """Test that every checkout records its wait"""
+        before = checkout_wait_seconds.stats()['count']
+        with engine.connect():
+            pass
+        assert checkout_wait_seconds.stats()['count'] == before + 1
+
+    def test_saturation_and_timeout(self, engine):
+        """Test that a full pool reports saturation and counts timeouts"""
+        before = checkout_timeouts.value()
+        with engine.connect():
+            assert gauge('hbnb_db_pool_checked_out') == 1
+            assert gauge('hbnb_db_pool_saturation') == 1.0
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+        assert checkout_timeouts.value() == before + 1
+        assert gauge('hbnb_db_pool_saturation') == 0.0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,83 @@
+"""
+Unit Tests for startup profiling and lazy namespace registration
+"""
+
+import pytest
+import sys
+import os
+import builtins
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.config import TestingConfig
+from app.profiling import StartupProfiler, startup_profiler
+
+
+def rules(app, prefix):
+    """URL rules of the app under the prefix"""
+    return [rule.rule for rule in app.url_map.iter_rules() if rule.rule.startswith(prefix)]
+
+
+class TestStartupProfiler:
+    """Test import timing and phases"""
+
+    def test_times_new_imports(self, monkeypatch):
+        """Test that a module loaded while profiling is reported"""
+        monkeypatch.delitem(sys.modules, 'colorsys', raising=False)
+        original_import = builtins.__import__
+        profiler = StartupProfiler()
+        profiler.start()
+        import colorsys  # noqa: F401
+        profiler.stop()
+
+        assert builtins.__import__ is original_import
+        modules = {m['module']: m for m in profiler.report()['modules']}
+        assert modules['colorsys']['self_seconds'] > 0
+
+    def test_phases_only_while_enabled(self):
+        """Test that phases are ignored once the profiler is stopped"""
+        profiler = StartupProfiler()
+        profiler.start()
+        with profiler.phase('first'):
+            pass
+        profiler.stop()
+        with profiler.phase('second'):
+            pass
+        assert [p['phase'] for p in profiler.report()['phases']] == ['first']
+
+    def test_create_app_profile(self, monkeypatch, capsys):
+        """Test that create_app reports extension and namespace times"""
+        monkeypatch.setattr(TestingConfig, 'PROFILE_STARTUP', True)
+        app = create_app('testing')
+        phases = [p['phase'] for p in app.extensions['startup_profile']['phases']]
+        assert 'init SQLAlchemy' in phases
+        assert 'namespace /api/places' in phases
+        assert phases[-1] == 'create_app total'
+        assert not startup_profiler.enabled
+        assert 'Startup profile' in capsys.readouterr().err
+
+
+class TestLazyNamespaces:
+    """Test namespaces registered on the first request"""
+
+    def test_registered_on_first_request(self, monkeypatch):
+        """Test that routes exist only once a request came in"""
+        monkeypatch.setattr(TestingConfig, 'LAZY_NAMESPACES', True)
+        app = create_app('testing')
+        assert rules(app, '/api/amenities') == []
+
+        with app.app_context():
+            db.create_all()
+            response = app.test_client().get('/api/amenities/')
+            assert response.status_code == 200
+            assert response.json['items'] == []
+            assert '/api/amenities/' in rules(app, '/api/amenities')
+            assert app.test_client().get('/api/amenities/').status_code == 200
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
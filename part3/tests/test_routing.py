@@ -0,0 +1,128 @@
+"""
+Unit Tests for read replica routing
+Two SQLite files stand in for the primary and the replica servers
+"""
+
+import pytest
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import config as app_config
+from app import create_app, db
+from app.models import Amenity, Review
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Application with a primary and an (unreplicated) replica database"""
+
+    class ReplicaConfig(app_config.TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{tmp_path / 'primary.db'}"
+        SQLALCHEMY_BINDS = {'replica': f"sqlite:///{tmp_path / 'replica.db'}"}
+
+    monkeypatch.setitem(app_config.config, 'replica', ReplicaConfig)
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    app = create_app('replica')
+    with app.app_context():
+        db.create_all()
+        db.metadata.create_all(db.engines['replica'])
+        yield app
+        db.session.remove()
+        db.drop_all()
+        db.metadata.drop_all(db.engines['replica'])
+    # The bind key stays registered on the shared db, other apps have no such engine
+    db.metadatas.pop('replica', None)
+
+
+@pytest.fixture
+def facade(app):
+    """Facade over the SQLAlchemy repositories"""
+    return app.extensions['facade']
+
+
+def replicate(amenity):
+    """Copy a row to the replica, as replication would"""
+    with db.engines['replica'].begin() as connection:
+        connection.execute(Amenity.__table__.insert().values(
+            id=amenity.id, name=amenity.name, description=amenity.description,
+            created_at=amenity.created_at, updated_at=amenity.updated_at))
+
+
+class TestReplicaRouting:
+    """Test which server each facade call reads from"""
+
+    def test_reads_go_to_replica(self, facade):
+        """Test that a new request reads from the replica"""
+        amenity = facade.create_amenity({'name': "WiFi"})
+        amenity_id = amenity.id
+        db.session.remove()
+
+        # Not replicated yet: the replica does not know the row
+        assert facade.get_amenity(amenity_id) is None
+        db.session.remove()
+
+        replicate(facade.amenity_repo.get(amenity_id))
+        db.session.remove()
+        assert facade.get_amenity(amenity_id).name == "WiFi"
+
+    def test_read_your_writes(self, facade):
+        """Test that reads after a write in the same request use the primary"""
+        amenity = facade.create_amenity({'name': "Pool"})
+        db.session.expunge_all()
+        assert facade.get_amenity(amenity.id).name == "Pool"
+        assert [a.name for a in facade.get_all_amenities()] == ["Pool"]
+
+    def test_writes_read_primary(self, facade):
+        """Test that write calls never look rows up on the replica"""
+        amenity = facade.create_amenity({'name': "Gym"})
+        db.session.remove()
+        updated = facade.update_amenity(amenity.id, {'name': "Fitness room"})
+        assert updated.name == "Fitness room"
+
+    def test_without_replica(self, app, facade, monkeypatch):
+        """Test that read-only calls use the primary when no replica is bound"""
+        amenity = facade.create_amenity({'name': "Sauna"})
+        db.session.remove()
+        with monkeypatch.context() as patch:
+            patch.delitem(db.engines, 'replica')
+            assert facade.get_amenity(amenity.id).name == "Sauna"
+
+
+class TestLaggingReplica:
+    """Test writes that follow a read-only lookup of a lagging replica"""
+
+    def test_update_review_uses_primary_values(self, facade):
+        """Test that the rating moved out of the aggregates is the primary's"""
+        owner, reviewer = (facade.create_user({
+            'first_name': name, 'last_name': "Doe", 'email': f"{name.lower()}@example.com",
+            'password': "secret"}) for name in ("John", "Jane"))
+        place = facade.create_place({
+            'title': "Loft", 'description': "Nice", 'price': 100.0,
+            'latitude': None, 'longitude': None, 'owner_id': owner.id})
+        review = facade.create_review({
+            'rating': 5, 'comment': "Great", 'user_id': reviewer.id, 'place_id': place.id})
+        # The replica still has the review as it was before an earlier update
+        with db.engines['replica'].begin() as connection:
+            connection.execute(Review.__table__.insert().values(
+                id=review.id, rating=2, comment="Meh", user_id=reviewer.id, place_id=place.id,
+                created_at=review.created_at, updated_at=review.created_at))
+        review_id, place_id = review.id, place.id
+        db.session.remove()
+
+        # As the review handler does: a read-only lookup, kept while updating
+        looked_up = facade.get_review(review_id)
+        assert looked_up.rating == 2
+        facade.update_review(review_id, {'rating': 4})
+        db.session.remove()
+
+        place = facade.place_repo.get(place_id)
+        assert place.to_dict(fields={'review_count', 'rating_histogram'}) == {
+            'review_count': 1, 'rating_histogram': {'1': 0, '2': 0, '3': 0, '4': 1, '5': 0}}
+        assert place.rating_sum == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,199 @@
+"""
+Unit Tests for the compiled model serializer
+Tests exclusions, datetime conversion, ?fields= projection, JSON encoding
+and the unmarshalled responses against their flask-restx models
+"""
+
+import json
+import pytest
+import sys
+import os
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from flask_jwt_extended import create_access_token
+from flask_restx import marshal
+
+from app import create_app, db
+from app.api.amenities import amenity_model
+from app.api.representation import dumps
+from app.api.reviews import review_model
+from app.api.users import user_model
+from app.models import Place, User
+
+
+@pytest.fixture
+def app(monkeypatch):
+    """Database backed application and its facade"""
+    monkeypatch.setenv('USE_DATABASE', 'true')
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        app.facade = app.extensions['facade']
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def owner(app):
+    """A stored user"""
+    owner = User("John", "Doe", "john@example.com")
+    owner._password_hash = "not-a-real-hash"
+    return app.facade.user_repo.add(owner)
+
+
+@pytest.fixture
+def place(app, owner):
+    """A place owned by the stored user"""
+    return app.facade.create_place({
+        'title': "Cozy Apartment", 'description': "Nice place", 'price': 100.0,
+        'latitude': 40.7, 'longitude': -74.0, 'owner_id': owner.id
+    })
+
+
+class TestSerializer:
+    """Test the per-class serializer built at mapper configuration"""
+
+    def test_user_excludes_password_hash(self, owner):
+        """Test that the hash, stored in the password column, is never output"""
+        data = owner.to_dict()
+        assert data['email'] == "john@example.com"
+        assert 'password' not in data and '_password_hash' not in data
+        assert isinstance(data['created_at'], str)
+
+    def test_place_excludes_internal_columns(self, place):
+        """Test that the grid cell and raw rating counts are replaced"""
+        data = place.to_dict()
+        assert 'geo_cell' not in data and 'ratings_1' not in data
+        assert data['rating_histogram'] == {'1': 0, '2': 0, '3': 0, '4': 0, '5': 0}
+        assert data['average_rating'] == 0.0
+
+    def test_projection(self, place):
+        """Test that only the requested fields are output"""
+        assert place.to_dict(fields={'id', 'title', 'average_rating'}) == {
+            'title': "Cozy Apartment", 'id': place.id, 'average_rating': 0.0}
+
+    def test_serializable_fields(self):
+        """Test the names ?fields= accepts"""
+        names = Place.serializable_fields()
+        assert 'price' in names and 'rating_histogram' in names
+        assert 'geo_cell' not in names
+
+
+class TestFieldsArgument:
+    """Test ?fields= on the place endpoints"""
+
+    @pytest.fixture
+    def client(self, app):
+        """Test client sending a valid token"""
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity="user-1")}'
+        return client
+
+    def test_list_projection(self, client, place):
+        """Test that list items only carry the requested fields"""
+        response = client.get('/api/places/?fields=id,title,price')
+        assert response.json['items'] == [{'id': place.id, 'title': "Cozy Apartment", 'price': 100.0}]
+
+    def test_projection_keeps_includes(self, client, place):
+        """Test that included data is output next to the projected fields"""
+        response = client.get(f'/api/places/{place.id}?fields=id&include=owner')
+        assert set(response.json) == {'id', 'owner'}
+
+    def test_unknown_field_rejected(self, client, place):
+        """Test that unknown names get a 400"""
+        response = client.get('/api/places/?fields=id,geo_cell')
+        assert response.status_code == 400
+        assert 'geo_cell' in response.json['message']
+
+
+class TestModelContract:
+    """Test that unmarshalled endpoints output exactly their documented model"""
+
+    @pytest.fixture
+    def reviewer(self, app):
+        """A second stored user"""
+        reviewer = User("Jane", "Roe", "jane@example.com")
+        reviewer._password_hash = "not-a-real-hash"
+        return app.facade.user_repo.add(reviewer)
+
+    @pytest.fixture
+    def client(self, app, reviewer):
+        """Test client sending the reviewer's token"""
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity=reviewer.id)}'
+        return client
+
+    @staticmethod
+    def expected(obj, model):
+        """Body the model marshalled, timestamps in ISO 8601 as by to_dict()"""
+        body = marshal(obj.to_dict(), model)
+        # Same keys as marshalling the object itself, as the lists used to
+        assert set(body) == set(marshal(obj, model))
+        return body
+
+    def test_reviews(self, app, client, place, reviewer):
+        """Test the review writes, reads and lists"""
+        response = client.post('/api/reviews/', json={
+            'rating': 4, 'comment': "Great stay", 'place_id': place.id})
+        assert response.status_code == 201
+        review = app.facade.get_review(response.json['id'])
+        assert response.json == self.expected(review, review_model)
+
+        response = client.put(f'/api/reviews/{review.id}', json={'rating': 5, 'comment': "Even better"})
+        review = app.facade.get_review(review.id)
+        assert response.json == self.expected(review, review_model)
+
+        body = self.expected(review, review_model)
+        assert client.get(f'/api/reviews/{review.id}').json == body
+        assert client.get('/api/reviews/').json == {'items': [body], 'next': None}
+        assert client.get(f'/api/reviews/places/{place.id}/reviews').json == [body]
+
+    def test_users(self, client, owner, reviewer):
+        """Test the user read and list"""
+        assert client.get(f'/api/users/{owner.id}').json == self.expected(owner, user_model)
+        assert client.get('/api/users/').json == {
+            'items': [self.expected(user, user_model)
+                      for user in sorted((owner, reviewer), key=lambda user: (user.created_at, user.id))],
+            'next': None}
+
+    def test_amenities(self, app, client):
+        """Test the amenity read and list"""
+        amenity = app.facade.create_amenity({'name': "Wi-Fi", 'description': "Fast"})
+        body = self.expected(amenity, amenity_model)
+        assert client.get(f'/api/amenities/{amenity.id}').json == body
+        assert client.get('/api/amenities/').json == {'items': [body], 'next': None}
+
+
+class TestJSONBackends:
+    """Test that both encoders produce the same responses"""
+
+    @pytest.mark.parametrize('backend', ['json', 'orjson'])
+    def test_dumps_datetimes(self, app, backend):
+        """Test that datetimes are encoded in ISO 8601 by either backend"""
+        app.config['JSON_BACKEND'] = backend
+        value = datetime(2024, 5, 1, 12, 30, 15, 250)
+        assert json.loads(dumps({'at': value})) == {'at': value.isoformat()}
+
+    def test_same_body_with_either_backend(self, app, place):
+        """Test that switching backend does not change a response"""
+        client = app.test_client()
+        client.environ_base['HTTP_AUTHORIZATION'] = f'Bearer {create_access_token(identity="user-1")}'
+        bodies = []
+        for backend in ('json', 'orjson'):
+            app.config['JSON_BACKEND'] = backend
+            bodies.append(client.get(f'/api/places/{place.id}?include=owner').json)
+        assert bodies[0] == bodies[1]
+
+    def test_errors_are_not_marshalled(self, app):
+        """Test that error bodies of unmarshalled endpoints keep their message"""
+        response = app.test_client().get('/api/reviews/missing')
+        assert response.status_code == 404
+        assert response.json == {'message': 'Review not found'}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
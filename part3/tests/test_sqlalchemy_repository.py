@@ -0,0 +1,224 @@
+"""
+Unit Tests for the SQLAlchemyRepository
+Runs against the in-memory SQLite database of the testing configuration
+"""
+
+import pytest
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event
+
+from app import create_app, db
+from app.models import Amenity, Place, Review, User
+from app.persistence.sqlalchemy_repository import SQLAlchemyRepository
+
+
+@pytest.fixture
+def app():
+    """Application with a fresh schema"""
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def amenity_repo(app):
+    """Repository over the Amenity model"""
+    return SQLAlchemyRepository(Amenity)
+
+
+class TestKeysetPagination:
+    """Test cursor-based pagination ordered by (created_at, id)"""
+
+    def test_pages_cover_every_row_once(self, amenity_repo):
+        """Test that following cursors visits every row in order"""
+        base = datetime(2024, 1, 1)
+        for i in range(10):
+            amenity = Amenity(f"Amenity {i}")
+            amenity.created_at = base + timedelta(seconds=i // 3)
+            amenity_repo.add(amenity)
+
+        seen, cursor = [], None
+        while True:
+            page = amenity_repo.get_page(4, cursor)
+            seen.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert len(seen) == 10
+        assert len({a.id for a in seen}) == 10
+        keys = [(a.created_at, a.id) for a in seen]
+        assert keys == sorted(keys)
+
+    def test_invalid_cursor(self, amenity_repo):
+        """Test that a malformed cursor raises ValueError"""
+        with pytest.raises(ValueError, match="Invalid cursor"):
+            amenity_repo.get_page(10, "not-a-cursor")
+
+
+class TestRangeSearch:
+    """Test range filters and sorting compiled to SQL"""
+
+    def test_price_range_sorted_descending(self, app):
+        """Test price bounds with descending price order across pages"""
+        owner = User("John", "Doe", "john@example.com")
+        owner._password_hash = "not-a-real-hash"
+        db.session.add(owner)
+        db.session.commit()
+        place_repo = SQLAlchemyRepository(Place)
+        for i, price in enumerate([80.0, 120.0, 45.0, 300.0, 120.0, 95.0]):
+            place_repo.add(Place(f"Place {i}", "Description", price, 10.0 * i, 0.0, owner.id))
+
+        places, cursor = [], None
+        while True:
+            page = place_repo.get_page(2, cursor, order_by='price', descending=True,
+                                       ranges={'price': (50.0, 150.0), 'latitude': (None, 45.0)})
+            places.extend(page.items)
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert [p.price for p in places] == [120.0, 120.0, 80.0]
+
+
+class TestEagerLoading:
+    """Test that include= loads place relations in a fixed number of queries"""
+
+    INCLUDE = ('owner', 'amenities', 'reviews', 'review_summary')
+
+    @pytest.fixture
+    def place_repo(self, app):
+        """Places with an owner, amenities and reviews each"""
+        owner = User("John", "Doe", "john@example.com")
+        owner._password_hash = "not-a-real-hash"
+        wifi, pool = Amenity("WiFi"), Amenity("Pool")
+        db.session.add_all([owner, wifi, pool])
+        db.session.commit()
+        for i in range(5):
+            place = Place(f"Place {i}", "Description", 100.0 + i, None, None, owner.id)
+            place.amenities.extend([wifi, pool])
+            place.review_count, place.rating_sum, place.ratings_5 = 1, 5, 1
+            db.session.add(place)
+            db.session.flush()
+            db.session.add(Review(5, "Great!", owner.id, place.id))
+        db.session.commit()
+        # Start from an empty identity map, as a new request would
+        db.session.expunge_all()
+        return SQLAlchemyRepository(Place)
+
+    def _count_statements(self, func):
+        """Run func and count the SQL statements it executes"""
+        statements = []
+
+        def count(*args):
+            statements.append(args[2])
+
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            result = func()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+        return result, len(statements)
+
+    def test_page_with_includes(self, place_repo):
+        """Test that a page with every relation costs one query per relation kind"""
+        def render():
+            page = place_repo.get_page(10, include=self.INCLUDE)
+            return [place.to_dict(self.INCLUDE) for place in page.items]
+
+        places, count = self._count_statements(render)
+        # Places joined with owners, then one SELECT ... IN per collection
+        assert count == 3
+        assert len(places) == 5
+        assert all(p['owner']['first_name'] == "John" for p in places)
+        assert all({a['name'] for a in p['amenities']} == {"WiFi", "Pool"} for p in places)
+        assert all(len(p['reviews']) == 1 for p in places)
+        assert places[0]['review_summary']['count'] == 1
+
+    def test_get_with_includes(self, place_repo):
+        """Test that a single place and its relations load together"""
+        place_id = place_repo.get_page(1).items[0].id
+        data, count = self._count_statements(
+            lambda: place_repo.get(place_id, include=self.INCLUDE).to_dict(self.INCLUDE))
+        assert count == 3
+        assert data['owner']['last_name'] == "Doe"
+
+    def test_without_includes_loads_lazily(self, place_repo):
+        """Test that the relations are still available, one query at a time"""
+        def render():
+            page = place_repo.get_page(10)
+            return [place.to_dict(('amenities',)) for place in page.items]
+
+        _, count = self._count_statements(render)
+        assert count == 6
+
+
+class TestBatchOperations:
+    """Test single-transaction batch writes"""
+
+    def test_add_many_isolates_constraint_errors(self, amenity_repo):
+        """Test that a duplicate only rejects its own item"""
+        amenity_repo.add(Amenity("WiFi"))
+        result = amenity_repo.add_many([Amenity("Pool"), Amenity("WiFi"), Amenity("Gym")])
+        assert sorted(result.items) == [0, 2]
+        assert "UNIQUE" in result.errors[1]
+        names = {a.name for a in amenity_repo.get_all()}
+        assert names == {"WiFi", "Pool", "Gym"}
+
+    def test_add_many_single_commit(self, amenity_repo):
+        """Test that a clean batch is committed in one transaction"""
+        commits = []
+        event.listen(db.session(), 'after_commit', commits.append)
+        result = amenity_repo.add_many([Amenity(f"Amenity {i}") for i in range(50)])
+        assert len(result.items) == 50 and not result.errors
+        assert len(commits) == 1
+        assert len(amenity_repo.get_all()) == 50
+
+    def test_add_many_in_transaction(self, amenity_repo):
+        """Test that a batch with a constraint error is committed with its transaction block"""
+        amenity_repo.add(Amenity("WiFi"))
+        commits = []
+        # COMMIT statements only, the session also reports released savepoints
+        event.listen(db.engine, 'commit', commits.append)
+        with amenity_repo.transaction():
+            result = amenity_repo.add_many([Amenity("Pool"), Amenity("WiFi")])
+            amenity_repo.add(Amenity("Gym"))
+            assert commits == []
+        assert list(result.items) == [0]
+        assert "UNIQUE" in result.errors[1]
+        assert len(commits) == 1
+        assert {a.name for a in amenity_repo.get_all()} == {"WiFi", "Pool", "Gym"}
+
+    def test_update_many(self, amenity_repo):
+        """Test updates with missing IDs and constraint violations"""
+        wifi, pool = amenity_repo.add_many([Amenity("WiFi"), Amenity("Pool")]).items.values()
+        result = amenity_repo.update_many([
+            (wifi.id, {'description': "Fast"}),
+            ("missing-id", {'description': "None"}),
+            (pool.id, {'name': "WiFi"})
+        ])
+        assert list(result.items) == [0]
+        assert result.errors[1] == "Not found"
+        assert "UNIQUE" in result.errors[2]
+        db.session.expire_all()
+        assert amenity_repo.get(wifi.id).description == "Fast"
+        assert amenity_repo.get(pool.id).name == "Pool"
+
+    def test_delete_many(self, amenity_repo):
+        """Test deletes reporting unknown IDs"""
+        wifi = amenity_repo.add(Amenity("WiFi"))
+        result = amenity_repo.delete_many(["missing-id", wifi.id])
+        assert result.items == {1: wifi.id}
+        assert result.errors == {0: "Not found"}
+        assert amenity_repo.get_all() == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
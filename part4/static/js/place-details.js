@@ -51,9 +51,12 @@ function checkAuthentication() {
 // Fetch Place Details
 // ============================================
 
+// Related data embedded in the place response, so the page needs one request
+const PLACE_INCLUDES = 'owner,amenities,reviews,review_summary';
+
 async function fetchPlaceDetails(token, placeId) {
     try {
-        const response = await fetch(`${API_URL}/places/${placeId}`, {
+        const response = await fetch(`${API_URL}/places/${placeId}?include=${PLACE_INCLUDES}`, {
             method: 'GET',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -83,33 +86,6 @@ async function fetchPlaceDetails(token, placeId) {
     }
 }
 
-// ============================================
-// Fetch Place Reviews
-// ============================================
-
-async function fetchPlaceReviews(token, placeId) {
-    try {
-        const response = await fetch(`${API_URL}/reviews/?place_id=${placeId}`, {
-            method: 'GET',
-            headers: {
-                'Authorization': `Bearer ${token}`,
-                'Content-Type': 'application/json'
-            }
-        });
-        
-        if (response.ok) {
-            const reviews = await response.json();
-            return reviews.filter(review => review.place_id === placeId);
-        }
-        
-        return [];
-        
-    } catch (error) {
-        console.error('Error fetching reviews:', error);
-        return [];
-    }
-}
-
 // ============================================
 // Display Place Details
 // ============================================
@@ -120,9 +96,13 @@ function displayPlaceDetails(place) {
     detailsContainer.innerHTML = `
         <div class="place-info">
             <h1>${place.title}</h1>
-            <p class="host">Hosted by: ${place.owner_id}</p>
+            <p class="host">Hosted by: ${place.owner ? `${place.owner.first_name} ${place.owner.last_name}` : place.owner_id}</p>
             <p class="price">$${parseFloat(place.price).toFixed(2)} / night</p>
             
+            ${place.review_summary && place.review_summary.count ? `
+                <p class="rating">★ ${place.review_summary.average_rating.toFixed(1)} (${place.review_summary.count} reviews)</p>
+            ` : ''}
+            
             ${place.description ? `
                 <div class="description">
                     <h2>Description</h2>
@@ -243,14 +223,9 @@ document.addEventListener('DOMContentLoaded', async () => {
         const place = await fetchPlaceDetails(token, placeId);
         displayPlaceDetails(place);
         
-        // Display amenities if available
-        if (place.amenities) {
-            displayAmenities(place.amenities);
-        }
-        
-        // Fetch and display reviews
-        const reviews = await fetchPlaceReviews(token, placeId);
-        displayReviews(reviews);
+        // Amenities and reviews come embedded in the place
+        displayAmenities(place.amenities);
+        displayReviews(place.reviews);
         
         // Setup add review link
         setupAddReviewLink(placeId, token);
@@ -4,6 +4,13 @@
 
 // API Configuration
 const API_URL = 'http://localhost:5001/api';
+// Places requested per page (the API caps the limit at 100)
+const PAGE_LIMIT = 20;
+// Incremented by every fetchPlaces call, so an older load stops when the filter changes
+let placesRequest = 0;
+// Query of the current listing and cursor of its next page (null after the last one)
+let placesQuery = null;
+let nextCursor = null;
 
 // ============================================
 // Cookie Management (from auth.js)
@@ -42,6 +49,8 @@ function checkAuthentication() {
     }
     
     // User authenticated - fetch places
+    setupPriceFilter(token);
+    setupLoadMore(token);
     fetchPlaces(token);
     return true;
 }
@@ -50,13 +59,55 @@ function checkAuthentication() {
 // Fetch Places from API
 // ============================================
 
-async function fetchPlaces(token) {
+async function fetchPlaces(token, maxPrice = 'all') {
     const placesContainer = document.getElementById('places-container');
+    const request = ++placesRequest;
+    
+    // Price filtering is done by the API so only matching places are sent
+    placesQuery = new URLSearchParams({ limit: PAGE_LIMIT });
+    if (maxPrice !== 'all') {
+        placesQuery.set('max_price', maxPrice);
+    }
+    nextCursor = null;
+    updateLoadMore();
+    placesContainer.innerHTML = '<p class="loading">Loading places...</p>';
+    
+    // Only the first page is loaded here, the next ones on demand (see loadMorePlaces)
+    const page = await fetchPlacesPage(token, request);
+    if (!page) {
+        return;
+    }
+    displayPlaces(page.items);
+    nextCursor = page.next;
+    updateLoadMore();
+}
+
+async function loadMorePlaces(token) {
+    const request = placesRequest;
+    const loadMoreButton = document.getElementById('load-more-button');
+    
+    loadMoreButton.disabled = true;
+    loadMoreButton.textContent = 'Loading...';
+    const page = await fetchPlacesPage(token, request, nextCursor);
+    loadMoreButton.disabled = false;
+    loadMoreButton.textContent = 'Load more';
+    if (!page) {
+        return;
+    }
+    appendPlaces(page.items);
+    nextCursor = page.next;
+    updateLoadMore();
+}
+
+async function fetchPlacesPage(token, request, cursor = null) {
+    const placesContainer = document.getElementById('places-container');
+    const params = new URLSearchParams(placesQuery);
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
     
     try {
-        placesContainer.innerHTML = '<p class="loading">Loading places...</p>';
-        
-        const response = await fetch(`${API_URL}/places/`, {
+        const response = await fetch(`${API_URL}/places/?${params}`, {
             method: 'GET',
             headers: {
                 'Authorization': `Bearer ${token}`,
@@ -69,22 +120,43 @@ async function fetchPlaces(token) {
                 // Token expired or invalid
                 deleteCookie('token');
                 window.location.href = 'index.html';
-                return;
+                return null;
             }
             throw new Error(`HTTP error! status: ${response.status}`);
         }
         
-        const places = await response.json();
-        displayPlaces(places);
-        setupPriceFilter(places);
+        const page = await response.json();   // { items: [...], next: cursor }
+        if (request !== placesRequest) {
+            // The filter changed, a newer call is loading the places
+            return null;
+        }
+        return page;
         
     } catch (error) {
         console.error('Error fetching places:', error);
-        placesContainer.innerHTML = `
+        if (request !== placesRequest) {
+            return null;
+        }
+        const message = `
             <p class="error">
                 Failed to load places. Please try again later.
             </p>
         `;
+        if (cursor) {
+            // Keep the places already shown, the button allows a retry
+            placesContainer.insertAdjacentHTML('beforeend', message);
+        } else {
+            placesContainer.innerHTML = message;
+        }
+        return null;
+    }
+}
+
+function updateLoadMore() {
+    const loadMoreButton = document.getElementById('load-more-button');
+    
+    if (loadMoreButton) {
+        loadMoreButton.hidden = !nextCursor;
     }
 }
 
@@ -103,7 +175,13 @@ function displayPlaces(places) {
     }
     
     placesContainer.innerHTML = '';
+    appendPlaces(places);
+}
+
+function appendPlaces(places) {
+    const placesContainer = document.getElementById('places-container');
     
+    placesContainer.querySelectorAll('.error').forEach(error => error.remove());
     places.forEach(place => {
         const placeCard = createPlaceCard(place);
         placesContainer.appendChild(placeCard);
@@ -169,7 +247,7 @@ function createPlaceCard(place) {
 // Price Filter
 // ============================================
 
-function setupPriceFilter(places) {
+function setupPriceFilter(token) {
     const priceFilter = document.getElementById('price-filter');
     
     if (!priceFilter) return;
@@ -183,24 +261,24 @@ function setupPriceFilter(places) {
         <option value="500">Under $500</option>
     `;
     
-    // Add event listener for filtering
+    // Reload matching places from the API when the filter changes
     priceFilter.addEventListener('change', (event) => {
         const selectedPrice = event.target.value;
-        filterPlacesByPrice(selectedPrice);
+        fetchPlaces(token, selectedPrice);
     });
 }
 
-function filterPlacesByPrice(maxPrice) {
-    const placeCards = document.querySelectorAll('.place-card');
+// ============================================
+// Load More
+// ============================================
+
+function setupLoadMore(token) {
+    const loadMoreButton = document.getElementById('load-more-button');
     
-    placeCards.forEach(card => {
-        const cardPrice = parseFloat(card.getAttribute('data-price'));
-        
-        if (maxPrice === 'all' || cardPrice <= parseFloat(maxPrice)) {
-            card.style.display = 'flex';
-        } else {
-            card.style.display = 'none';
-        }
+    if (!loadMoreButton) return;
+    
+    loadMoreButton.addEventListener('click', () => {
+        loadMorePlaces(token);
     });
 }
 